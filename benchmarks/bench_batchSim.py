@@ -0,0 +1,85 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from mrc.controller.sim import SIM
+from mrc.controller.batchSim import BatchSIM, groupAddedItem
+
+
+def makeSims(robotCount, mapSize, itemCount, seed):
+    rng = random.Random(seed)
+    width, height = mapSize
+    batchSim = BatchSIM(robotCount, mapSize, sharedMap=True, seed=seed)
+    sims = [SIM(mapSize, (0, 0), (0, 1)) for i in range(robotCount)]
+    for i in range(itemCount):
+        typeName = rng.choice(["hazard", "blob"])
+        pos = (rng.randrange(width), rng.randrange(height))
+        batchSim.addItem(typeName, pos)
+        for sim in sims:
+            sim.addItem(typeName, pos)
+    starts = [(rng.randrange(width), rng.randrange(height)) for i in range(robotCount)]
+    batchSim.setRobotPos(starts)
+    batchSim.setRobotDir([(0, 1)] * robotCount)
+    for sim, start in zip(sims, starts):
+        sim.setRobotPos(start)
+        sim.setRobotDir((0, 1))
+    return batchSim, sims
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--size", type=int, default=30)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'robots':>7} {'scalar(s)':>10} {'batch(s)':>9} {'speedup':>8} {'same':>5}")
+    for robotCount in args.robots:
+        batchSim, sims = makeSims(
+            robotCount, (args.size, args.size), args.items, args.seed
+        )
+        rng = np.random.default_rng(args.seed)
+        behaviors = rng.integers(1, 3, size=(args.steps, robotCount))
+        probs = rng.random((args.steps, robotCount))
+
+        same = True
+        scalarTime = 0.0
+        batchTime = 0.0
+        for step in range(args.steps):
+            startTime = time.perf_counter()
+            batchSim.step(behaviors[step], probs[step])
+            addedArrays = batchSim.getAddedItemArrays()
+            batchTime += time.perf_counter() - startTime
+            batchAdded = groupAddedItem(robotCount, *addedArrays)
+
+            startTime = time.perf_counter()
+            scalarAdded = []
+            for r, sim in enumerate(sims):
+                if behaviors[step, r] == BatchSIM.BEHAVIOR_MOVE:
+                    sim.move(float(probs[step, r]))
+                else:
+                    sim.rotate()
+                scalarAdded.append(sim.getAddedItem())
+            scalarTime += time.perf_counter() - startTime
+
+            pos = batchSim.getRobotPos().tolist()
+            dir = batchSim.getRobotDir().tolist()
+            for r, sim in enumerate(sims):
+                if (
+                    list(sim.getRobotPos()) != pos[r]
+                    or list(sim.getRobotDir()) != dir[r]
+                    or scalarAdded[r] != batchAdded[r]
+                ):
+                    same = False
+        print(
+            f"{robotCount:>7} {scalarTime:>10.4f} {batchTime:>9.4f} "
+            f"{scalarTime / batchTime:>7.1f}x {str(same):>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
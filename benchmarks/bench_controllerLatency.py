@@ -0,0 +1,173 @@
+import argparse
+import random
+import threading
+import time
+
+from mrc.model.worldModel import WorldStateModel, WorldDataMirror
+from mrc.view.renderSys import RenderMailbox
+from mrc.controller.sim import SIM
+from mrc.controller.missionRunner import MissionRunner
+from mrc.controller.tickScheduler import TickScheduler, Histogram
+from mrc.controller.asyncController import ControllerCore, INIT_ROBOT_DIRECTION
+
+
+class LegacyControllerCore:
+    # the controller before the asyncio core: ticks on a scheduler thread and
+    # voice commands applied synchronously on the calling (tk) thread, with a
+    # lock so the two do not mutate the model at the same time
+    def __init__(self, renderMailbox, period):
+        self.__worldStateModel = WorldStateModel()
+        self.__renderMailbox = renderMailbox
+        self.__tickScheduler = TickScheduler(period, self.__tick)
+        self.__thread = threading.Thread(target=self.__tickScheduler.run)
+        self.__lock = threading.Lock()
+        self.__publishedVersion = None
+        self.__missionRunner = None
+        self.__voiceLatencyHistogram = Histogram()
+
+    def start(self):
+        self.__thread.start()
+
+    def postEvent(self, eventName, *args):
+        postTime = time.perf_counter()
+        if eventName == "submit":
+            with self.__lock:
+                self.__setupMission(args[0])
+                self.__publishWorld(postTime)
+        elif eventName == "robotMove":
+            if args[0]:
+                self.__tickScheduler.stop()
+            else:
+                self.__tickScheduler.start()
+        elif eventName == "voiceResult":
+            verb, itemName, (pos,) = args[0][0]
+            with self.__lock:
+                self.__worldStateModel.addItem(itemName, pos)
+                self.__publishWorld(postTime)
+            self.__voiceLatencyHistogram.add(time.perf_counter() - postTime)
+        elif eventName == "windowClose":
+            self.__tickScheduler.terminate()
+
+    def join(self, timeout=None):
+        self.__thread.join(timeout)
+
+    def getLatencyStatData(self):
+        return {"voiceToMap": self.__voiceLatencyHistogram.getData()}
+
+    def __tick(self):
+        tickTime = time.perf_counter()
+        with self.__lock:
+            behavior = self.__missionRunner.tick()
+            print("behavior: ", behavior)
+            self.__worldStateModel.logRobotStat()
+            if behavior != None:
+                self.__publishWorld(tickTime)
+
+    def __publishWorld(self, sourceTime):
+        worldDelta = self.__worldStateModel.getWorldDelta(self.__publishedVersion)
+        self.__publishedVersion = worldDelta["version"]
+        self.__renderMailbox.post(worldDelta, sourceTime)
+
+    def __setupMission(self, data):
+        mapSize = data["mapSize"]
+        startingPoint = data["startingPoint"]
+        self.__worldStateModel.initialize(mapSize, startingPoint, INIT_ROBOT_DIRECTION)
+        sim = SIM(mapSize, startingPoint, INIT_ROBOT_DIRECTION, seed=0)
+        for targetPos in data["target"]:
+            self.__worldStateModel.addItem("target", targetPos, updatePath=False)
+            sim.addItem("target", targetPos)
+        for hazardPos in data["hazard"]:
+            self.__worldStateModel.addItem("hazard", hazardPos, updatePath=False)
+            sim.addItem("hazard", hazardPos)
+        self.__missionRunner = MissionRunner(self.__worldStateModel, sim)
+        self.__missionRunner.sense()
+
+
+def renderLoop(renderMailbox, frameRate, isDone):
+    # stands in for the tk render timer
+    worldDataMirror = WorldDataMirror()
+    while not isDone.is_set():
+        worldDelta = renderMailbox.take()
+        if worldDelta != None:
+            worldDataMirror.apply(worldDelta)
+            renderMailbox.markRendered()
+        time.sleep(1 / frameRate)
+
+
+def makeMission(size, density, seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    cells.remove((0, 0))
+    cells.remove((size - 1, size - 1))
+    hazards = rng.sample(cells, int(len(cells) * density))
+    return {
+        "mapSize": (size, size),
+        "startingPoint": (0, 0),
+        "target": [(size - 1, size - 1)],
+        "hazard": hazards,
+    }
+
+
+def measure(core, renderMailbox, mission, args):
+    rng = random.Random(args.seed)
+    isDone = threading.Event()
+    renderThread = threading.Thread(
+        target=renderLoop, args=(renderMailbox, args.frame_rate, isDone)
+    )
+    renderThread.start()
+    callerTime = 0.0
+    core.start()
+    core.postEvent("submit", mission)
+    core.postEvent("robotMove", False)
+    endTime = time.perf_counter() + args.duration
+    while time.perf_counter() < endTime:
+        time.sleep(args.voice_every)
+        size = mission["mapSize"][0]
+        pos = (rng.randrange(size), rng.randrange(size))
+        startTime = time.perf_counter()
+        core.postEvent("voiceResult", [("add", "hazard", [pos])])
+        callerTime = max(callerTime, time.perf_counter() - startTime)
+    core.postEvent("windowClose")
+    core.join(5.0)
+    isDone.set()
+    renderThread.join()
+    return (
+        core.getLatencyStatData()["voiceToMap"],
+        renderMailbox.getStatData(),
+        callerTime,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 150])
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--period", type=float, default=0.02)
+    parser.add_argument("--frame-rate", type=float, default=30)
+    parser.add_argument("--voice-every", type=float, default=0.05)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'core':>8} {'voice ms':>9} {'voice max':>10} "
+        f"{'render ms':>10} {'render max':>11} {'caller max':>11}"
+    )
+    for size in args.sizes:
+        mission = makeMission(size, args.density, args.seed)
+        for name in ("thread", "asyncio"):
+            renderMailbox = RenderMailbox()
+            if name == "thread":
+                core = LegacyControllerCore(renderMailbox, args.period)
+            else:
+                core = ControllerCore(renderMailbox, args.period)
+            voice, render, callerTime = measure(core, renderMailbox, mission, args)
+            print(
+                f"{size:>6} {name:>8} {voice['mean'] * 1000:>9.2f} "
+                f"{voice['max'] * 1000:>10.2f} {render['meanLatency'] * 1000:>10.2f} "
+                f"{render['maxLatency'] * 1000:>11.2f} {callerTime * 1000:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
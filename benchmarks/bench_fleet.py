@@ -0,0 +1,81 @@
+import argparse
+import random
+import time
+
+from mrc.model.worldModel import WorldStateModel
+from mrc.controller.sim import SIM
+from mrc.controller.missionRunner import MissionRunner
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def buildFleet(size, robotCount, targetCount, density, seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    robots = [cells.pop() for i in range(robotCount)]
+    targets = [cells.pop() for i in range(targetCount)]
+    hazards = [cells.pop() for i in range(int(size * size * density))]
+
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize((size, size), robots[0], INIT_ROBOT_DIRECTION, "astar")
+    sim = SIM((size, size), robots[0], INIT_ROBOT_DIRECTION, seed=seed)
+    for robotPos in robots[1:]:
+        worldStateModel.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+        sim.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+    for targetPos in targets:
+        worldStateModel.addItem("target", targetPos, updatePath=False)
+        sim.addItem("target", targetPos)
+    for hazardPos in hazards:
+        worldStateModel.addItem("hazard", hazardPos, updatePath=False)
+        sim.addItem("hazard", hazardPos)
+    return worldStateModel, sim
+
+
+def runFleet(size, robotCount, targetCount, density, ticks, seed):
+    worldStateModel, sim = buildFleet(size, robotCount, targetCount, density, seed)
+    missionRunner = MissionRunner(worldStateModel, sim)
+    collisions = 0
+    missionRunner.sense()
+    elapsed = 0.0
+    for tick in range(ticks):
+        startTime = time.perf_counter()
+        behaviors = missionRunner.tick()
+        elapsed += time.perf_counter() - startTime
+        if behaviors == None:
+            break
+        fleetData = worldStateModel.getWorldDelta()["worldData"]["fleetData"]
+        cells = [robotData["pos"] for robotData in fleetData.values()]
+        collisions += len(cells) - len(set(cells))
+    return elapsed, missionRunner.getTickCount(), worldStateModel, collisions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--robots", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--targets", type=int, default=200)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'robots':>7} {'ticks':>6} {'ms/tick':>8} {'us/tick/robot':>14} "
+        f"{'plans':>6} {'ms/plan':>8} {'collisions':>11}"
+    )
+    for robotCount in args.robots:
+        elapsed, ticks, worldStateModel, collisions = runFleet(
+            args.size, robotCount, args.targets, args.density, args.ticks, args.seed
+        )
+        fleetStatData = worldStateModel.getFleetStatData()
+        perTick = elapsed / max(ticks, 1)
+        print(
+            f"{robotCount:>7} {ticks:>6} {perTick * 1000:>8.2f} "
+            f"{perTick / robotCount * 1e6:>14.1f} {fleetStatData['count']:>6} "
+            f"{fleetStatData['meanTime'] * 1000:>8.3f} {collisions:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
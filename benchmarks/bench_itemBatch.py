@@ -0,0 +1,76 @@
+import argparse
+import random
+import time
+
+from mrc.model.worldModel import WorldStateModel
+from mrc.traceSys import TRACER
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def makeWorld(size, planner):
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize((size, size), (0, 0), INIT_ROBOT_DIRECTION, planner)
+    worldStateModel.addItem("target", (size - 1, size - 1))
+    worldStateModel.getNextRobotBehavior()
+    return worldStateModel
+
+
+def addOneByOne(worldStateModel, type, positions):
+    for pos in positions:
+        worldStateModel.addItem(type, pos)
+
+
+def addBatched(worldStateModel, type, positions):
+    with worldStateModel.batch():
+        worldStateModel.addItems(type, positions)
+
+
+def run(size, planner, positions, addFunc):
+    worldStateModel = makeWorld(size, planner)
+    TRACER.enable()
+    TRACER.markTick()
+    startTime = time.perf_counter()
+    addFunc(worldStateModel, "hazard", positions)
+    elapsed = time.perf_counter() - startTime
+    TRACER.markTick()
+    TRACER.disable()
+    return elapsed, TRACER.getTicks()[-1]["counters"].get("replans", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--planner", default="astar")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'hazards':>8} {'where':>8} {'single(ms)':>11} "
+        f"{'replans':>8} {'batch(ms)':>10} {'replans':>8}"
+    )
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        # hazards off the first path leave it alone, one on it forces a replan
+        pathData = makeWorld(size, args.planner).getPathData()
+        pathCells = set(pathData)
+        cells = [
+            (x, y)
+            for x in range(size)
+            for y in range(size - 1)
+            if (x, y) not in pathCells
+        ]
+        offPath = rng.sample(cells, args.items)
+        onPath = offPath[:-1] + [pathData[len(pathData) // 2]]
+        for where, positions in (("off path", offPath), ("on path", onPath)):
+            singleTime, singleReplans = run(size, args.planner, positions, addOneByOne)
+            batchTime, batchReplans = run(size, args.planner, positions, addBatched)
+            print(
+                f"{size:>5} {args.items:>8} {where:>8} {singleTime * 1000:>11.2f} "
+                f"{singleReplans:>8} {batchTime * 1000:>10.2f} {batchReplans:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import random
+import time
+
+from mrc.model.mapSys import ItemFactory, Hazard
+
+
+class LegacyItemFactory:
+    # list based store that ItemFactory replaced, kept as the baseline
+    def __init__(self):
+        self.__itemStore = {}
+
+    def createItem(self, type, pos):
+        item = Hazard()
+        item.setPosition(pos)
+        if type not in self.__itemStore:
+            self.__itemStore[type] = []
+        self.__itemStore[type].append(item)
+        return item
+
+    def removeItem(self, item):
+        self.__itemStore[item.getItemName()].remove(item)
+
+    def getData(self):
+        data = {}
+        for itemName in self.__itemStore:
+            data[itemName] = []
+            for item in self.__itemStore[itemName]:
+                data[itemName].append(item.getPosition())
+        return data
+
+
+def runFactory(factory, count, ticks, seed):
+    rng = random.Random(seed)
+    items = [factory.createItem("hazard", (i, 0)) for i in range(count)]
+    startTime = time.perf_counter()
+    for tick in range(ticks):
+        factory.getData()
+    getDataTime = (time.perf_counter() - startTime) / ticks
+
+    rng.shuffle(items)
+    startTime = time.perf_counter()
+    for item in items:
+        factory.removeItem(item)
+    removeTime = (time.perf_counter() - startTime) / count
+    return getDataTime, removeTime
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'items':>6} {'legacy getData(ms)':>19} {'getData(ms)':>12} "
+        f"{'legacy remove(us)':>18} {'remove(us)':>11}"
+    )
+    for count in args.counts:
+        legacyData, legacyRemove = runFactory(
+            LegacyItemFactory(), count, args.ticks, args.seed
+        )
+        data, remove = runFactory(ItemFactory(), count, args.ticks, args.seed)
+        print(
+            f"{count:>6} {legacyData * 1e3:>19.3f} {data * 1e3:>12.3f} "
+            f"{legacyRemove * 1e6:>18.2f} {remove * 1e6:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+from mrc.controller.batchRunner import makeScenario, runEpisode
+from mrc.model.localizationSys import ParticleFilter
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def timeUpdates(size, particleCount, sensorRange, updates):
+    # a robot that drives and turns along a square, sensing an item now and then
+    particleFilter = ParticleFilter((size, size), particleCount, sensorRange, seed=0)
+    particleFilter.reset((size // 2, size // 2), INIT_ROBOT_DIRECTION)
+    hazardData = bytearray(size * size)
+    sensedData = bytearray(size * size)
+    startTime = time.perf_counter()
+    for k in range(updates):
+        behavior = "rotate" if k % 8 == 7 else "move"
+        particleFilter.predict(behavior)
+        pos, dir, confidence = particleFilter.getEstimate()
+        sensed = []
+        if k % 3 == 0:
+            sensed = [(pos[0] + dir[0], pos[1] + dir[1])]
+        particleFilter.correct(sensed, hazardData, sensedData)
+        particleFilter.getEstimate()
+    return (time.perf_counter() - startTime) / updates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--particles", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--sensor-range", type=int, default=None)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'particles':>10} {'update(us)':>11} {'poseMatch':>10}")
+    for particleCount in args.particles:
+        updateTime = timeUpdates(
+            args.size, particleCount, args.sensor_range or 1, args.updates
+        )
+        results = [
+            runEpisode(
+                makeScenario(seed, (args.size, args.size)),
+                sensorRange=args.sensor_range,
+                particleCount=particleCount,
+            )
+            for seed in range(args.episodes)
+        ]
+        poseMatchRate = sum(r["poseMatchRate"] for r in results) / len(results)
+        print(f"{particleCount:>10} {updateTime * 1e6:>11.1f} {poseMatchRate:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import logging
+import time
+
+from mrc.logSys import LogPipeline, StructuredFormatter, LOG_ROOT, getLogger
+from mrc.controller.missionRunner import MissionRunner
+
+from .scenario import makeGridScenario
+from .suite import buildWorld
+
+logger = getLogger(__name__)
+
+
+class SlowStream:
+    # stands in for a piped stdout whose reader falls behind
+    def __init__(self, writeDelay):
+        self.__writeDelay = writeDelay
+        self.__lineCount = 0
+
+    def write(self, text):
+        time.sleep(self.__writeDelay)
+        self.__lineCount += text.count("\n")
+
+    def flush(self):
+        pass
+
+    def getLineCount(self):
+        return self.__lineCount
+
+
+def runMission(scenario, ticks):
+    worldStateModel, sim = buildWorld(scenario, "astar")
+    missionRunner = MissionRunner(worldStateModel, sim)
+    missionRunner.sense()
+    tickTimes = []
+    for tick in range(ticks):
+        startTime = time.perf_counter()
+        behavior = missionRunner.tick()
+        logger.debug("behavior", extra={"fields": {"behavior": behavior}})
+        worldStateModel.logRobotStat()
+        tickTimes.append(time.perf_counter() - startTime)
+        if behavior == None:
+            break
+    return tickTimes
+
+
+def measure(mode, scenario, args):
+    stream = SlowStream(args.write_delay)
+    rootLogger = logging.getLogger(LOG_ROOT)
+    if mode == "sync":
+        # what print() did: the tick thread waits for every write
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(StructuredFormatter())
+        rootLogger.addHandler(handler)
+        rootLogger.setLevel(args.level)
+        tickTimes = runMission(scenario, args.ticks)
+        rootLogger.removeHandler(handler)
+        statData = {"dropped": 0, "suppressed": 0}
+    else:
+        logPipeline = LogPipeline(args.level, stream=stream, rate=args.rate)
+        logPipeline.start()
+        tickTimes = runMission(scenario, args.ticks)
+        statData = logPipeline.getStatData()
+        logPipeline.stop()
+    return tickTimes, stream.getLineCount(), statData
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--density", type=float, default=0.05)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--level", default="DEBUG")
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--write-delay", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenario = makeGridScenario(args.size, args.density, args.seed)
+    print(
+        f"{'mode':>6} {'ticks':>6} {'mean(ms)':>9} {'max(ms)':>8} {'lines':>6} "
+        f"{'dropped':>8} {'suppressed':>11}"
+    )
+    for mode in ("sync", "queue"):
+        tickTimes, lineCount, statData = measure(mode, scenario, args)
+        print(
+            f"{mode:>6} {len(tickTimes):>6} "
+            f"{sum(tickTimes) / len(tickTimes) * 1000:>9.3f} "
+            f"{max(tickTimes) * 1000:>8.3f} {lineCount:>6} "
+            f"{statData['dropped']:>8} {statData['suppressed']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+import tracemalloc
+
+from mrc.model.mapSys import LatticeMap2D
+
+
+class LegacyCell:
+    # one object per grid square, as LatticeMap2D stored cells before
+    def __init__(self, x, y):
+        self.__x = x
+        self.__y = y
+        self.__item = None
+        self.__visited = False
+
+
+def buildLegacy(size):
+    return [[LegacyCell(i, j) for i in range(size)] for j in range(size)]
+
+
+def buildCompact(size):
+    return LatticeMap2D(size, size)
+
+
+def measure(build, size):
+    startTime = time.perf_counter()
+    build(size)
+    elapsed = time.perf_counter() - startTime
+
+    tracemalloc.start()
+    map = build(size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del map
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 4000]
+    )
+    parser.add_argument("--legacy-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'legacy(s)':>10} {'legacy(MB)':>11} "
+        f"{'compact(s)':>11} {'compact(MB)':>12}"
+    )
+    for size in args.sizes:
+        if size <= args.legacy_max:
+            legacyTime, legacyMemory = measure(buildLegacy, size)
+            legacy = f"{legacyTime:>10.4f} {legacyMemory:>11.1f}"
+        else:
+            legacy = f"{'-':>10} {'-':>11}"
+        compactTime, compactMemory = measure(buildCompact, size)
+        print(f"{size:>6} {legacy} {compactTime:>11.4f} {compactMemory:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
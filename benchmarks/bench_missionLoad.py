@@ -0,0 +1,119 @@
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from mrc.model.worldModel import WorldStateModel
+from mrc.controller.sim import SIM
+from mrc.controller.missionSys import makeMission, saveMission, loadMission
+from mrc.controller.missionSys import applyMission
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def makeRandomMission(size, density, seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(size) for y in range(size) if (x, y) != (0, 0)]
+    rng.shuffle(cells)
+    hazardCount = int(len(cells) * density)
+    # a binary file gives the hazards back in row order
+    hazard = sorted(cells[:hazardCount], key=lambda pos: (pos[1], pos[0]))
+    return makeMission(
+        (size, size), (0, 0), cells[hazardCount : hazardCount + 10], hazard
+    )
+
+
+def toFormText(positions):
+    return "(" + "".join(f"({x} {y})" for x, y in positions) + ")"
+
+
+def loadForm(formData):
+    # what the setup form does: validate and parse the text, then add the
+    # items one at a time
+    doubleTuplePattern = r"\((\((\d+)\s(\d+)\))*\)"
+    data = {"mapSize": formData["mapSize"], "startingPoint": formData["startingPoint"]}
+    for name in ("target", "hazard"):
+        text = formData[name]
+        if not re.fullmatch(doubleTuplePattern, text):
+            raise ValueError(f"invalid value: {name}")
+        integers = [int(match) for match in re.findall(r"\b\d+\b", text)]
+        data[name] = [
+            (integers[i], integers[i + 1]) for i in range(0, len(integers) - 1, 2)
+        ]
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize(
+        data["mapSize"], data["startingPoint"], INIT_ROBOT_DIRECTION
+    )
+    sim = SIM(data["mapSize"], data["startingPoint"], INIT_ROBOT_DIRECTION, seed=0)
+    for name in ("target", "hazard"):
+        for pos in data[name]:
+            worldStateModel.addItem(name, pos, updatePath=False)
+            sim.addItem(name, pos)
+    return worldStateModel
+
+
+def loadFile(path):
+    mission = loadMission(path)
+    worldStateModel = WorldStateModel()
+    sim = SIM(
+        mission["mapSize"], mission["startingPoint"], INIT_ROBOT_DIRECTION, seed=0
+    )
+    applyMission(mission, worldStateModel, sim)
+    return worldStateModel
+
+
+def measure(func, repeat):
+    times = []
+    for k in range(repeat):
+        startTime = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - startTime)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'hazards':>8} {'form(ms)':>9} {'yaml(ms)':>9} "
+        f"{'binary(ms)':>11} {'yaml(KB)':>9} {'binary(KB)':>11}"
+    )
+    with tempfile.TemporaryDirectory() as missionDir:
+        for size in args.sizes:
+            mission = makeRandomMission(size, args.density, args.seed)
+            formData = {
+                "mapSize": mission["mapSize"],
+                "startingPoint": mission["startingPoint"],
+                "target": toFormText(mission["target"]),
+                "hazard": toFormText(mission["hazard"]),
+            }
+            yamlPath = os.path.join(missionDir, f"{size}.yml")
+            binaryPath = os.path.join(missionDir, f"{size}.mis")
+            saveMission(mission, yamlPath)
+            saveMission(mission, binaryPath)
+
+            # the three ways must end in the same world
+            snapshot = loadForm(formData).getSnapshot()
+            assert loadFile(yamlPath).getSnapshot() == snapshot
+            assert loadFile(binaryPath).getSnapshot() == snapshot
+
+            formTime = measure(lambda: loadForm(formData), args.repeat)
+            yamlTime = measure(lambda: loadFile(yamlPath), args.repeat)
+            binaryTime = measure(lambda: loadFile(binaryPath), args.repeat)
+            print(
+                f"{size:>5} {len(mission['hazard']):>8} {formTime * 1000:>9.1f} "
+                f"{yamlTime * 1000:>9.1f} {binaryTime * 1000:>11.1f} "
+                f"{os.path.getsize(yamlPath) / 1024:>9.1f} "
+                f"{os.path.getsize(binaryPath) / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import time
+from queue import Queue
+
+from mrc.model.mapSys import PathCalculator
+from .scenario import makeScenario, buildMap
+
+
+class LegacyPathCalculator:
+    # queue.Queue based search that PathCalculator replaced, kept as the baseline
+    def __init__(self, map):
+        self.__map = map
+        width, height = map.getMapSize()
+        self.__inf = width * height
+        self.__minMove = [[self.__inf for i in range(width)] for j in range(height)]
+
+    def calculatePath(self, actor):
+        startPos = actor.getPosition()
+        goalItem = self.__map.getGoalItem()
+
+        if goalItem == None:
+            return None
+        goalPos = goalItem.getPosition()
+
+        self.__fillMinMove(startPos, goalPos)
+        return self.__getRoute(startPos, goalPos)
+
+    def __fillMinMove(self, startPos, goalPos):
+        width, height = self.__map.getMapSize()
+        for y in range(height):
+            for x in range(width):
+                self.__minMove[y][x] = self.__inf
+
+        x, y = startPos
+        q = Queue()
+        q.put((x, y, 0))
+        while not q.empty():
+            x, y, moveCnt = q.get()
+            if moveCnt >= self.__minMove[y][x]:
+                continue
+            self.__minMove[y][x] = moveCnt
+            if (x, y) == goalPos:
+                break
+            if x > 0 and self.__map.getItemName((x - 1, y)) != "hazard":
+                q.put((x - 1, y, moveCnt + 1))
+            if x < width - 1 and self.__map.getItemName((x + 1, y)) != "hazard":
+                q.put((x + 1, y, moveCnt + 1))
+            if y > 0 and self.__map.getItemName((x, y - 1)) != "hazard":
+                q.put((x, y - 1, moveCnt + 1))
+            if y < height - 1 and self.__map.getItemName((x, y + 1)) != "hazard":
+                q.put((x, y + 1, moveCnt + 1))
+
+    def __getRoute(self, startPos, goalPos):
+        x, y = goalPos
+        width, height = self.__map.getMapSize()
+
+        if self.__minMove[y][x] >= self.__inf:
+            return None
+        route = []
+        move_cnt = self.__minMove[y][x]
+        route.append((x, y))
+        while move_cnt > 0:
+            if x > 0 and self.__minMove[y][x - 1] == move_cnt - 1:
+                x -= 1
+            elif x < width - 1 and self.__minMove[y][x + 1] == move_cnt - 1:
+                x += 1
+            elif y > 0 and self.__minMove[y - 1][x] == move_cnt - 1:
+                y -= 1
+            elif y < height - 1 and self.__minMove[y + 1][x] == move_cnt - 1:
+                y += 1
+            else:
+                return None
+            route.append((x, y))
+            move_cnt -= 1
+
+        a, b = startPos
+        if x != a and y != b:
+            return None
+
+        route.reverse()
+        return route
+
+
+def timeCalculator(calculator, actor, repeat):
+    best = None
+    route = None
+    for i in range(repeat):
+        startTime = time.perf_counter()
+        route = calculator.calculatePath(actor)
+        elapsed = time.perf_counter() - startTime
+        if best == None or elapsed < best:
+            best = elapsed
+    return best, route
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500, 1000])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'legacy(s)':>10} {'array(s)':>10} {'speedup':>8} {'route':>6}")
+    for size in args.sizes:
+        scenario = makeScenario((size, size), args.density, args.seed)
+        map, actor = buildMap(scenario)
+        legacyTime, legacyRoute = timeCalculator(
+            LegacyPathCalculator(map), actor, args.repeat
+        )
+        arrayTime, arrayRoute = timeCalculator(PathCalculator(map), actor, args.repeat)
+        same = "same" if legacyRoute == arrayRoute else "DIFF"
+        print(
+            f"{size:>6} {legacyTime:>10.4f} {arrayTime:>10.4f} "
+            f"{legacyTime / arrayTime:>7.1f}x {same:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
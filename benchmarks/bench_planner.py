@@ -0,0 +1,35 @@
+import argparse
+
+from mrc.model.mapSys import PathCalculator, PLANNER_TYPES
+from .scenario import makeScenario, buildMap
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--planners", nargs="+", default=list(PLANNER_TYPES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'density':>8} {'planner':>8} {'expanded':>10} "
+        f"{'time(s)':>9} {'length':>7}"
+    )
+    for size in args.sizes:
+        for density in args.densities:
+            scenario = makeScenario((size, size), density, args.seed)
+            map, actor = buildMap(scenario)
+            for planner in args.planners:
+                calculator = PathCalculator(map, planner)
+                route = calculator.calculatePath(actor)
+                stat = calculator.getStatData()
+                length = len(route) - 1 if route != None else -1
+                print(
+                    f"{size:>6} {density:>8.2f} {planner:>8} {stat['expanded']:>10} "
+                    f"{stat['time']:>9.4f} {length:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import tempfile
+import time
+
+from mrc.controller.batchRunner import makeScenario, runEpisode
+from mrc.controller.recordSys import MissionReplayer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 64])
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument("--planner", default="astar")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'ticks':>6} {'off(us/tick)':>13} {'on(us/tick)':>12} "
+        f"{'bytes/tick':>11} {'replay(us/tick)':>16} {'seek(ms)':>9} "
+        f"{'from start(ms)':>15}"
+    )
+    with tempfile.TemporaryDirectory() as recordDir:
+        for size in args.sizes:
+            hazardCount = size * size // 5
+            totals = [0, 0.0, 0.0, 0, 0.0, 0.0, 0.0]
+            for episode in range(args.episodes):
+                scenario = makeScenario(
+                    args.seed + episode, (size, size), 3, hazardCount
+                )
+                recordPath = os.path.join(recordDir, f"{size}-{episode}.mrec")
+                off = runEpisode(scenario, args.planner)
+                on = runEpisode(scenario, args.planner, recordPath=recordPath)
+
+                missionReplayer = MissionReplayer(recordPath)
+                startTime = time.perf_counter()
+                missionReplayer.replay()
+                replayTime = time.perf_counter() - startTime
+                tick = missionReplayer.getTickCount() * 3 // 4
+                startTime = time.perf_counter()
+                missionReplayer.seek(tick)
+                seekTime = time.perf_counter() - startTime
+                startTime = time.perf_counter()
+                missionReplayer.replay(toTick=tick)
+                fromStartTime = time.perf_counter() - startTime
+                missionReplayer.close()
+
+                totals[0] += on["ticks"]
+                totals[1] += off["time"]
+                totals[2] += on["time"]
+                totals[3] += os.path.getsize(recordPath)
+                totals[4] += replayTime
+                totals[5] += seekTime
+                totals[6] += fromStartTime
+            ticks = max(totals[0], 1)
+            print(
+                f"{size:>5} {ticks:>6} {totals[1] / ticks * 1e6:>13.1f} "
+                f"{totals[2] / ticks * 1e6:>12.1f} {totals[3] / ticks:>11.1f} "
+                f"{totals[4] / ticks * 1e6:>16.1f} "
+                f"{totals[5] / args.episodes * 1000:>9.3f} "
+                f"{totals[6] / args.episodes * 1000:>15.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
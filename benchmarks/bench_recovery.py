@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+
+from .scenario import makeScenario, buildMap
+
+
+def runRecoveries(scenario, planner, count, seed):
+    rng = random.Random(seed)
+    map, actor = buildMap(scenario)
+    map.setPlanner(planner)
+    map.getPath(actor)
+    map.getNextStep(actor.getPosition())
+    width, height = scenario["mapSize"]
+    replanTime = 0.0
+    stepTime = 0.0
+    for i in range(count):
+        # the robot slipped somewhere off its route, planning again from there
+        # against taking the next step from the distance field
+        pos = (rng.randrange(width), rng.randrange(height))
+        if map.getItemName(pos) == "hazard":
+            continue
+        actor.setPosition(pos)
+        startTime = time.perf_counter()
+        map.getPath(actor)
+        replanTime += time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        map.getNextStep(pos)
+        stepTime += time.perf_counter() - startTime
+    return replanTime / count, stepTime / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--planners", nargs="+", default=["bfs", "astar"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'planner':>8} {'replan(ms)':>11} {'step(ms)':>9}")
+    for size in args.sizes:
+        scenario = makeScenario((size, size), args.density, args.seed)
+        for planner in args.planners:
+            replanTime, stepTime = runRecoveries(
+                scenario, planner, args.count, args.seed
+            )
+            print(
+                f"{size:>6} {planner:>8} {replanTime * 1000:>11.3f} "
+                f"{stepTime * 1000:>9.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import random
+import time
+
+from .scenario import makeScenario, buildMap
+
+
+def runMission(scenario, planner, hazardEvery, seed):
+    rng = random.Random(seed)
+    map, actor = buildMap(scenario)
+    map.setPlanner(planner)
+    planTime = 0.0
+    replans = 0
+    touched = 0
+    route = map.getPath(actor)
+    step = 0
+    while route != None and len(route) > 1:
+        step += 1
+        if step % hazardEvery == 0 and len(route) > 3:
+            # a hidden hazard shows up a few cells ahead of the robot
+            ahead = route[rng.randint(2, min(len(route) - 2, 6))]
+            map.addItem("hazard", ahead)
+        else:
+            actor.setPosition(route[1])
+        startTime = time.perf_counter()
+        route = map.getPath(actor)
+        planTime += time.perf_counter() - startTime
+        replans += 1
+        touched += map.getPathStatData().get("touched", 0)
+    return planTime, replans, touched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--hazard-every", type=int, default=3)
+    parser.add_argument("--planners", nargs="+", default=["bfs", "astar", "dstar"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'planner':>8} {'replans':>8} {'time(s)':>9} "
+        f"{'ms/replan':>10} {'touched/repair':>15}"
+    )
+    for size in args.sizes:
+        scenario = makeScenario((size, size), args.density, args.seed)
+        for planner in args.planners:
+            planTime, replans, touched = runMission(
+                scenario, planner, args.hazard_every, args.seed
+            )
+            perReplan = planTime / max(replans, 1) * 1000
+            perRepair = "-"
+            if planner == "dstar":
+                perRepair = f"{touched / max(replans, 1):.1f}"
+            print(
+                f"{size:>6} {planner:>8} {replans:>8} {planTime:>9.4f} "
+                f"{perReplan:>10.3f} {perRepair:>15}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import math
+import random
+import time
+
+from mrc.controller.sensorSys import RangeSensor
+
+SENSE_DIRECTION = (1, 0)
+
+
+def senseScalar(mapRows, pos, dir, sensorRange, arc):
+    # the same field of view walked cell by cell in python, every ray is
+    # traced again on every sense
+    width, height = len(mapRows[0]), len(mapRows)
+    x, y = pos
+    dirX, dirY = dir
+    seen = []
+    for dy in range(-sensorRange, sensorRange + 1):
+        for dx in range(-sensorRange, sensorRange + 1):
+            distance = math.hypot(dx, dy)
+            if distance == 0 or distance > sensorRange:
+                continue
+            if arc < 360:
+                cosine = (dx * dirX + dy * dirY) / distance
+                angle = math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
+                if angle > arc / 2 + 1e-9:
+                    continue
+            cellX, cellY = x + dx, y + dy
+            if cellX < 0 or cellX >= width or cellY < 0 or cellY >= height:
+                continue
+            steps = max(abs(dx), abs(dy))
+            for k in range(1, steps):
+                rayX = x + math.floor(dx * k / steps + 0.5)
+                rayY = y + math.floor(dy * k / steps + 0.5)
+                if mapRows[rayY][rayX] == 1:
+                    break
+            else:
+                seen.append((cellX, cellY))
+    return seen
+
+
+def makeMap(size, density, rng):
+    mapRows = [bytearray(size) for j in range(size)]
+    for k in range(int(size * size * density)):
+        mapRows[rng.randrange(size)][rng.randrange(size)] = 1
+    return mapRows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--ranges", type=int, nargs="+", default=[5, 10, 15])
+    parser.add_argument("--arc", type=float, default=360)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--senses", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mapRows = makeMap(args.size, args.density, rng)
+    positions = [
+        (rng.randrange(args.size), rng.randrange(args.size)) for k in range(args.senses)
+    ]
+    print(
+        f"{'range':>6} {'cells':>6} {'scalar(us)':>11} {'table(us)':>10} "
+        f"{'speedup':>8} {'match':>6}"
+    )
+    for sensorRange in args.ranges:
+        startTime = time.perf_counter()
+        scalarSeen = [
+            senseScalar(mapRows, pos, SENSE_DIRECTION, sensorRange, args.arc)
+            for pos in positions
+        ]
+        scalarTime = (time.perf_counter() - startTime) / args.senses
+
+        # a fresh sensor per sense would report everything, so the cells seen
+        # are compared on the first sense and the time is taken over all of them
+        sensor = RangeSensor(sensorRange, args.arc)
+        sensor.setMap(mapRows)
+        startTime = time.perf_counter()
+        for pos in positions:
+            sensor.sense(pos, SENSE_DIRECTION)
+        tableTime = (time.perf_counter() - startTime) / args.senses
+
+        isMatch = True
+        for pos, seen in list(zip(positions, scalarSeen))[:50]:
+            sensor = RangeSensor(sensorRange, args.arc)
+            sensor.setMap(mapRows)
+            addedItem, observed = sensor.sense(pos, SENSE_DIRECTION)
+            isMatch = isMatch and sorted(observed) == sorted(seen)
+        print(
+            f"{sensorRange:>6} {sensor.getCellCount(SENSE_DIRECTION):>6} "
+            f"{scalarTime * 1e6:>11.1f} {tableTime * 1e6:>10.1f} "
+            f"{scalarTime / tableTime:>7.1f}x {str(isMatch):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+
+from mrc.model.worldModel import WorldStateModel
+
+
+def runMission(mapSize, goals, hazards, goalOrder, maxTicks):
+    model = WorldStateModel()
+    model.initialize(mapSize, (0, 0), (0, 1), goalOrder=goalOrder)
+    for pos in hazards:
+        model.addItem("hazard", pos, updatePath=False)
+    for type, pos in goals:
+        model.addItem(type, pos, updatePath=False)
+
+    moves = 0
+    rotates = 0
+    startTime = time.perf_counter()
+    for tick in range(maxTicks):
+        behavior = model.getNextRobotBehavior()
+        if behavior == None:
+            break
+        if behavior == "move":
+            model.moveRobot()
+            moves += 1
+        elif behavior == "rotate":
+            model.rotateRobot()
+            rotates += 1
+    return moves, rotates, time.perf_counter() - startTime
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--targets", type=int, default=30)
+    parser.add_argument("--blobs", type=int, default=5)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cells = [(x, y) for y in range(args.size) for x in range(args.size)]
+    cells.remove((0, 0))
+    rng.shuffle(cells)
+    goalCount = args.targets + args.blobs
+    goals = [("blob", pos) for pos in cells[: args.blobs]]
+    goals += [("target", pos) for pos in cells[args.blobs : goalCount]]
+    hazards = [pos for pos in cells[goalCount:] if rng.random() < args.density]
+
+    print(f"{'order':>10} {'moves':>7} {'rotates':>8} {'ticks':>7} {'time(s)':>8}")
+    for goalOrder in ("insertion", "tour"):
+        moves, rotates, elapsed = runMission(
+            (args.size, args.size), goals, hazards, goalOrder, args.size**3
+        )
+        print(
+            f"{goalOrder:>10} {moves:>7} {rotates:>8} {moves + rotates:>7} "
+            f"{elapsed:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import time
+
+from mrc.traceSys import TRACER
+from mrc.controller.missionRunner import MissionRunner
+
+from .scenario import makeGridScenario
+from .suite import buildWorld
+
+
+def runMission(scenario, ticks, isTracing):
+    worldStateModel, sim = buildWorld(scenario, "astar")
+    missionRunner = MissionRunner(worldStateModel, sim)
+    if isTracing:
+        TRACER.enable()
+    else:
+        TRACER.disable()
+    missionRunner.sense()
+    startTime = time.perf_counter()
+    for tick in range(ticks):
+        if missionRunner.tick() == None:
+            break
+    elapsed = time.perf_counter() - startTime
+    TRACER.disable()
+    return elapsed / max(missionRunner.getTickCount(), 1)
+
+
+def measureSpan(number):
+    startTime = time.perf_counter()
+    for k in range(number):
+        spanStart = TRACER.startSpan()
+        TRACER.endSpan("bench", spanStart)
+    return (time.perf_counter() - startTime) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 128])
+    parser.add_argument("--density", type=float, default=0.05)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    TRACER.disable()
+    disabledSpan = min(measureSpan(100000) for k in range(args.repeat))
+    TRACER.enable()
+    enabledSpan = min(measureSpan(100000) for k in range(args.repeat))
+    TRACER.disable()
+    print(f"span off {disabledSpan * 1e9:.0f} ns, on {enabledSpan * 1e9:.0f} ns")
+
+    print(f"{'size':>6} {'off(us/tick)':>13} {'on(us/tick)':>12} {'overhead':>9}")
+    for size in args.sizes:
+        scenario = makeGridScenario(size, args.density, args.seed)
+        off = min(runMission(scenario, args.ticks, False) for k in range(args.repeat))
+        on = min(runMission(scenario, args.ticks, True) for k in range(args.repeat))
+        print(
+            f"{size:>6} {off * 1e6:>13.1f} {on * 1e6:>12.1f} "
+            f"{(on - off) / off * 100:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from mrc.view.voiceRcgSys import VoicePipeline, FixtureSource, FixtureBackend
+
+
+def runBlocking(phrases, calibrate, speech, recognize):
+    # the old button handler: open, calibrate, listen and recognize on the
+    # calling thread for every command
+    source = FixtureSource(phrases, speech)
+    backend = FixtureBackend(recognize)
+    blockedTimes = []
+    commandTimes = []
+    for phrase in phrases:
+        startTime = time.perf_counter()
+        source.open()
+        time.sleep(calibrate)
+        audio = source.listen()
+        audioTime = time.perf_counter()
+        backend.recognize(audio)
+        source.close()
+        endTime = time.perf_counter()
+        blockedTimes.append(endTime - startTime)
+        commandTimes.append(endTime - audioTime)
+    return blockedTimes, commandTimes
+
+
+def runPipeline(phrases, calibrate, speech, recognize):
+    # the source is calibrated once when the pipeline starts
+    source = FixtureSource(phrases, speech)
+    voicePipeline = VoicePipeline(FixtureBackend(recognize), source)
+    voicePipeline.start()
+    time.sleep(calibrate)
+    blockedTimes = []
+    commandTimes = []
+    for phrase in phrases:
+        startTime = time.perf_counter()
+        voicePipeline.requestCommand()
+        blockedTimes.append(time.perf_counter() - startTime)
+        result = voicePipeline.getResult()
+        commandTimes.append(time.perf_counter() - result["audioTime"])
+    voicePipeline.stop()
+    return blockedTimes, commandTimes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commands", type=int, default=10)
+    parser.add_argument("--calibrate", type=float, default=1.0)
+    parser.add_argument("--speech", type=float, default=0.2)
+    parser.add_argument("--recognize", type=float, default=0.3)
+    args = parser.parse_args()
+
+    phrases = [f"hazard {k} {k}" for k in range(args.commands)]
+    print(
+        f"{'mode':>9} {'blocked ms':>11} {'blocked max':>12} "
+        f"{'command ms':>11} {'command max':>12}"
+    )
+    for mode, run in (("blocking", runBlocking), ("pipeline", runPipeline)):
+        blockedTimes, commandTimes = run(
+            phrases, args.calibrate, args.speech, args.recognize
+        )
+        print(
+            f"{mode:>9} {sum(blockedTimes) / len(blockedTimes) * 1000:>11.2f} "
+            f"{max(blockedTimes) * 1000:>12.2f} "
+            f"{sum(commandTimes) / len(commandTimes) * 1000:>11.2f} "
+            f"{max(commandTimes) * 1000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+
+from mrc.model.worldModel import WorldStateModel
+from mrc.controller.commandSys import parseCommand, applyCommand, CommandHistory
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def makeWorld(size, planner):
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize((size, size), (0, 0), INIT_ROBOT_DIRECTION, planner)
+    worldStateModel.addItem("target", (size - 1, size - 1))
+    return worldStateModel
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--length", type=int, default=20)
+    parser.add_argument("--planner", default="astar")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>5} {'items':>6} {'parse(us)':>10} {'single(ms)':>11} "
+        f"{'batched(ms)':>12} {'undo(ms)':>9} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        # a wall across the middle row, said once or one cell at a time
+        y = size // 2
+        text = f"hazard row {y} from 0 to {args.length - 1}"
+        singleTexts = [f"hazard {x} {y}" for x in range(args.length)]
+
+        startTime = time.perf_counter()
+        for k in range(1000):
+            parseCommand(text)
+        parseTime = (time.perf_counter() - startTime) / 1000
+
+        singleTime = batchedTime = undoTime = float("inf")
+        for k in range(args.repeat):
+            worldStateModel = makeWorld(size, args.planner)
+            commands = [parseCommand(singleText) for singleText in singleTexts]
+            startTime = time.perf_counter()
+            for command in commands:
+                applyCommand(command, worldStateModel)
+            singleTime = min(singleTime, time.perf_counter() - startTime)
+
+            worldStateModel = makeWorld(size, args.planner)
+            commandHistory = CommandHistory()
+            command = parseCommand(text)
+            startTime = time.perf_counter()
+            applyCommand(command, worldStateModel, commandHistory)
+            batchedTime = min(batchedTime, time.perf_counter() - startTime)
+            startTime = time.perf_counter()
+            applyCommand(parseCommand("undo"), worldStateModel, commandHistory)
+            undoTime = min(undoTime, time.perf_counter() - startTime)
+        print(
+            f"{size:>5} {args.length:>6} {parseTime * 1e6:>10.1f} "
+            f"{singleTime * 1000:>11.2f} {batchedTime * 1000:>12.2f} "
+            f"{undoTime * 1000:>9.2f} {singleTime / batchedTime:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
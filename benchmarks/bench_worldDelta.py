@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from mrc.model.worldModel import WorldStateModel, WorldDataMirror
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'getWorldData(ms)':>17} {'getWorldDelta(ms)':>18}")
+    for size in args.sizes:
+        model = WorldStateModel()
+        model.initialize((size, size), (0, 0), (1, 0))
+        mirror = WorldDataMirror()
+        mirror.apply(model.getWorldDelta())
+
+        fullTime = 0.0
+        deltaTime = 0.0
+        for tick in range(args.ticks):
+            # one visited cell and one pose change per tick, as the robot moves
+            model.setRobotPosition((tick % size, tick // size))
+            startTime = time.perf_counter()
+            model.getWorldData()
+            fullTime += time.perf_counter() - startTime
+
+            startTime = time.perf_counter()
+            mirror.apply(model.getWorldDelta(mirror.getVersion()))
+            deltaTime += time.perf_counter() - startTime
+        print(
+            f"{size:>6} {fullTime / args.ticks * 1e3:>17.3f} "
+            f"{deltaTime / args.ticks * 1e3:>18.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
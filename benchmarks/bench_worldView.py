@@ -0,0 +1,145 @@
+import argparse
+import random
+import time
+import tkinter as tk
+
+from PIL import Image, ImageTk
+
+from mrc.view.worldView import WorldView
+
+CELL_SIZE = 80
+ICON_SIZE = 40
+MAP_MARGIN = 20
+ITEM_IMG_SRC = {
+    "robot_down": "mrc/resources/robot_down_icon.png",
+    "hazard": "mrc/resources/hazard_icon.png",
+    "blob": "mrc/resources/colorBlob_icon.png",
+    "target": "mrc/resources/goal_icon.png",
+}
+
+
+def legacyDrawMap(canvas, mapSize, worldData):
+    # full redraw that WorldView.drawMap did before the retained renderer
+    cols, rows = mapSize
+    canvas.image_references = []
+    canvas.delete("all")
+    for i in range(cols):
+        for j in range(rows):
+            if not worldData["visitedData"][j][i]:
+                x = i * CELL_SIZE + MAP_MARGIN
+                y = j * CELL_SIZE + MAP_MARGIN
+                canvas.create_rectangle(
+                    x - CELL_SIZE / 2,
+                    y - CELL_SIZE / 2,
+                    x + CELL_SIZE / 2,
+                    y + CELL_SIZE / 2,
+                    fill="gray",
+                    outline="",
+                )
+    for j in range(rows):
+        y = j * CELL_SIZE + MAP_MARGIN
+        canvas.create_line(
+            MAP_MARGIN, y, (cols - 1) * CELL_SIZE + MAP_MARGIN, y, fill="black"
+        )
+    for i in range(cols):
+        x = i * CELL_SIZE + MAP_MARGIN
+        canvas.create_line(
+            x, MAP_MARGIN, x, (rows - 1) * CELL_SIZE + MAP_MARGIN, fill="black"
+        )
+    items = [
+        (type, pos)
+        for type in ("target", "blob", "hazard")
+        for pos in worldData["itemData"].get(type, [])
+    ]
+    items.append(("robot_down", worldData["robotData"]["pos"]))
+    for type, (x, y) in items:
+        img = Image.open(ITEM_IMG_SRC[type]).resize((ICON_SIZE, ICON_SIZE))
+        image = ImageTk.PhotoImage(img)
+        canvas.create_image(
+            x * CELL_SIZE + MAP_MARGIN,
+            y * CELL_SIZE + MAP_MARGIN,
+            anchor=tk.CENTER,
+            image=image,
+        )
+        canvas.image_references.append(image)
+
+
+def makeFrames(size, itemCount, frameCount, seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    visitedData = [[False] * size for i in range(size)]
+    itemData = {
+        "hazard": cells[: itemCount // 2],
+        "target": cells[itemCount // 2 : itemCount],
+    }
+    frames = []
+    for k in range(frameCount):
+        # the robot walks along the rows and uncovers one cell per frame
+        pos = (k % size, (k // size) % size)
+        visitedData = [row[:] for row in visitedData]
+        visitedData[pos[1]][pos[0]] = True
+        frames.append(
+            {
+                "visitedData": visitedData,
+                "itemData": itemData,
+                "robotData": {"pos": pos, "dir": (0, 1)},
+            }
+        )
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    worldView = WorldView()
+    # the legacy canvas shares the Tk root created by WorldView
+    canvas = tk.Canvas()
+    root = canvas.winfo_toplevel()
+    root.withdraw()
+
+    print(f"{'size':>6} {'full redraw(ms)':>16} {'retained(ms)':>13} {'delta(ms)':>10}")
+    for size in args.sizes:
+        frames = makeFrames(size, min(args.items, size * size), args.frames, args.seed)
+
+        startTime = time.perf_counter()
+        for worldData in frames:
+            legacyDrawMap(canvas, (size, size), worldData)
+            root.update_idletasks()
+        legacyTime = (time.perf_counter() - startTime) / len(frames)
+
+        worldView.initialize((size, size))
+        startTime = time.perf_counter()
+        for worldData in frames:
+            worldView.drawMap(worldData)
+            root.update_idletasks()
+        retainedTime = (time.perf_counter() - startTime) / len(frames)
+
+        # the render timer passes the delta, so only the uncovered cell is cleared
+        worldView.initialize((size, size))
+        worldView.drawMap(frames[0])
+        startTime = time.perf_counter()
+        for worldData in frames:
+            worldDelta = {
+                "full": False,
+                "visited": [worldData["robotData"]["pos"]],
+                "observed": [],
+            }
+            worldView.drawMap(worldData, worldDelta)
+            root.update_idletasks()
+        deltaTime = (time.perf_counter() - startTime) / len(frames)
+
+        print(
+            f"{size:>6} {legacyTime * 1e3:>16.2f} {retainedTime * 1e3:>13.2f} "
+            f"{deltaTime * 1e3:>10.2f}"
+        )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+
+
+def loadResults(path):
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    results = {}
+    for entry in report["results"]:
+        if "skipped" not in entry:
+            results[(entry["case"], entry["size"], entry["density"])] = entry
+    return report["meta"], results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--stat", choices=["min", "median", "mean"], default="min")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    baseMeta, baseResults = loadResults(args.base)
+    newMeta, newResults = loadResults(args.new)
+    print(f"base: {baseMeta.get('commit')} {baseMeta.get('timestamp')}")
+    print(f"new:  {newMeta.get('commit')} {newMeta.get('timestamp')}")
+    print(
+        f"{'case':<20} {'size':>6} {'density':>8} {'base(ms)':>10} "
+        f"{'new(ms)':>10} {'change':>8}"
+    )
+
+    regressions = 0
+    for key in sorted(baseResults.keys() & newResults.keys()):
+        case, size, density = key
+        base = baseResults[key][args.stat]
+        new = newResults[key][args.stat]
+        change = (new - base) / base if base > 0 else 0.0
+        mark = ""
+        if change > args.threshold:
+            mark = " slower"
+            regressions += 1
+        elif change < -args.threshold:
+            mark = " faster"
+        print(
+            f"{case:<20} {size:>6} {density:>8.2f} {base * 1e3:>10.4f} "
+            f"{new * 1e3:>10.4f} {change * 100:>7.1f}%{mark}"
+        )
+    for key in sorted(baseResults.keys() ^ newResults.keys()):
+        print(f"{key[0]:<20} {key[1]:>6} {key[2]:>8.2f} only in one run")
+
+    sys.exit(1 if regressions > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
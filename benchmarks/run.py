@@ -0,0 +1,81 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from .suite import PROFILES, CASES, BenchmarkContext, getCaseNames, runCase
+
+
+def getGitCommit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--densities", type=float, nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--cases", nargs="+", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-limit", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    sizes = args.sizes or profile["sizes"]
+    densities = args.densities or profile["densities"]
+    repeat = args.repeat or profile["repeat"]
+    cases = CASES
+    if args.cases != None:
+        unknown = set(args.cases) - set(getCaseNames())
+        if unknown:
+            raise ValueError(f"unknown case: {', '.join(sorted(unknown))}")
+        cases = [case for case in CASES if case[0] in args.cases]
+
+    context = BenchmarkContext(args.seed)
+    results = []
+    print(f"{'case':<20} {'size':>6} {'density':>8} {'min(ms)':>10} {'median(ms)':>11}")
+    for size in sizes:
+        for density in densities:
+            for case in cases:
+                entry = runCase(context, case, size, density, repeat, args.no_limit)
+                results.append(entry)
+                if "skipped" in entry:
+                    timing = f"{'skipped: ' + entry['skipped']}"
+                else:
+                    timing = (
+                        f"{entry['min'] * 1e3:>10.4f} {entry['median'] * 1e3:>11.4f}"
+                    )
+                print(f"{entry['case']:<20} {size:>6} {density:>8.2f} {timing}")
+                sys.stdout.flush()
+
+    report = {
+        "meta": {
+            "profile": args.profile,
+            "seed": args.seed,
+            "repeat": repeat,
+            "commit": getGitCommit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output != None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
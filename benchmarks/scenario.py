@@ -0,0 +1,59 @@
+import random
+
+from mrc.model.worldModel import LatticeMap2D, LatticeMap2DActor
+
+
+def makeScenario(mapSize, hazardDensity=0.2, seed=0):
+    rng = random.Random(seed)
+    width, height = mapSize
+    start = (0, 0)
+    goal = (width - 1, height - 1)
+    hazards = []
+    for y in range(height):
+        for x in range(width):
+            if (x, y) != start and (x, y) != goal and rng.random() < hazardDensity:
+                hazards.append((x, y))
+    return {
+        "mapSize": mapSize,
+        "start": start,
+        "goal": goal,
+        "hazard": hazards,
+    }
+
+
+def buildMap(scenario):
+    width, height = scenario["mapSize"]
+    map = LatticeMap2D(width, height)
+    for pos in scenario["hazard"]:
+        map.addItem("hazard", pos)
+    map.addItem("target", scenario["goal"])
+    actor = LatticeMap2DActor(map)
+    actor.setPosition(scenario["start"])
+    actor.setDirection((0, 1))
+    return map, actor
+
+
+def makeGridScenario(size, hazardDensity=0.2, seed=0):
+    # same shape as makeScenario but drawn one byte per cell, so even a
+    # 4096x4096 grid is generated in well under a second
+    rng = random.Random(seed)
+    cellCount = size * size
+    threshold = int(hazardDensity * 256)
+    table = bytes(1 if b < threshold else 0 for b in range(256))
+    mask = bytearray(rng.randbytes(cellCount).translate(table))
+    start = (0, 0)
+    goal = (size - 1, size - 1)
+    mask[0] = 0
+    mask[cellCount - 1] = 0
+    hazards = []
+    i = mask.find(1)
+    while i >= 0:
+        hazards.append((i % size, i // size))
+        i = mask.find(1, i + 1)
+    return {
+        "mapSize": (size, size),
+        "start": start,
+        "goal": goal,
+        "hazard": hazards,
+        "seed": seed,
+    }
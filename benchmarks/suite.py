@@ -0,0 +1,220 @@
+import logging
+import statistics
+import time
+
+from mrc.logSys import LOG_ROOT
+from mrc.model.worldModel import WorldStateModel
+from mrc.model.mapSys import LatticeMap2D, ItemFactory
+from mrc.controller.sim import SIM
+from mrc.controller.missionRunner import MissionRunner
+
+from .scenario import makeGridScenario, buildMap
+
+PROFILES = {
+    "quick": {"sizes": [5, 64, 256], "densities": [0.0, 0.2], "repeat": 5},
+    "full": {"sizes": [5, 64, 512, 4096], "densities": [0.0, 0.1, 0.3], "repeat": 3},
+}
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def measure(func, repeat, number=1, setup=None):
+    # func runs number times per sample, setup runs untimed before each sample
+    samples = []
+    for k in range(repeat):
+        state = setup() if setup != None else None
+        startTime = time.perf_counter()
+        for n in range(number):
+            func(state)
+        samples.append((time.perf_counter() - startTime) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+class BenchmarkContext:
+    # scenarios and maps are built once per (size, density) and shared by the
+    # cases that only read them
+    def __init__(self, seed):
+        self.__seed = seed
+        self.__scenarios = {}
+        self.__maps = {}
+        self.__worldView = None
+        self.__viewError = None
+
+    def getSeed(self):
+        return self.__seed
+
+    def getScenario(self, size, density):
+        key = (size, density)
+        if key not in self.__scenarios:
+            self.__scenarios.clear()
+            self.__maps.clear()
+            self.__scenarios[key] = makeGridScenario(size, density, self.__seed)
+        return self.__scenarios[key]
+
+    def getMap(self, size, density):
+        key = (size, density)
+        if key not in self.__maps:
+            self.__maps[key] = buildMap(self.getScenario(size, density))
+        return self.__maps[key]
+
+    def getWorldView(self):
+        if self.__worldView == None and self.__viewError == None:
+            try:
+                import tkinter as tk
+                from mrc.view.worldView import WorldView
+
+                self.__worldView = WorldView()
+                tk.Canvas().winfo_toplevel().withdraw()
+            except Exception as e:
+                self.__viewError = f"{type(e).__name__}: {e}"
+        if self.__worldView == None:
+            raise RuntimeError(self.__viewError)
+        return self.__worldView
+
+
+def runPath(context, size, density, repeat, planner):
+    map, actor = context.getMap(size, density)
+    map.setPlanner(planner)
+    result = measure(lambda state: map.getPath(actor), repeat)
+    result["found"] = map.getPath(actor) != None
+    return result
+
+
+def runMapBuild(context, size, density, repeat):
+    return measure(lambda state: LatticeMap2D(size, size), repeat)
+
+
+def runVisitedData(context, size, density, repeat):
+    map, actor = context.getMap(size, density)
+    return measure(lambda state: map.getVisitedData(), repeat)
+
+
+def fillItemFactory(scenario):
+    itemFactory = ItemFactory()
+    items = [itemFactory.createItem("hazard", pos) for pos in scenario["hazard"]]
+    items.append(itemFactory.createItem("target", scenario["goal"]))
+    return itemFactory, items
+
+
+def runItemGetData(context, size, density, repeat):
+    itemFactory, items = fillItemFactory(context.getScenario(size, density))
+
+    def touch():
+        # one add and remove so the next getData rebuilds the changed type
+        itemFactory.removeItem(itemFactory.createItem("blob", (0, 0)))
+
+    return measure(lambda state: itemFactory.getData(), repeat, setup=touch)
+
+
+def runItemRemove(context, size, density, repeat):
+    scenario = context.getScenario(size, density)
+    number = max(1, min(1000, len(scenario["hazard"])))
+
+    def setup():
+        itemFactory, items = fillItemFactory(scenario)
+        return itemFactory, iter(items[:number])
+
+    def remove(state):
+        itemFactory, items = state
+        itemFactory.removeItem(next(items))
+
+    return measure(remove, repeat, number, setup)
+
+
+def buildWorld(scenario, planner="bfs"):
+    size = scenario["mapSize"][0]
+    worldStateModel = WorldStateModel()
+    sim = SIM((size, size), scenario["start"], INIT_ROBOT_DIRECTION, seed=0)
+    worldStateModel.initialize(
+        (size, size), scenario["start"], INIT_ROBOT_DIRECTION, planner
+    )
+    for pos in scenario["hazard"]:
+        worldStateModel.addItem("hazard", pos, updatePath=False)
+        sim.addItem("hazard", pos)
+    worldStateModel.addItem("target", scenario["goal"], updatePath=False)
+    sim.addItem("target", scenario["goal"])
+    return worldStateModel, sim
+
+
+def runWorldData(context, size, density, repeat):
+    worldStateModel, sim = buildWorld(context.getScenario(size, density))
+    return measure(lambda state: worldStateModel.getWorldData(), repeat)
+
+
+def runControllerTick(context, size, density, repeat, planner, ticks=50):
+    scenario = context.getScenario(size, density)
+
+    def setup():
+        worldStateModel, sim = buildWorld(scenario, planner)
+        missionRunner = MissionRunner(worldStateModel, sim)
+        missionRunner.sense()
+        return missionRunner
+
+    def tick(missionRunner):
+        missionRunner.tick()
+
+    return measure(tick, repeat, ticks, setup)
+
+
+def runDrawMap(context, size, density, repeat):
+    worldView = context.getWorldView()
+    worldStateModel, sim = buildWorld(context.getScenario(size, density))
+    worldData = worldStateModel.getWorldData()
+    visitedData = worldData["visitedData"]
+    worldView.initialize((size, size))
+    worldView.drawMap(worldData)
+    frameCount = [0]
+
+    def draw(state):
+        # every frame flips the fog of one cell, so the retained renderer has work
+        k = frameCount[0] % (size * size)
+        frameCount[0] += 1
+        visitedData[k // size][k % size] = not visitedData[k // size][k % size]
+        worldView.drawMap(worldData)
+
+    return measure(draw, repeat, 20)
+
+
+# name, function, extra keyword arguments, largest size run unless --no-limit
+CASES = [
+    ("path.bfs", runPath, {"planner": "bfs"}, None),
+    ("path.astar", runPath, {"planner": "astar"}, None),
+    ("map.build", runMapBuild, {}, None),
+    ("map.getVisitedData", runVisitedData, {}, None),
+    ("items.getData", runItemGetData, {}, None),
+    ("items.removeItem", runItemRemove, {}, None),
+    ("model.getWorldData", runWorldData, {}, None),
+    ("controller.tick", runControllerTick, {"planner": "astar"}, 512),
+    # every cell is a canvas item, Tk does not cope with millions of them
+    ("view.drawMap", runDrawMap, {}, 64),
+]
+
+
+def getCaseNames():
+    return [case[0] for case in CASES]
+
+
+def runCase(context, case, size, density, repeat, noLimit=False):
+    name, func, kwargs, maxSize = case
+    entry = {"case": name, "size": size, "density": density, "seed": context.getSeed()}
+    if maxSize != None and size > maxSize and not noLimit:
+        entry["skipped"] = f"size above case limit {maxSize}"
+        return entry
+    # the cases time the code, not the log records it would write
+    logger = logging.getLogger(LOG_ROOT)
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        entry.update(func(context, size, density, repeat, **kwargs))
+    except RuntimeError as e:
+        entry["skipped"] = str(e)
+    finally:
+        logger.setLevel(level)
+    return entry
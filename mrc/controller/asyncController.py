@@ -0,0 +1,280 @@
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Event
+from mrc.model.worldModel import WorldStateModel
+from mrc.logSys import getLogger
+from mrc.traceSys import TRACER
+from mrc.view.renderSys import RateMeter
+from .sim import SIM
+from .missionRunner import MissionRunner
+from .recordSys import MissionRecorder
+from .missionSys import applyMission
+from .sensorSys import RangeSensor
+from .commandSys import CommandHistory, applyCommand
+from .tickScheduler import TickScheduler, Histogram
+
+INIT_ROBOT_DIRECTION = (0, 1)
+# voice stages take from tens of milliseconds up to a few seconds
+VOICE_LATENCY_BOUNDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+logger = getLogger(__name__)
+
+
+class ControllerCore:
+    # runs the mission on one asyncio event loop. other threads only reach it
+    # through postEvent, and every call into the model goes to a single worker
+    # thread, so ticks and voice commands never touch the model at the same
+    # time and planning never blocks the loop
+    def __init__(
+        self,
+        renderMailbox,
+        period=0.3,
+        overrunPolicy="skip",
+        recordDir=None,
+        sensorRange=None,
+    ):
+        self.__worldStateModel = WorldStateModel()
+        self.__renderMailbox = renderMailbox
+        self.__tickScheduler = TickScheduler(period, self.__tick, overrunPolicy)
+        self.__modelExecutor = ThreadPoolExecutor(max_workers=1)
+        self.__loop = None
+        self.__eventQueue = None
+        self.__readyEvent = Event()
+        self.__loopThread = None
+        self.__sim = None
+        self.__missionRunner = None
+        self.__recordDir = recordDir
+        self.__sensorRange = sensorRange
+        self.__missionRecorder = None
+        self.__commandHistory = CommandHistory()
+        self.__publishedVersion = None
+        self.__tickRateMeter = RateMeter()
+        self.__voiceLatencyHistogram = Histogram()
+        self.__voiceListenHistogram = Histogram(VOICE_LATENCY_BOUNDS)
+        self.__voiceRecognizeHistogram = Histogram(VOICE_LATENCY_BOUNDS)
+        self.__voiceCommandHistogram = Histogram(VOICE_LATENCY_BOUNDS)
+        self.__eventHandlers = {
+            "submit": self.__onSubmit,
+            "robotMove": self.__onRobotMove,
+            "voiceResult": self.__onVoiceResult,
+        }
+
+    def start(self):
+        self.__loopThread = Thread(target=self.run, daemon=True)
+        self.__loopThread.start()
+        self.__readyEvent.wait()
+
+    def join(self, timeout=None):
+        if self.__loopThread != None:
+            self.__loopThread.join(timeout)
+
+    def run(self):
+        asyncio.run(self.__main())
+
+    def postEvent(self, eventName, *args):
+        # safe to call from any thread, the event is handled on the loop
+        self.__readyEvent.wait()
+        event = (eventName, args, time.perf_counter())
+        try:
+            self.__loop.call_soon_threadsafe(self.__eventQueue.put_nowait, event)
+        except RuntimeError:
+            # the loop has already shut down
+            pass
+
+    def getWorldStateModel(self):
+        return self.__worldStateModel
+
+    def getTickStatData(self):
+        return self.__tickScheduler.getStatData()
+
+    def getTickRate(self):
+        return self.__tickRateMeter.getRate()
+
+    def setTracing(self, isEnabled, capacity=None):
+        # can be switched while the mission runs, a running tick keeps going
+        if isEnabled:
+            TRACER.enable(capacity)
+        else:
+            TRACER.disable()
+
+    def isTracing(self):
+        return TRACER.isEnabled()
+
+    def getTraceData(self):
+        return TRACER.getTicks()
+
+    def exportTrace(self, path, format="jsonl"):
+        TRACER.export(path, format)
+
+    def getLatencyStatData(self):
+        mailboxStatData = self.__renderMailbox.getStatData()
+        return {
+            "voiceToMap": self.__voiceLatencyHistogram.getData(),
+            "voiceListen": self.__voiceListenHistogram.getData(),
+            "voiceRecognize": self.__voiceRecognizeHistogram.getData(),
+            "voiceCommand": self.__voiceCommandHistogram.getData(),
+            "tickToRender": {
+                "last": mailboxStatData["lastLatency"],
+                "mean": mailboxStatData["meanLatency"],
+                "max": mailboxStatData["maxLatency"],
+            },
+        }
+
+    async def __main(self):
+        self.__loop = asyncio.get_running_loop()
+        self.__eventQueue = asyncio.Queue()
+        self.__readyEvent.set()
+        tickTask = asyncio.create_task(self.__tickScheduler.runAsync())
+        try:
+            await self.__consumeEvents()
+        finally:
+            self.__tickScheduler.terminate()
+            await tickTask
+            await self.__runModel(self.__closeRecorder)
+            self.__modelExecutor.shutdown(wait=True)
+
+    async def __consumeEvents(self):
+        while True:
+            eventName, args, postTime = await self.__eventQueue.get()
+            if eventName == "windowClose":
+                return
+            handler = self.__eventHandlers.get(eventName)
+            if handler == None:
+                continue
+            # a failing event is logged and dropped, the loop keeps serving
+            # the ones after it
+            try:
+                await handler(postTime, *args)
+            except Exception as e:
+                logger.error(
+                    "event failed", extra={"fields": {"event": eventName, "error": e}}
+                )
+
+    async def __runModel(self, func, *args):
+        return await self.__loop.run_in_executor(self.__modelExecutor, func, *args)
+
+    async def __tick(self):
+        if self.__missionRunner == None:
+            return
+        # an exception would end the tick scheduler and with it the mission
+        try:
+            await self.__runModel(self.__runMissionTick, time.perf_counter())
+        except Exception as e:
+            logger.error("tick failed", extra={"fields": {"error": e}})
+            return
+        self.__tickRateMeter.mark()
+
+    async def __onSubmit(self, postTime, data):
+        await self.__runModel(self.__setupMission, data, postTime)
+
+    async def __onRobotMove(self, postTime, isStop):
+        if isStop:
+            self.__tickScheduler.stop()
+        else:
+            self.__tickScheduler.start()
+
+    async def __onVoiceResult(self, postTime, command, voiceResult=None):
+        # command is a parsed list of changes, see commandSys.parseCommand
+        if command == None:
+            return
+        await self.__runModel(self.__applyVoiceCommand, command, postTime)
+        appliedTime = time.perf_counter()
+        self.__voiceLatencyHistogram.add(appliedTime - postTime)
+        if voiceResult != None:
+            # from the button press to an open microphone, from the end of
+            # speech to the text, and from the end of speech to the model
+            self.__voiceListenHistogram.add(
+                voiceResult["listenTime"] - voiceResult["requestTime"]
+            )
+            self.__voiceRecognizeHistogram.add(
+                voiceResult["textTime"] - voiceResult["audioTime"]
+            )
+            self.__voiceCommandHistogram.add(appliedTime - voiceResult["audioTime"])
+
+    # the methods below run on the model worker thread, which also keeps the
+    # published deltas in model order
+
+    def __publishWorld(self, sourceTime):
+        spanStart = TRACER.startSpan()
+        worldDelta = self.__worldStateModel.getWorldDelta(self.__publishedVersion)
+        TRACER.endSpan("model.getWorldDelta", spanStart)
+        if worldDelta == None:
+            # no mission has been set up yet
+            return
+        self.__publishedVersion = worldDelta["version"]
+        self.__renderMailbox.post(worldDelta, sourceTime)
+
+    def __runMissionTick(self, tickTime):
+        behavior = self.__missionRunner.tick()
+        logger.debug("behavior", extra={"fields": {"behavior": behavior}})
+        self.__worldStateModel.logRobotStat()
+        if behavior != None:
+            self.__publishWorld(tickTime)
+
+    def __applyVoiceCommand(self, command, postTime):
+        if self.__worldStateModel.getMapSize() == None:
+            return
+        applyCommand(
+            command,
+            self.__worldStateModel,
+            self.__commandHistory,
+            self.__missionRecorder,
+        )
+        self.__publishWorld(postTime)
+
+    def __setupMission(self, data, postTime):
+        mapSize = data["mapSize"]
+        startingPoint = data["startingPoint"]
+        startingDir = data.get("startingDir", INIT_ROBOT_DIRECTION)
+
+        # the sim seed is recorded, so a recorded mission can be run again
+        seed = random.randrange(2**31)
+        self.__openRecorder(mapSize, startingPoint, startingDir, seed)
+        self.__commandHistory.clear()
+
+        # sim 초기화 부분. sim 맵은 초기 입력의 모든 아이템을 가지고 있다.
+
+        sensor = None
+        if self.__sensorRange != None:
+            sensor = RangeSensor(self.__sensorRange)
+        self.__sim = SIM(mapSize, startingPoint, startingDir, seed=seed, sensor=sensor)
+        applyMission(
+            data,
+            self.__worldStateModel,
+            self.__sim,
+            missionRecorder=self.__missionRecorder,
+        )
+
+        # sim에서 랜덤 위치에 보이지 않는 아이템 추가
+        self.__sim.addItemRandPos("blob")
+        self.__sim.addItemRandPos("blob")
+        self.__sim.addItemRandPos("hazard")
+        self.__sim.addItemRandPos("hazard")
+
+        self.__missionRunner = MissionRunner(
+            self.__worldStateModel, self.__sim, self.__missionRecorder
+        )
+        self.__missionRunner.sense()
+
+        self.__publishWorld(postTime)
+
+    def __openRecorder(self, mapSize, startingPoint, startingDir, seed):
+        # one recording per submitted mission
+        self.__closeRecorder()
+        if self.__recordDir == None:
+            return
+        fileName = time.strftime("mission-%Y%m%d-%H%M%S.mrec")
+        self.__missionRecorder = MissionRecorder(
+            os.path.join(self.__recordDir, fileName)
+        )
+        self.__missionRecorder.recordMission(
+            mapSize, startingPoint, startingDir, seed=seed
+        )
+
+    def __closeRecorder(self):
+        if self.__missionRecorder != None:
+            self.__missionRecorder.close()
+            self.__missionRecorder = None
@@ -0,0 +1,272 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from mrc.model.worldModel import WorldStateModel
+from .sim import SIM
+from .missionRunner import MissionRunner
+from .recordSys import MissionRecorder
+from .missionSys import applyMission
+from .sensorSys import RangeSensor, SENSOR_ARC_DEFAULT
+
+INIT_ROBOT_DIRECTION = (0, 1)
+
+
+def makeScenario(
+    seed,
+    mapSize=(20, 20),
+    targetCount=3,
+    hazardCount=20,
+    hiddenBlobCount=2,
+    hiddenHazardCount=2,
+    robotCount=1,
+):
+    rng = random.Random(seed)
+    width, height = mapSize
+    cells = [(x, y) for y in range(height) for x in range(width)]
+    rng.shuffle(cells)
+    start = cells.pop()
+
+    scenario = {"seed": seed, "mapSize": mapSize, "startingPoint": start}
+    for name, count in [
+        ("target", targetCount),
+        ("hazard", hazardCount),
+        ("hiddenBlob", hiddenBlobCount),
+        ("hiddenHazard", hiddenHazardCount),
+        ("fleet", robotCount - 1),
+    ]:
+        scenario[name] = [cells.pop() for i in range(min(count, len(cells)))]
+    return scenario
+
+
+def runEpisode(
+    scenario,
+    planner="bfs",
+    goalOrder="insertion",
+    maxTicks=None,
+    recordPath=None,
+    sensorRange=None,
+    sensorArc=SENSOR_ARC_DEFAULT,
+    particleCount=None,
+):
+    mapSize = scenario["mapSize"]
+    startingPoint = scenario["startingPoint"]
+    if maxTicks == None:
+        maxTicks = mapSize[0] * mapSize[1] * 8
+
+    missionRecorder = None
+    if recordPath != None:
+        missionRecorder = MissionRecorder(recordPath)
+        missionRecorder.recordMission(
+            mapSize,
+            startingPoint,
+            INIT_ROBOT_DIRECTION,
+            planner,
+            goalOrder,
+            scenario["seed"],
+        )
+
+    # a scenario has the fields of a mission, the hidden items only go to the sim
+    # without a sensor range the sim senses the 4 neighbours only
+    worldStateModel = WorldStateModel()
+    sensor = None
+    if sensorRange != None:
+        sensor = RangeSensor(sensorRange, sensorArc)
+    sim = SIM(
+        mapSize,
+        startingPoint,
+        INIT_ROBOT_DIRECTION,
+        seed=scenario["seed"],
+        sensor=sensor,
+    )
+    applyMission(scenario, worldStateModel, sim, planner, goalOrder, missionRecorder)
+    for blobPos in scenario["hiddenBlob"]:
+        sim.addItem("blob", blobPos)
+    for hazardPos in scenario["hiddenHazard"]:
+        sim.addItem("hazard", hazardPos)
+    for robotPos in scenario.get("fleet", []):
+        if missionRecorder != None:
+            missionRecorder.recordRobotAdded(robotPos, INIT_ROBOT_DIRECTION)
+        worldStateModel.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+        sim.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+
+    missionRunner = MissionRunner(worldStateModel, sim, missionRecorder)
+    # with particles every robot estimates its pose, the estimate of robot 0 is
+    # compared to the sim pose after every tick
+    if particleCount != None:
+        worldStateModel.setLocalization(
+            particleCount, sensorRange or 1, sensorArc, scenario["seed"]
+        )
+    startTime = time.perf_counter()
+    poseMatchCount = 0
+    missionRunner.sense()
+    while missionRunner.getTickCount() < maxTicks:
+        if missionRunner.tick() == None:
+            break
+        if particleCount != None:
+            poseMatchCount += worldStateModel.getEstimatedPose() == (
+                tuple(sim.getRobotPos()),
+                tuple(sim.getRobotDir()),
+            )
+    elapsed = time.perf_counter() - startTime
+    if missionRecorder != None:
+        missionRecorder.close()
+
+    pathStatData = worldStateModel.getFleetStatData()
+    if pathStatData == None:
+        pathStatData = worldStateModel.getPathStatData()
+    result = {
+        "seed": scenario["seed"],
+        "robots": worldStateModel.getRobotCount(),
+        "ticks": missionRunner.getTickCount(),
+        "replans": pathStatData["count"],
+        "planTime": pathStatData["totalTime"],
+        "time": elapsed,
+        "success": not worldStateModel.hasGoal(),
+    }
+    if particleCount != None:
+        result["poseMatchRate"] = poseMatchCount / max(missionRunner.getTickCount(), 1)
+    return result
+
+
+def runEpisodeTask(task):
+    (
+        scenario,
+        planner,
+        goalOrder,
+        maxTicks,
+        recordDir,
+        sensorRange,
+        sensorArc,
+        particleCount,
+    ) = task
+    recordPath = None
+    if recordDir != None:
+        recordPath = os.path.join(recordDir, f"episode-{scenario['seed']}.mrec")
+    return runEpisode(
+        scenario,
+        planner,
+        goalOrder,
+        maxTicks,
+        recordPath,
+        sensorRange,
+        sensorArc,
+        particleCount,
+    )
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        workers=None,
+        planner="bfs",
+        goalOrder="insertion",
+        maxTicks=None,
+        recordDir=None,
+        sensorRange=None,
+        sensorArc=SENSOR_ARC_DEFAULT,
+        particleCount=None,
+    ):
+        self.__workers = workers
+        self.__planner = planner
+        self.__goalOrder = goalOrder
+        self.__maxTicks = maxTicks
+        self.__recordDir = recordDir
+        self.__sensorRange = sensorRange
+        self.__sensorArc = sensorArc
+        self.__particleCount = particleCount
+
+    def run(self, scenarios):
+        tasks = [
+            (
+                scenario,
+                self.__planner,
+                self.__goalOrder,
+                self.__maxTicks,
+                self.__recordDir,
+                self.__sensorRange,
+                self.__sensorArc,
+                self.__particleCount,
+            )
+            for scenario in scenarios
+        ]
+        startTime = time.perf_counter()
+        if self.__workers == 1:
+            results = [runEpisodeTask(task) for task in tasks]
+        else:
+            workers = self.__workers or os.cpu_count() or 1
+            chunkSize = max(1, len(tasks) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(runEpisodeTask, tasks, chunksize=chunkSize))
+        elapsed = time.perf_counter() - startTime
+        return results, self.__summarize(results, elapsed)
+
+    def __summarize(self, results, elapsed):
+        count = len(results)
+        summary = {
+            "episodes": count,
+            "time": elapsed,
+            "episodesPerSecond": count / elapsed if elapsed > 0 else 0.0,
+        }
+        if count > 0:
+            summary["successRate"] = sum(r["success"] for r in results) / count
+            summary["meanTicks"] = sum(r["ticks"] for r in results) / count
+            summary["meanReplans"] = sum(r["replans"] for r in results) / count
+            summary["meanPlanTime"] = sum(r["planTime"] for r in results) / count
+            if "poseMatchRate" in results[0]:
+                summary["meanPoseMatchRate"] = (
+                    sum(r["poseMatchRate"] for r in results) / count
+                )
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--targets", type=int, default=3)
+    parser.add_argument("--hazards", type=int, default=20)
+    parser.add_argument("--robots", type=int, default=1)
+    parser.add_argument("--planner", default="bfs")
+    parser.add_argument("--goal-order", default="insertion")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-episode", action="store_true")
+    parser.add_argument("--record-dir", default=None)
+    parser.add_argument("--sensor-range", type=int, default=None)
+    parser.add_argument("--sensor-arc", type=float, default=SENSOR_ARC_DEFAULT)
+    parser.add_argument("--particles", type=int, default=None)
+    args = parser.parse_args()
+
+    scenarios = [
+        makeScenario(
+            args.seed + i,
+            (args.size, args.size),
+            args.targets,
+            args.hazards,
+            robotCount=args.robots,
+        )
+        for i in range(args.episodes)
+    ]
+    if args.record_dir != None:
+        os.makedirs(args.record_dir, exist_ok=True)
+    batchRunner = BatchRunner(
+        args.workers,
+        args.planner,
+        args.goal_order,
+        recordDir=args.record_dir,
+        sensorRange=args.sensor_range,
+        sensorArc=args.sensor_arc,
+        particleCount=args.particles,
+    )
+    results, summary = batchRunner.run(scenarios)
+    if args.per_episode:
+        for result in results:
+            print(result)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
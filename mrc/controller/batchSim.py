@@ -0,0 +1,212 @@
+import numpy as np
+
+
+class BatchSIM:
+    # steps N robots at once. map cells use the SIM codes (1 hazard, 2 blob) and
+    # are either shared by every world or given per world. robots come in
+    # fleets of fleetSize, each fleet is the world of one SIM: its robots keep
+    # one set of discovered flags and, as in SIM, never drive into a cell
+    # another robot of the fleet stands on. robot i is robot i % fleetSize of
+    # fleet i // fleetSize, and the robots of a fleet move and sense in that
+    # order like MissionRunner ticks them. the slips come from numpy's
+    # default_rng while SIM draws from random, so the same seed gives other
+    # slips. pass probs to step and the same values to SIM.move to compare
+    __ITEM_NUM = {"hazard": 1, "blob": 2}
+    __NO_MOVE_PROB = 0.05
+    __TWO_MOVE_PROB = 0.05
+    __DIR_LIST = [[1, 0], [0, 1], [-1, 0], [0, -1]]
+    BEHAVIOR_NONE = 0
+    BEHAVIOR_MOVE = 1
+    BEHAVIOR_ROTATE = 2
+
+    def __init__(self, robotCount, mapSize, sharedMap=True, seed=None, fleetSize=1):
+        if fleetSize < 1 or robotCount % fleetSize != 0:
+            raise ValueError(
+                f"robot count is not a multiple of fleet size: {fleetSize}"
+            )
+        width, height = mapSize
+        fleetCount = robotCount // fleetSize
+        self.__robotCount = robotCount
+        self.__fleetSize = fleetSize
+        self.__mapSize = mapSize
+        self.__isSharedMap = sharedMap
+        self.__rng = np.random.default_rng(seed)
+        if sharedMap:
+            self.__map = np.zeros((height, width), dtype=np.uint8)
+        else:
+            self.__map = np.zeros((fleetCount, height, width), dtype=np.uint8)
+        self.__hazardChecked = np.zeros((fleetCount, height, width), dtype=bool)
+        self.__blobChecked = np.zeros((fleetCount, height, width), dtype=bool)
+        # robots standing on each cell of each fleet
+        self.__occupied = np.zeros((fleetCount, height, width), dtype=np.int32)
+        self.__robotPos = np.zeros((robotCount, 2), dtype=np.int64)
+        self.__robotDir = np.zeros((robotCount, 2), dtype=np.int64)
+        self.__robotIndex = np.arange(robotCount)
+        self.__robotFleet = self.__robotIndex // fleetSize
+        self.__occupied[:, 0, 0] = fleetSize
+
+    def getRobotCount(self):
+        return self.__robotCount
+
+    def getFleetSize(self):
+        return self.__fleetSize
+
+    def addItem(self, typeName, pos, robots=None, checked=False):
+        # robots picks the fleets to add to by any of their robots
+        x, y = pos
+        if typeName in self.__ITEM_NUM:
+            robots = self.__robotIndex if robots is None else np.asarray(robots)
+            fleets = self.__robotFleet[robots]
+            if self.__isSharedMap:
+                self.__map[y, x] = self.__ITEM_NUM[typeName]
+            else:
+                self.__map[fleets, y, x] = self.__ITEM_NUM[typeName]
+            if typeName == "hazard":
+                self.__hazardChecked[fleets, y, x] = checked
+            elif typeName == "blob":
+                self.__blobChecked[fleets, y, x] = checked
+
+    def setRobotPos(self, pos):
+        self.__robotPos[:] = pos
+        self.__occupied[:] = 0
+        np.add.at(
+            self.__occupied,
+            (self.__robotFleet, self.__robotPos[:, 1], self.__robotPos[:, 0]),
+            1,
+        )
+
+    def setRobotDir(self, dir):
+        self.__robotDir[:] = dir
+
+    def getRobotPos(self):
+        return self.__robotPos
+
+    def getRobotDir(self):
+        return self.__robotDir
+
+    def step(self, behavior, probs=None):
+        behavior = np.asarray(behavior)
+        self.rotate(behavior == self.BEHAVIOR_ROTATE)
+        self.move(behavior == self.BEHAVIOR_MOVE, probs)
+
+    def rotate(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.__robotCount, dtype=bool)
+        dx = self.__robotDir[mask, 0].copy()
+        self.__robotDir[mask, 0] = self.__robotDir[mask, 1]
+        self.__robotDir[mask, 1] = -dx
+
+    def move(self, mask=None, probs=None):
+        # one uniform draw per robot and call, moving or not, so robot i always
+        # sees the same random stream regardless of what the others do. a
+        # fleet moves one robot after the other, every pass moves one robot of
+        # each fleet
+        if probs is None:
+            probs = self.__rng.random(self.__robotCount)
+        if mask is None:
+            mask = np.ones(self.__robotCount, dtype=bool)
+        probs = np.asarray(probs)
+        mask = np.asarray(mask)
+        for rank in range(self.__fleetSize):
+            robots = self.__robotIndex[rank :: self.__fleetSize]
+            robots = robots[mask[robots]]
+            if len(robots):
+                self.__moveRobots(robots, probs[robots])
+
+    def getAddedItemArrays(self):
+        # returns robot index, x, y and SIM item code of every newly sensed item,
+        # ordered per robot like SIM.getAddedItem. the robots of a fleet sense
+        # in order, so an item goes to the first robot that sees it
+        found = []
+        for rank in range(self.__fleetSize):
+            self.__senseRobots(self.__robotIndex[rank :: self.__fleetSize], found)
+        if not found:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, np.zeros(0, dtype=np.uint8)
+        robots, x, y, code, rank = (np.concatenate(column) for column in zip(*found))
+        order = np.lexsort((rank, robots))
+        return robots[order], x[order], y[order], code[order]
+
+    def getAddedItem(self):
+        return groupAddedItem(self.__robotCount, *self.getAddedItemArrays())
+
+    def __moveRobots(self, robots, probs):
+        # robots are from different fleets, so their cells never collide
+        pos = self.__robotPos[robots]
+        dir = self.__robotDir[robots]
+        fleets = self.__robotFleet[robots]
+        oneStep = (probs >= self.__NO_MOVE_PROB) & self.__isFree(fleets, pos + dir)
+        twoStep = (
+            oneStep
+            & (probs > 1 - self.__TWO_MOVE_PROB)
+            & self.__isFree(fleets, pos + 2 * dir)
+        )
+        newPos = pos + dir * (oneStep.astype(np.int64) + twoStep)[:, None]
+        occupied = self.__occupied
+        occupied[fleets, pos[:, 1], pos[:, 0]] -= 1
+        occupied[fleets, newPos[:, 1], newPos[:, 0]] += 1
+        self.__robotPos[robots] = newPos
+
+    def __senseRobots(self, robots, found):
+        pos = self.__robotPos[robots]
+        dir = self.__robotDir[robots]
+        width, height = self.__mapSize
+        for k, (i, j) in enumerate(self.__DIR_LIST):
+            x = pos[:, 0] + i
+            y = pos[:, 1] + j
+            safe = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            sensing = robots[safe]
+            fleets = self.__robotFleet[sensing]
+            isFront = (dir[safe, 0] == i) & (dir[safe, 1] == j)
+            x = x[safe]
+            y = y[safe]
+            if self.__isSharedMap:
+                cell = self.__map[y, x]
+            else:
+                cell = self.__map[fleets, y, x]
+
+            isBlob = (cell == self.__ITEM_NUM["blob"]) & ~self.__blobChecked[
+                fleets, y, x
+            ]
+            self.__blobChecked[fleets[isBlob], y[isBlob], x[isBlob]] = True
+
+            isHazard = (
+                isFront
+                & (cell == self.__ITEM_NUM["hazard"])
+                & ~self.__hazardChecked[fleets, y, x]
+            )
+            self.__hazardChecked[fleets[isHazard], y[isHazard], x[isHazard]] = True
+
+            for mask, code in ((isBlob, 2), (isHazard, 1)):
+                if mask.any():
+                    found.append(
+                        (
+                            sensing[mask],
+                            x[mask],
+                            y[mask],
+                            np.full(mask.sum(), code, dtype=np.uint8),
+                            np.full(mask.sum(), 2 * k + (code == 1)),
+                        )
+                    )
+
+    def __isFree(self, fleets, pos):
+        # inside the map and no robot of the fleet on the cell
+        width, height = self.__mapSize
+        isFree = (
+            (pos[:, 0] >= 0)
+            & (pos[:, 0] < width)
+            & (pos[:, 1] >= 0)
+            & (pos[:, 1] < height)
+        )
+        isFree[isFree] = (
+            self.__occupied[fleets[isFree], pos[isFree, 1], pos[isFree, 0]] == 0
+        )
+        return isFree
+
+
+def groupAddedItem(robotCount, robots, x, y, code):
+    # per robot dicts in the SIM.getAddedItem format
+    addedItem = [{"hazard": [], "blob": []} for i in range(robotCount)]
+    for r, _x, _y, c in zip(robots.tolist(), x.tolist(), y.tolist(), code.tolist()):
+        addedItem[r]["hazard" if c == 1 else "blob"].append((_x, _y))
+    return addedItem
@@ -0,0 +1,299 @@
+import re
+from collections import deque
+
+COMMAND_HISTORY_LIMIT = 50
+
+# text is matched as lowercase words and numbers, every word is looked up in
+# one table built at import
+TOKEN_PATTERN = re.compile(r"\d+|[a-z]+")
+
+NUMBER_WORDS = {
+    word: value
+    for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve "
+        "thirteen fourteen fifteen sixteen seventeen eighteen nineteen".split()
+    )
+}
+TENS_WORDS = {
+    word: (k + 2) * 10
+    for k, word in enumerate(
+        "twenty thirty forty fifty sixty seventy eighty ninety".split()
+    )
+}
+
+# recognizers often write a spoken number as a word that sounds the same. such
+# a word counts as the number only where a number is missing, "to" and "too"
+# otherwise stay range words
+NUMBER_HOMOPHONES = {"to": 2, "too": 2, "for": 4}
+
+WORD_TABLE = {}
+for words, entry in [
+    ("hazard hazards h", ("item", "hazard")),
+    ("blob blobs b", ("item", "blob")),
+    ("target targets goal goals t", ("item", "target")),
+    ("add put place mark set", ("verb", "add")),
+    ("remove delete clear erase", ("verb", "remove")),
+    ("undo", ("verb", "undo")),
+    ("row rows", ("shape", "row")),
+    ("column columns col", ("shape", "column")),
+    ("rectangle rect box area square block", ("shape", "rectangle")),
+    ("from to too through thru till until", ("range", None)),
+]:
+    for word in words.split():
+        WORD_TABLE[word] = entry
+
+
+def parseCommand(text, mapSize=None):
+    # turns an utterance into a list of changes:
+    #   ("add", type, positions)       "hazard 3 4 and 5 6, blob 7 1"
+    #   ("remove", type, positions)    "remove 3 4", "delete hazard row 2 from 0 to 5"
+    #   ("undo", count)                "undo", "undo 3"
+    # the verb and the item type carry over until the next one is said, a
+    # remove without a type removes any item. rows, columns and rectangles are
+    # inclusive and clipped to mapSize before they are expanded, so a misheard
+    # number never builds more cells than the map has. returns None when the
+    # text is not a command
+    if text == None:
+        return None
+    tokens = tokenizeCommand(text)
+    command = []
+    verb = "add"
+    type = None
+    k = 0
+    while k < len(tokens):
+        token = tokens[k]
+        k += 1
+        if isinstance(token, int) or (
+            token in NUMBER_HOMOPHONES and countNumbers(tokens, k) % 2 == 1
+        ):
+            x = token if isinstance(token, int) else NUMBER_HOMOPHONES[token]
+            y, k = takePairEnd(tokens, k)
+            if y == None:
+                return None
+            positions = [(x, y)]
+        else:
+            kind, value = WORD_TABLE.get(token, (None, None))
+            if kind == "item":
+                type = value
+                continue
+            if kind == "verb":
+                if value == "undo":
+                    count = 1
+                    if k < len(tokens) and isinstance(tokens[k], int):
+                        count = tokens[k]
+                        k += 1
+                    command.append(("undo", count))
+                    verb = "add"
+                    type = None
+                else:
+                    verb = value
+                continue
+            if kind != "shape":
+                continue
+            numbers, k = takeNumbers(tokens, k, 4 if value == "rectangle" else 3)
+            if numbers == None:
+                return None
+            positions = getShapePositions(value, numbers, mapSize)
+        if verb == "add" and type == None:
+            return None
+        if command and command[-1][:2] == (verb, type):
+            command[-1][2].extend(positions)
+        else:
+            command.append((verb, type, positions))
+    if not command:
+        return None
+    return command
+
+
+def takePairEnd(tokens, k):
+    # the y of a position, a homophone is y when the numbers after it pair up
+    # without it
+    while k < len(tokens):
+        token = tokens[k]
+        k += 1
+        if isinstance(token, int):
+            return token, k
+        if token in NUMBER_HOMOPHONES and countNumbers(tokens, k) % 2 == 0:
+            return NUMBER_HOMOPHONES[token], k
+        if WORD_TABLE.get(token, (None,))[0] != "range":
+            break
+    return None, k
+
+
+def countNumbers(tokens, k):
+    # the numbers in the run of numbers and range words that starts at k
+    count = 0
+    while k < len(tokens):
+        token = tokens[k]
+        if isinstance(token, int):
+            count += 1
+        elif (
+            token not in NUMBER_HOMOPHONES
+            and WORD_TABLE.get(token, (None,))[0] != "range"
+        ):
+            break
+        k += 1
+    return count
+
+
+class CommandHistory:
+    # the inverse changes of the last applied commands, newest last
+    def __init__(self, limit=COMMAND_HISTORY_LIMIT):
+        self.__inverses = deque(maxlen=limit)
+
+    def push(self, inverse):
+        self.__inverses.append(inverse)
+
+    def pop(self):
+        if not self.__inverses:
+            return None
+        return self.__inverses.pop()
+
+    def getSize(self):
+        return len(self.__inverses)
+
+    def clear(self):
+        self.__inverses.clear()
+
+
+def applyCommand(
+    command, worldStateModel, commandHistory=None, missionRecorder=None, source="voice"
+):
+    # the whole command is one model batch, so the robots replan once. returns
+    # the number of cells that changed
+    changedCount = 0
+    inverse = []
+    with worldStateModel.batch():
+        for change in command:
+            if change[0] == "undo":
+                for n in range(change[1]):
+                    undoChanges = (
+                        commandHistory.pop() if commandHistory != None else None
+                    )
+                    if undoChanges == None:
+                        break
+                    for undoChange in undoChanges:
+                        changedCount += len(
+                            applyChange(
+                                undoChange, worldStateModel, missionRecorder, source
+                            )
+                        )
+            else:
+                changeInverse = applyChange(
+                    change, worldStateModel, missionRecorder, source
+                )
+                changedCount += len(changeInverse)
+                inverse.extend(changeInverse)
+    if inverse and commandHistory != None:
+        # undone in reverse order, one change per cell
+        commandHistory.push(
+            [(verb, type, [pos]) for verb, type, pos in reversed(inverse)]
+        )
+    return changedCount
+
+
+def applyChange(change, worldStateModel, missionRecorder, source):
+    # returns (verb, type, pos) for every changed cell, which changes it back
+    verb, type, positions = change
+    mapSize = worldStateModel.getMapSize()
+    if mapSize == None:
+        return []
+    width, height = mapSize
+    inverse = []
+    changedPositions = []
+    for pos in positions:
+        x, y = pos
+        if x < 0 or x >= width or y < 0 or y >= height:
+            continue
+        itemName = worldStateModel.getItemName(pos)
+        if verb == "add":
+            if itemName == type:
+                continue
+            if itemName == None:
+                inverse.append(("remove", type, pos))
+            else:
+                inverse.append(("add", itemName, pos))
+        else:
+            if itemName == None or (type != None and itemName != type):
+                continue
+            inverse.append(("add", itemName, pos))
+        changedPositions.append(pos)
+    if not changedPositions:
+        return inverse
+    if verb == "add":
+        if missionRecorder != None:
+            missionRecorder.recordItems(type, changedPositions, source)
+        worldStateModel.addItems(type, changedPositions)
+    else:
+        if missionRecorder != None:
+            missionRecorder.recordItemsRemoved(changedPositions, source)
+        worldStateModel.removeItems(changedPositions)
+    return inverse
+
+
+def tokenizeCommand(text):
+    # number words become ints, "twenty one" is 21
+    tokens = []
+    isTens = False
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if word.isdigit():
+            tokens.append(int(word))
+        elif word in TENS_WORDS:
+            tokens.append(TENS_WORDS[word])
+            isTens = True
+            continue
+        elif word in NUMBER_WORDS:
+            value = NUMBER_WORDS[word]
+            if isTens and 0 < value < 10:
+                tokens[-1] += value
+            else:
+                tokens.append(value)
+        else:
+            tokens.append(word)
+        isTens = False
+    return tokens
+
+
+def takeNumbers(tokens, k, count):
+    # the next count numbers, range words in between are skipped. a homophone
+    # is a number when it comes first or the numbers after it fall short
+    numbers = []
+    while len(numbers) < count and k < len(tokens):
+        token = tokens[k]
+        if isinstance(token, int):
+            numbers.append(token)
+        elif token in NUMBER_HOMOPHONES and (
+            not numbers or len(numbers) + countNumbers(tokens, k + 1) < count
+        ):
+            numbers.append(NUMBER_HOMOPHONES[token])
+        elif WORD_TABLE.get(token, (None,))[0] != "range":
+            break
+        k += 1
+    if len(numbers) < count:
+        return None, k
+    return numbers, k
+
+
+def getShapePositions(shape, numbers, mapSize=None):
+    if shape == "row":
+        y, fromX, toX = numbers
+        xs = clipRange(fromX, toX, mapSize[0] if mapSize != None else None)
+        ys = clipRange(y, y, mapSize[1] if mapSize != None else None)
+    elif shape == "column":
+        x, fromY, toY = numbers
+        xs = clipRange(x, x, mapSize[0] if mapSize != None else None)
+        ys = clipRange(fromY, toY, mapSize[1] if mapSize != None else None)
+    else:
+        x0, y0, x1, y1 = numbers
+        xs = clipRange(x0, x1, mapSize[0] if mapSize != None else None)
+        ys = clipRange(y0, y1, mapSize[1] if mapSize != None else None)
+    return [(x, y) for y in ys for x in xs]
+
+
+def clipRange(start, end, size=None):
+    # the inclusive range between two numbers, within [0, size) when a size is
+    # given
+    low, high = min(start, end), max(start, end)
+    if size != None:
+        low, high = max(low, 0), min(high, size - 1)
+    return range(low, high + 1)
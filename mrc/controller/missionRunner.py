@@ -0,0 +1,94 @@
+from mrc.traceSys import TRACER
+
+
+class MissionRunner:
+    # one control tick without any gui or delay: ask the model for the next
+    # behavior, run it on the sim and feed the sensed result back to the model.
+    # with a fleet every robot gets one behavior per tick
+    def __init__(self, worldStateModel, sim, missionRecorder=None):
+        self.__worldStateModel = worldStateModel
+        self.__sim = sim
+        self.__missionRecorder = missionRecorder
+        self.__tickCount = 0
+
+    def tick(self):
+        TRACER.markTick()
+        robotCount = self.__worldStateModel.getRobotCount()
+        if robotCount == 1:
+            behaviors = self.__tickRobot(0)
+        else:
+            behaviors = [self.__tickRobot(robotId) for robotId in range(robotCount)]
+            if all(behavior == None for behavior in behaviors):
+                behaviors = None
+        self.__worldStateModel.advanceTick()
+        if self.__missionRecorder != None:
+            self.__missionRecorder.recordTick(self.__worldStateModel)
+        if behaviors != None:
+            self.__tickCount += 1
+        return behaviors
+
+    def sense(self):
+        for robotId in range(self.__worldStateModel.getRobotCount()):
+            addedItem = self.__sim.getAddedItem(robotId)
+            self.__addItems(addedItem)
+            self.__setObserved(robotId)
+            self.__worldStateModel.localizeRobot(None, addedItem, robotId)
+
+    def getTickCount(self):
+        return self.__tickCount
+
+    def __tickRobot(self, robotId):
+        spanStart = TRACER.startSpan()
+        behavior = self.__worldStateModel.getNextRobotBehavior(robotId)
+        TRACER.endSpan("model.getNextRobotBehavior", spanStart)
+        if behavior == None:
+            if self.__missionRecorder != None:
+                self.__missionRecorder.recordRobot(
+                    robotId,
+                    None,
+                    self.__sim.getRobotPos(robotId),
+                    self.__sim.getRobotDir(robotId),
+                )
+            return None
+
+        if behavior == "move":
+            spanStart = TRACER.startSpan()
+            self.__sim.move(robotId=robotId)
+            TRACER.endSpan("sim.move", spanStart)
+        elif behavior == "rotate":
+            spanStart = TRACER.startSpan()
+            self.__sim.rotate(robotId)
+            TRACER.endSpan("sim.rotate", spanStart)
+
+        spanStart = TRACER.startSpan()
+        addedItem = self.__sim.getAddedItem(robotId)
+        TRACER.endSpan("sim.getAddedItem", spanStart)
+        robotPos = self.__sim.getRobotPos(robotId)
+        robotDir = self.__sim.getRobotDir(robotId)
+
+        if self.__missionRecorder != None:
+            self.__missionRecorder.recordRobot(robotId, behavior, robotPos, robotDir)
+        self.__worldStateModel.setRobotPosition(robotPos, robotId)
+        self.__worldStateModel.setRobotDirection(robotDir, robotId)
+        self.__addItems(addedItem)
+        self.__setObserved(robotId)
+        # the model still takes the sim pose, the estimate runs alongside it
+        self.__worldStateModel.localizeRobot(behavior, addedItem, robotId)
+        return behavior
+
+    def __addItems(self, addedItem):
+        # everything sensed in one step is one batch with at most one replan
+        with self.__worldStateModel.batch():
+            for itemName, positions in addedItem.items():
+                if not positions:
+                    continue
+                if self.__missionRecorder != None:
+                    self.__missionRecorder.recordItems(itemName, positions, "sensed")
+                self.__worldStateModel.addItems(itemName, positions)
+
+    def __setObserved(self, robotId):
+        observed = self.__sim.getObservedCells(robotId)
+        if observed:
+            if self.__missionRecorder != None:
+                self.__missionRecorder.recordObserved(observed)
+            self.__worldStateModel.setObserved(observed)
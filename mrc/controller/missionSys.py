@@ -0,0 +1,144 @@
+import mmap
+import struct
+from array import array
+import yaml
+
+MISSION_MAGIC = b"MRCMIS\x00\x01"
+MISSION_DIRECTION_DEFAULT = (0, 1)
+YAML_SUFFIXES = (".yml", ".yaml")
+
+# magic, width, height, start x, start y, start direction, target count. the
+# targets follow as int32 pairs in goal order, then one byte per cell with 1
+# for a hazard, laid out like the planes of LatticeMap2D
+MISSION_HEADER = struct.Struct("<8sIIiibbI")
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def makeMission(
+    mapSize, startingPoint, target=(), hazard=(), startingDir=MISSION_DIRECTION_DEFAULT
+):
+    # the same dict the setup form submits, plus the starting direction
+    return {
+        "mapSize": tuple(mapSize),
+        "startingPoint": tuple(startingPoint),
+        "startingDir": tuple(startingDir),
+        "target": [tuple(pos) for pos in target],
+        "hazard": [tuple(pos) for pos in hazard],
+    }
+
+
+def loadMission(path):
+    if path.endswith(YAML_SUFFIXES):
+        return loadMissionYaml(path)
+    return loadMissionBinary(path)
+
+
+def saveMission(mission, path):
+    if path.endswith(YAML_SUFFIXES):
+        saveMissionYaml(mission, path)
+    else:
+        saveMissionBinary(mission, path)
+
+
+def loadMissionBinary(path):
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        if len(mapped) < MISSION_HEADER.size:
+            raise ValueError(f"not a mission file: {path}")
+        magic, width, height, x, y, dx, dy, targetCount = MISSION_HEADER.unpack_from(
+            mapped
+        )
+        if magic != MISSION_MAGIC:
+            raise ValueError(f"not a mission file: {path}")
+        offset = MISSION_HEADER.size + targetCount * 8
+        end = offset + width * height
+        if len(mapped) < end:
+            raise ValueError(f"mission file is truncated: {path}")
+        targetData = array("i", mapped[MISSION_HEADER.size : offset])
+
+        # the hazard plane is scanned in place, only hazard cells are touched
+        hazard = []
+        i = mapped.find(b"\x01", offset, end)
+        while i >= 0:
+            cell = i - offset
+            hazard.append((cell % width, cell // width))
+            i = mapped.find(b"\x01", i + 1, end)
+    return makeMission(
+        (width, height),
+        (x, y),
+        zip(targetData[0::2], targetData[1::2]),
+        hazard,
+        (dx, dy),
+    )
+
+
+def saveMissionBinary(mission, path):
+    width, height = mission["mapSize"]
+    x, y = mission["startingPoint"]
+    dx, dy = mission.get("startingDir", MISSION_DIRECTION_DEFAULT)
+    target = mission["target"]
+    targetData = array("i")
+    for pos in target:
+        targetData.extend(pos)
+    hazardPlane = bytearray(width * height)
+    for hazardX, hazardY in mission["hazard"]:
+        hazardPlane[hazardY * width + hazardX] = 1
+    with open(path, "wb") as f:
+        f.write(
+            MISSION_HEADER.pack(MISSION_MAGIC, width, height, x, y, dx, dy, len(target))
+        )
+        f.write(targetData.tobytes())
+        f.write(hazardPlane)
+
+
+def loadMissionYaml(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=YamlLoader)
+    for key in ("mapSize", "startingPoint"):
+        if not isinstance(data, dict) or key not in data:
+            raise ValueError(f"mission file has no {key}: {path}")
+    return makeMission(
+        data["mapSize"],
+        data["startingPoint"],
+        data.get("target") or [],
+        data.get("hazard") or [],
+        data.get("startingDir", MISSION_DIRECTION_DEFAULT),
+    )
+
+
+def saveMissionYaml(mission, path):
+    # one [x, y] pair per list entry, flow style keeps long lists readable
+    data = {
+        "mapSize": list(mission["mapSize"]),
+        "startingPoint": list(mission["startingPoint"]),
+        "startingDir": list(mission.get("startingDir", MISSION_DIRECTION_DEFAULT)),
+        "target": [list(pos) for pos in mission["target"]],
+        "hazard": [list(pos) for pos in mission["hazard"]],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, Dumper=YamlDumper, default_flow_style=None, sort_keys=False)
+
+
+def applyMission(
+    mission,
+    worldStateModel,
+    sim=None,
+    planner="bfs",
+    goalOrder="insertion",
+    missionRecorder=None,
+):
+    # sets the model up in bulk, the first path is planned by the first sense
+    startingDir = mission.get("startingDir", MISSION_DIRECTION_DEFAULT)
+    worldStateModel.initialize(
+        mission["mapSize"], mission["startingPoint"], startingDir, planner, goalOrder
+    )
+    for itemName in ("target", "hazard"):
+        positions = mission[itemName]
+        if missionRecorder != None:
+            missionRecorder.recordItems(itemName, positions, "setup")
+        worldStateModel.addItems(itemName, positions, updatePath=False)
+        if sim != None:
+            sim.addItems(itemName, positions)
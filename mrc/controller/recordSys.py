@@ -0,0 +1,383 @@
+import json
+import mmap
+import struct
+import time
+import zlib
+from array import array
+from itertools import chain
+from mrc.model.worldModel import WorldStateModel
+
+RECORD_MAGIC = b"MRCREC\x00\x01"
+KEYFRAME_INTERVAL_DEFAULT = 256
+ITEM_SOURCES = ("setup", "sensed", "voice")
+
+# every record is a type byte and a payload length, followed by the payload
+RECORD_HEADER = struct.Struct("<BI")
+MISSION_RECORD = 1
+ITEM_RECORD = 2
+ROBOT_ADDED_RECORD = 3
+ROBOT_RECORD = 4
+TICK_RECORD = 5
+KEYFRAME_RECORD = 6
+ITEM_REMOVED_RECORD = 7
+OBSERVED_RECORD = 8
+
+ITEM_PAYLOAD = struct.Struct("<BBii")
+ITEM_REMOVED_PAYLOAD = struct.Struct("<Bii")
+ROBOT_ADDED_PAYLOAD = struct.Struct("<iibb")
+ROBOT_PAYLOAD = struct.Struct("<HBiibb")
+TICK_PAYLOAD = struct.Struct("<I")
+KEYFRAME_HEADER = struct.Struct("<IIH")
+KEYFRAME_SIZE = struct.Struct("<II")
+
+ITEM_CODES = {"target": 1, "blob": 2, "hazard": 3}
+ITEM_NAMES = {code: name for name, code in ITEM_CODES.items()}
+BEHAVIOR_CODES = {None: 0, "move": 1, "rotate": 2, "wait": 3}
+BEHAVIOR_NAMES = {code: name for name, code in BEHAVIOR_CODES.items()}
+
+
+class MissionRecorder:
+    # append-only binary log of one mission per file: the setup, every robot step with
+    # the behavior it took, every item that reached the model and the tick
+    # boundaries. a keyframe with the whole model is written every
+    # keyframeInterval ticks so a replay can start in the middle
+    def __init__(self, path, keyframeInterval=KEYFRAME_INTERVAL_DEFAULT):
+        self.__file = open(path, "wb")
+        self.__file.write(RECORD_MAGIC)
+        self.__keyframeInterval = keyframeInterval
+        self.__tickCount = 0
+        self.__keyframeTime = 0.0
+
+    def recordMission(
+        self,
+        mapSize,
+        robotPos,
+        robotDir,
+        planner="bfs",
+        goalOrder="insertion",
+        seed=None,
+    ):
+        missionData = {
+            "mapSize": list(mapSize),
+            "robotPos": list(robotPos),
+            "robotDir": list(robotDir),
+            "planner": planner,
+            "goalOrder": goalOrder,
+            "seed": seed,
+        }
+        self.__write(MISSION_RECORD, json.dumps(missionData).encode("utf-8"))
+
+    def recordItem(self, itemName, pos, source="setup"):
+        self.__write(
+            ITEM_RECORD,
+            ITEM_PAYLOAD.pack(
+                ITEM_CODES[itemName], ITEM_SOURCES.index(source), pos[0], pos[1]
+            ),
+        )
+
+    def recordItems(self, itemName, positions, source="setup"):
+        code = ITEM_CODES[itemName]
+        sourceCode = ITEM_SOURCES.index(source)
+        header = RECORD_HEADER.pack(ITEM_RECORD, ITEM_PAYLOAD.size)
+        self.__file.write(
+            b"".join(
+                header + ITEM_PAYLOAD.pack(code, sourceCode, x, y) for x, y in positions
+            )
+        )
+
+    def recordItemsRemoved(self, positions, source="voice"):
+        sourceCode = ITEM_SOURCES.index(source)
+        header = RECORD_HEADER.pack(ITEM_REMOVED_RECORD, ITEM_REMOVED_PAYLOAD.size)
+        self.__file.write(
+            b"".join(
+                header + ITEM_REMOVED_PAYLOAD.pack(sourceCode, x, y)
+                for x, y in positions
+            )
+        )
+
+    def recordObserved(self, positions):
+        self.__write(
+            OBSERVED_RECORD, array("i", chain.from_iterable(positions)).tobytes()
+        )
+
+    def recordRobotAdded(self, robotPos, robotDir):
+        self.__write(
+            ROBOT_ADDED_RECORD,
+            ROBOT_ADDED_PAYLOAD.pack(
+                robotPos[0], robotPos[1], robotDir[0], robotDir[1]
+            ),
+        )
+
+    def recordRobot(self, robotId, behavior, pos, dir):
+        self.__write(
+            ROBOT_RECORD,
+            ROBOT_PAYLOAD.pack(
+                robotId, BEHAVIOR_CODES[behavior], pos[0], pos[1], dir[0], dir[1]
+            ),
+        )
+
+    def recordTick(self, worldStateModel):
+        self.__tickCount += 1
+        self.__write(TICK_RECORD, TICK_PAYLOAD.pack(self.__tickCount))
+        if self.__tickCount % self.__keyframeInterval == 0:
+            startTime = time.perf_counter()
+            self.__write(
+                KEYFRAME_RECORD,
+                encodeKeyframe(self.__tickCount, worldStateModel.getSnapshot()),
+            )
+            self.__file.flush()
+            self.__keyframeTime += time.perf_counter() - startTime
+
+    def getTickCount(self):
+        return self.__tickCount
+
+    def getStatData(self):
+        return {
+            "ticks": self.__tickCount,
+            "bytes": self.__file.tell(),
+            "keyframeTime": self.__keyframeTime,
+        }
+
+    def flush(self):
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+    def __write(self, recordType, payload):
+        self.__file.write(RECORD_HEADER.pack(recordType, len(payload)) + payload)
+
+
+def decodePositions(payload):
+    positionData = array("i", payload)
+    return list(zip(positionData[0::2], positionData[1::2]))
+
+
+def encodeKeyframe(tick, snapshot):
+    # header, then zlib of the map size, the robot poses, a count and the
+    # packed positions for each item type, the visited and the observed plane
+    robots = snapshot["robots"]
+    parts = [KEYFRAME_SIZE.pack(*snapshot["mapSize"])]
+    parts.append(
+        array("i", chain.from_iterable(chain(*robot) for robot in robots)).tobytes()
+    )
+    for type, code in ITEM_CODES.items():
+        positions = snapshot["items"].get(type, [])
+        parts.append(KEYFRAME_SIZE.pack(code, len(positions)))
+        parts.append(array("i", chain.from_iterable(positions)).tobytes())
+    parts.append(snapshot["visited"])
+    parts.append(snapshot["observed"])
+    header = KEYFRAME_HEADER.pack(tick, snapshot["time"], len(robots))
+    return header + zlib.compress(b"".join(parts), 1)
+
+
+def decodeKeyframe(payload):
+    tick, fleetTime, robotCount = KEYFRAME_HEADER.unpack_from(payload)
+    body = zlib.decompress(payload[KEYFRAME_HEADER.size :])
+    width, height = KEYFRAME_SIZE.unpack_from(body)
+    offset = KEYFRAME_SIZE.size
+    robotData = array("i", body[offset : offset + robotCount * 16])
+    offset += robotCount * 16
+    items = {}
+    for k in range(len(ITEM_CODES)):
+        code, count = KEYFRAME_SIZE.unpack_from(body, offset)
+        offset += KEYFRAME_SIZE.size
+        items[ITEM_NAMES[code]] = decodePositions(body[offset : offset + count * 8])
+        offset += count * 8
+    planeSize = width * height
+    visited = body[offset : offset + planeSize]
+    # keyframes written before observed cells were kept end after visited
+    observed = body[offset + planeSize :] or bytes(planeSize)
+    snapshot = {
+        "mapSize": (width, height),
+        "time": fleetTime,
+        "robots": [
+            ((robotData[k], robotData[k + 1]), (robotData[k + 2], robotData[k + 3]))
+            for k in range(0, len(robotData), 4)
+        ],
+        "items": items,
+        "visited": visited,
+        "observed": observed,
+    }
+    return tick, snapshot
+
+
+class MissionReplayer:
+    # reads a recording through mmap. replay drives a WorldStateModel through
+    # the recorded steps as fast as it can plan, seek restores the nearest
+    # keyframe before the tick and replays the rest
+    def __init__(self, path):
+        self.__file = open(path, "rb")
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__mmap[: len(RECORD_MAGIC)] != RECORD_MAGIC:
+            self.close()
+            raise ValueError(f"not a mission recording: {path}")
+        self.__missionData = None
+        self.__tickOffsets = []
+        self.__keyframeOffsets = {}
+        self.__divergedCount = 0
+        self.__readIndex()
+
+    def close(self):
+        self.__mmap.close()
+        self.__file.close()
+
+    def getMissionData(self):
+        return self.__missionData
+
+    def getTickCount(self):
+        return len(self.__tickOffsets) - 1
+
+    def getKeyframeTicks(self):
+        return sorted(self.__keyframeOffsets)
+
+    def getDivergedCount(self):
+        # steps where the replayed model chose another behavior than recorded
+        return self.__divergedCount
+
+    def replay(self, worldStateModel=None, toTick=None):
+        if worldStateModel == None:
+            worldStateModel = WorldStateModel()
+        if toTick == None:
+            toTick = self.getTickCount()
+        self.__divergedCount = 0
+        self.__apply(worldStateModel, len(RECORD_MAGIC), self.__getTickOffset(toTick))
+        return worldStateModel
+
+    def seek(self, tick, worldStateModel=None):
+        # the model ends up as it was after tick ticks
+        if worldStateModel == None:
+            worldStateModel = WorldStateModel()
+        keyframeTicks = [k for k in self.__keyframeOffsets if k <= tick]
+        if not keyframeTicks:
+            return self.replay(worldStateModel, tick)
+        keyframeTick = max(keyframeTicks)
+        offset = self.__keyframeOffsets[keyframeTick]
+        recordType, payload, nextOffset = self.__readRecord(offset)
+        keyframeTick, snapshot = decodeKeyframe(payload)
+        missionData = self.__missionData
+        worldStateModel.restoreSnapshot(
+            snapshot, missionData["planner"], missionData["goalOrder"]
+        )
+        self.__divergedCount = 0
+        self.__apply(worldStateModel, nextOffset, self.__getTickOffset(tick))
+        return worldStateModel
+
+    def getRecords(self, fromTick=0, toTick=None):
+        # decoded records as (type name, data) tuples, for inspection
+        if toTick == None:
+            toTick = self.getTickCount()
+        offset = len(RECORD_MAGIC) if fromTick == 0 else self.__getTickOffset(fromTick)
+        endOffset = self.__getTickOffset(toTick)
+        while offset < endOffset:
+            recordType, payload, offset = self.__readRecord(offset)
+            if recordType == ITEM_RECORD:
+                code, source, x, y = ITEM_PAYLOAD.unpack(payload)
+                yield "item", (ITEM_NAMES[code], (x, y), ITEM_SOURCES[source])
+            elif recordType == ITEM_REMOVED_RECORD:
+                source, x, y = ITEM_REMOVED_PAYLOAD.unpack(payload)
+                yield "itemRemoved", ((x, y), ITEM_SOURCES[source])
+            elif recordType == ROBOT_RECORD:
+                robotId, code, x, y, dx, dy = ROBOT_PAYLOAD.unpack(payload)
+                yield "robot", (robotId, BEHAVIOR_NAMES[code], (x, y), (dx, dy))
+            elif recordType == OBSERVED_RECORD:
+                yield "observed", decodePositions(payload)
+            elif recordType == TICK_RECORD:
+                yield "tick", TICK_PAYLOAD.unpack(payload)[0]
+            elif recordType == ROBOT_ADDED_RECORD:
+                x, y, dx, dy = ROBOT_ADDED_PAYLOAD.unpack(payload)
+                yield "robotAdded", ((x, y), (dx, dy))
+            elif recordType == MISSION_RECORD:
+                yield "mission", json.loads(bytes(payload))
+
+    def __getTickOffset(self, tick):
+        if tick < 0 or tick >= len(self.__tickOffsets):
+            raise ValueError(f"tick out of range: {tick}")
+        return self.__tickOffsets[tick]
+
+    def __readRecord(self, offset):
+        recordType, length = RECORD_HEADER.unpack_from(self.__mmap, offset)
+        start = offset + RECORD_HEADER.size
+        return recordType, self.__mmap[start : start + length], start + length
+
+    def __readIndex(self):
+        # only the record headers are read, payloads stay in the mapping.
+        # tick 0 ends before the first robot step, tick n right after its tick
+        # record and keyframe
+        mappedSize = len(self.__mmap)
+        offset = len(RECORD_MAGIC)
+        isFirstStep = True
+        tickOffsets = [None]
+        while offset + RECORD_HEADER.size <= mappedSize:
+            recordType, length = RECORD_HEADER.unpack_from(self.__mmap, offset)
+            nextOffset = offset + RECORD_HEADER.size + length
+            if nextOffset > mappedSize:
+                # a record cut short by a crash ends the recording
+                break
+            if recordType == MISSION_RECORD:
+                start = offset + RECORD_HEADER.size
+                self.__missionData = json.loads(self.__mmap[start:nextOffset])
+            elif recordType == ROBOT_RECORD and isFirstStep:
+                tickOffsets[0] = offset
+                isFirstStep = False
+            elif recordType == TICK_RECORD:
+                tickOffsets.append(nextOffset)
+            elif recordType == KEYFRAME_RECORD:
+                self.__keyframeOffsets[len(tickOffsets) - 1] = offset
+                tickOffsets[-1] = nextOffset
+            offset = nextOffset
+        if tickOffsets[0] == None:
+            tickOffsets[0] = offset
+        self.__tickOffsets = tickOffsets
+        if self.__missionData == None:
+            raise ValueError("recording has no mission record")
+
+    def __apply(self, worldStateModel, offset, endOffset):
+        # the items of one step or one voice command were applied as a batch,
+        # so consecutive item records are replayed as one
+        missionData = self.__missionData
+        itemRecords = []
+        while offset < endOffset:
+            recordType, payload, offset = self.__readRecord(offset)
+            if recordType == ITEM_RECORD or recordType == ITEM_REMOVED_RECORD:
+                itemRecords.append((recordType, payload))
+                continue
+            if itemRecords:
+                self.__applyItems(worldStateModel, itemRecords)
+                itemRecords = []
+            if recordType == ROBOT_RECORD:
+                robotId, code, x, y, dx, dy = ROBOT_PAYLOAD.unpack(payload)
+                behavior = worldStateModel.getNextRobotBehavior(robotId)
+                if behavior != BEHAVIOR_NAMES[code]:
+                    self.__divergedCount += 1
+                if code != BEHAVIOR_CODES[None]:
+                    worldStateModel.setRobotPosition((x, y), robotId)
+                    worldStateModel.setRobotDirection((dx, dy), robotId)
+            elif recordType == OBSERVED_RECORD:
+                worldStateModel.setObserved(decodePositions(payload))
+            elif recordType == TICK_RECORD:
+                worldStateModel.advanceTick()
+            elif recordType == ROBOT_ADDED_RECORD:
+                x, y, dx, dy = ROBOT_ADDED_PAYLOAD.unpack(payload)
+                worldStateModel.addRobot((x, y), (dx, dy))
+            elif recordType == MISSION_RECORD:
+                worldStateModel.initialize(
+                    missionData["mapSize"],
+                    missionData["robotPos"],
+                    missionData["robotDir"],
+                    missionData["planner"],
+                    missionData["goalOrder"],
+                )
+        if itemRecords:
+            self.__applyItems(worldStateModel, itemRecords)
+
+    def __applyItems(self, worldStateModel, itemRecords):
+        with worldStateModel.batch():
+            for recordType, payload in itemRecords:
+                if recordType == ITEM_RECORD:
+                    code, source, x, y = ITEM_PAYLOAD.unpack(payload)
+                    updatePath = ITEM_SOURCES[source] != "setup"
+                    worldStateModel.addItem(ITEM_NAMES[code], (x, y), updatePath)
+                else:
+                    source, x, y = ITEM_REMOVED_PAYLOAD.unpack(payload)
+                    worldStateModel.removeItems([(x, y)])
@@ -0,0 +1,151 @@
+import math
+import numpy as np
+
+SENSOR_RANGE_DEFAULT = 10
+SENSOR_ARC_DEFAULT = 360
+SENSOR_DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+# sim map codes, cells outside the map are padding that is never seen
+SENSOR_ITEM_NUM = {"hazard": 1, "blob": 2}
+SENSOR_OUTSIDE = 255
+
+
+class RangeSensor:
+    # a lidar like sensor for SIM. for each robot direction a table holds the
+    # cells within range and arc, ordered by distance, as indexes into the
+    # (2 * range + 1)^2 window around the robot, and for each cell the window
+    # cells its ray passes through. the map is a numpy copy padded by range on
+    # every side, so a sense is one window slice and a few masks, with no python
+    # loop over cells. hazards hide the cells behind them, blobs do not
+    def __init__(
+        self, sensorRange=SENSOR_RANGE_DEFAULT, arc=SENSOR_ARC_DEFAULT, occlusion=True
+    ):
+        if sensorRange < 1:
+            raise ValueError(f"sensor range must be at least 1: {sensorRange}")
+        if arc <= 0 or arc > 360:
+            raise ValueError(f"sensor arc must be in (0, 360]: {arc}")
+        self.__range = sensorRange
+        self.__arc = arc
+        self.__occlusion = occlusion
+        self.__map = None
+        self.__reported = None
+        self.__observed = None
+        self.__tables = {dir: self.__makeTable(dir) for dir in SENSOR_DIRECTIONS}
+
+    def getRange(self):
+        return self.__range
+
+    def getArc(self):
+        return self.__arc
+
+    def getCellCount(self, dir=(1, 0)):
+        return len(self.__tables[tuple(dir)][0])
+
+    def setMap(self, mapRows, hazardChecked=None, blobChecked=None):
+        # rows of sim codes indexed [y][x], the checked rows are items that are
+        # already known and never reported
+        height = len(mapRows)
+        width = len(mapRows[0]) if height else 0
+        r = self.__range
+        self.__map = np.full((height + 2 * r, width + 2 * r), SENSOR_OUTSIDE, np.uint8)
+        self.__reported = np.zeros(self.__map.shape, dtype=bool)
+        self.__observed = np.zeros(self.__map.shape, dtype=bool)
+        if height == 0 or width == 0:
+            return
+        inner = (slice(r, r + height), slice(r, r + width))
+        self.__map[inner] = self.__toArray(mapRows, width)
+        for checkedRows in (hazardChecked, blobChecked):
+            if checkedRows != None:
+                self.__reported[inner] |= self.__toArray(checkedRows, width) != 0
+
+    def setItems(self, typeName, positions, checked=False):
+        if typeName not in SENSOR_ITEM_NUM or not positions:
+            return
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        rows = positions[:, 1] + self.__range
+        cols = positions[:, 0] + self.__range
+        self.__map[rows, cols] = SENSOR_ITEM_NUM[typeName]
+        self.__reported[rows, cols] = checked
+
+    def sense(self, pos, dir):
+        # returns ({"hazard": [...], "blob": [...]}, observed) with the items
+        # seen for the first time and the cells observed for the first time
+        x, y = pos
+        cellIndex, rayIndex, cellRows, cellCols = self.__tables[tuple(dir)]
+        size = 2 * self.__range + 1
+        window = self.__map[y : y + size, x : x + size].ravel()
+        cells = window[cellIndex]
+        visible = cells != SENSOR_OUTSIDE
+        if self.__occlusion and rayIndex.shape[1] > 0:
+            # the last entry is the padding of rays shorter than the longest
+            blocked = np.zeros(len(window) + 1, dtype=bool)
+            blocked[:-1] = window == SENSOR_ITEM_NUM["hazard"]
+            visible &= ~blocked[rayIndex].any(axis=1)
+        rows = cellRows[visible] + y
+        cols = cellCols[visible] + x
+        cells = cells[visible]
+
+        isNew = ~self.__observed[rows, cols]
+        self.__observed[rows, cols] = True
+        r = self.__range
+        observed = list(zip((cols[isNew] - r).tolist(), (rows[isNew] - r).tolist()))
+
+        addedItem = {}
+        isItem = (cells != 0) & ~self.__reported[rows, cols]
+        for typeName, itemNum in SENSOR_ITEM_NUM.items():
+            isAdded = isItem & (cells == itemNum)
+            addedRows = rows[isAdded]
+            addedCols = cols[isAdded]
+            self.__reported[addedRows, addedCols] = True
+            addedItem[typeName] = list(
+                zip((addedCols - r).tolist(), (addedRows - r).tolist())
+            )
+        return addedItem, observed
+
+    def __makeTable(self, dir):
+        # offsets in range and arc, nearest first. a ray is the cells rounded
+        # from the straight line between the robot and the cell, both ends left
+        # out, so a hazard is seen but what lies behind it is not
+        r = self.__range
+        size = 2 * r + 1
+        dirX, dirY = dir
+        offsets = []
+        for dy in range(-r, r + 1):
+            for dx in range(-r, r + 1):
+                distance = math.hypot(dx, dy)
+                if distance == 0 or distance > r:
+                    continue
+                if self.__arc < 360:
+                    cosine = (dx * dirX + dy * dirY) / distance
+                    angle = math.degrees(math.acos(max(-1.0, min(1.0, cosine))))
+                    if angle > self.__arc / 2 + 1e-9:
+                        continue
+                offsets.append((distance, dx, dy))
+        offsets.sort()
+
+        rays = []
+        for distance, dx, dy in offsets:
+            steps = max(abs(dx), abs(dy))
+            rays.append(
+                [
+                    (math.floor(dy * k / steps + 0.5) + r) * size
+                    + math.floor(dx * k / steps + 0.5)
+                    + r
+                    for k in range(1, steps)
+                ]
+            )
+        rayLength = max((len(ray) for ray in rays), default=0)
+        rayIndex = np.full((len(rays), rayLength), size * size, dtype=np.intp)
+        for k, ray in enumerate(rays):
+            rayIndex[k, : len(ray)] = ray
+
+        dx = np.array([offset[1] for offset in offsets], dtype=np.intp)
+        dy = np.array([offset[2] for offset in offsets], dtype=np.intp)
+        cellIndex = (dy + r) * size + dx + r
+        # rows and columns in the padded map, the robot position is added later
+        return cellIndex, rayIndex, dy + r, dx + r
+
+    def __toArray(self, rows, width):
+        return np.frombuffer(b"".join(bytes(row) for row in rows), np.uint8).reshape(
+            -1, width
+        )
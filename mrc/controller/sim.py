@@ -7,13 +7,20 @@ class SIM:
     __TWO_MOVE_PROB = 0.05
     __DIR_LIST = [[1, 0], [0, 1], [-1, 0], [0, -1]]
 
-    def __init__(self, mapSize=None, robotPos=None, robotDir=None):
+    def __init__(
+        self, mapSize=None, robotPos=None, robotDir=None, seed=None, sensor=None
+    ):
+        self.__random = random if seed == None else random.Random(seed)
         self.__mapSize = None
         self.__map = None
         self.__hazardChecked = None
         self.__blobChecked = None
-        self.__robotPos = None
-        self.__robotDir = None
+        self.__robotPos = [None]
+        self.__robotDir = [None]
+        self.__occupied = {}
+        # without a sensor only the 4 neighbours are sensed
+        self.__sensor = sensor
+        self.__observed = {}
 
         if mapSize != None:
             self.setMapSize(mapSize)
@@ -25,22 +32,34 @@ class SIM:
     def setMapSize(self, mapSize):
         self.__mapSize = mapSize
         width, height = mapSize
-        self.__map = [[0 for i in range(width)] for j in range(height)]
-        self.__hazardChecked = [[False for i in range(width)] for j in range(height)]
-        self.__blobChecked = [[False for i in range(width)] for j in range(height)]
+        # one byte per cell, rows stay indexable as [y][x]
+        self.__map = [bytearray(width) for j in range(height)]
+        self.__hazardChecked = [bytearray(width) for j in range(height)]
+        self.__blobChecked = [bytearray(width) for j in range(height)]
+        if self.__sensor != None:
+            self.__sensor.setMap(self.__map)
+
+    def setSensor(self, sensor):
+        self.__sensor = sensor
+        if sensor != None and self.__map != None:
+            sensor.setMap(self.__map, self.__hazardChecked, self.__blobChecked)
+
+    def getSensor(self):
+        return self.__sensor
 
     def addItemRandPos(self, typeName, checked=False):
         if typeName in self.__ITEM_NUM:
             while True:
-                x, y = random.randint(0, self.__mapSize[0] - 1), random.randint(
-                    0, self.__mapSize[1] - 1
-                )
+                x = self.__random.randint(0, self.__mapSize[0] - 1)
+                y = self.__random.randint(0, self.__mapSize[1] - 1)
                 if self.__map[y][x] == 0:
                     self.__map[y][x] = self.__ITEM_NUM[typeName]
                     if typeName == "hazard":
                         self.__hazardChecked[y][x] = checked
                     elif typeName == "blob":
                         self.__blobChecked[y][x] = checked
+                    if self.__sensor != None:
+                        self.__sensor.setItems(typeName, [(x, y)], checked)
                     break
 
     def addItem(self, typeName, pos, checked=False):
@@ -51,46 +70,89 @@ class SIM:
                 self.__hazardChecked[y][x] = checked
             elif typeName == "blob":
                 self.__blobChecked[y][x] = checked
+            if self.__sensor != None:
+                self.__sensor.setItems(typeName, [pos], checked)
 
-    def setRobotPos(self, pos):
-        self.__robotPos = list(pos)
-        x, y = pos
-
-    def setRobotDir(self, dir):
-        self.__robotDir = dir
-
-    def rotate(self):
-        x, y = self.__robotDir
-        self.__robotDir = (y, -x)
-
-    def move(self):
-        prob = random.random()
+    def addItems(self, typeName, positions, checked=False):
+        if typeName not in self.__ITEM_NUM:
+            return
+        itemNum = self.__ITEM_NUM[typeName]
+        map = self.__map
+        if typeName == "hazard":
+            checkedMap = self.__hazardChecked
+        else:
+            checkedMap = self.__blobChecked
+        for x, y in positions:
+            map[y][x] = itemNum
+            checkedMap[y][x] = checked
+        if self.__sensor != None:
+            self.__sensor.setItems(typeName, positions, checked)
+
+    def addRobot(self, pos, dir):
+        self.__robotPos.append(list(pos))
+        self.__robotDir.append(dir)
+        self.__occupy(pos, 1)
+        return len(self.__robotPos) - 1
+
+    def getRobotCount(self):
+        return len(self.__robotPos)
+
+    def setRobotPos(self, pos, robotId=0):
+        if self.__robotPos[robotId] != None:
+            self.__occupy(self.__robotPos[robotId], -1)
+        self.__robotPos[robotId] = list(pos)
+        self.__occupy(pos, 1)
+
+    def setRobotDir(self, dir, robotId=0):
+        self.__robotDir[robotId] = dir
+
+    def rotate(self, robotId=0):
+        x, y = self.__robotDir[robotId]
+        self.__robotDir[robotId] = (y, -x)
+
+    def move(self, prob=None, robotId=0):
+        if prob == None:
+            prob = self.__random.random()
         if prob < self.__NO_MOVE_PROB:
             return
 
-        x, y = self.__robotPos
-        dx, dy = self.__robotDir
-
-        if self.isSafe(x + dx, y + dy):
-            self.__robotPos[0] += dx
-            self.__robotPos[1] += dy
-            if prob > 1 - self.__TWO_MOVE_PROB and self.isSafe(x + 2 * dx, y + 2 * dy):
-                self.__robotPos[0] += dx
-                self.__robotPos[1] += dy
+        robotPos = self.__robotPos[robotId]
+        x, y = robotPos
+        dx, dy = self.__robotDir[robotId]
+
+        # a robot never drives into a cell another robot is standing on
+        if self.isSafe(x + dx, y + dy) and self.__isFree(x + dx, y + dy):
+            self.__occupy(robotPos, -1)
+            robotPos[0] += dx
+            robotPos[1] += dy
+            if (
+                prob > 1 - self.__TWO_MOVE_PROB
+                and self.isSafe(x + 2 * dx, y + 2 * dy)
+                and self.__isFree(x + 2 * dx, y + 2 * dy)
+            ):
+                robotPos[0] += dx
+                robotPos[1] += dy
+            self.__occupy(robotPos, 1)
 
     def isSafe(self, x, y):
         return x >= 0 and x < self.__mapSize[0] and y >= 0 and y < self.__mapSize[1]
 
-    def getRobotPos(self):
-        return self.__robotPos
+    def getRobotPos(self, robotId=0):
+        return self.__robotPos[robotId]
+
+    def getRobotDir(self, robotId=0):
+        return self.__robotDir[robotId]
 
-    def getRobotDir(self):
-        return self.__robotDir
+    def getAddedItem(self, robotId=0):
+        if self.__sensor != None:
+            addedItem, self.__observed[robotId] = self.__sensor.sense(
+                self.__robotPos[robotId], self.__robotDir[robotId]
+            )
+            return addedItem
 
-    def getAddedItem(self):
         addedItem = {"hazard": [], "blob": []}
-        x, y = self.__robotPos
-        dx, dy = self.__robotDir
+        x, y = self.__robotPos[robotId]
+        dx, dy = self.__robotDir[robotId]
         front_x, front_y = x + dx, y + dy
 
         for dir in self.__DIR_LIST:
@@ -114,3 +176,18 @@ class SIM:
                     self.__hazardChecked[_y][_x] = True
 
         return addedItem
+
+    def getObservedCells(self, robotId=0):
+        # the cells the last getAddedItem saw for the first time
+        return self.__observed.pop(robotId, [])
+
+    def __isFree(self, x, y):
+        return (x, y) not in self.__occupied
+
+    def __occupy(self, pos, count):
+        pos = (pos[0], pos[1])
+        count += self.__occupied.get(pos, 0)
+        if count > 0:
+            self.__occupied[pos] = count
+        else:
+            self.__occupied.pop(pos, None)
@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import math
+import threading
+import time
+
+OVERRUN_POLICIES = ("skip", "catchup", "stretch")
+
+
+class Histogram:
+    # counts samples into fixed buckets, the last bucket has no upper bound
+    __BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+    def __init__(self, bounds=None):
+        self.__bounds = tuple(bounds) if bounds != None else self.__BOUNDS
+        self.reset()
+
+    def reset(self):
+        self.__counts = [0] * (len(self.__bounds) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+
+    def add(self, value):
+        k = 0
+        while k < len(self.__bounds) and value > self.__bounds[k]:
+            k += 1
+        self.__counts[k] += 1
+        self.__count += 1
+        self.__total += value
+        self.__max = max(self.__max, value)
+
+    def getData(self):
+        return {
+            "bounds": self.__bounds,
+            "counts": self.__counts[:],
+            "count": self.__count,
+            "mean": self.__total / self.__count if self.__count > 0 else 0.0,
+            "max": self.__max,
+        }
+
+
+class TickScheduler:
+    # calls tick on a fixed grid of monotonic deadlines, so time spent inside a
+    # tick does not push later ticks back. when a tick runs past the next
+    # deadline the overrun policy decides what happens to the grid:
+    #   skip     drop the missed deadlines and stay in phase
+    #   catchup  run the missed ticks back to back, at most maxCatchUp of them
+    #   stretch  start the grid again from the end of the long tick
+    # run drives it from a thread, runAsync from an asyncio task. in the latter
+    # tick may be a coroutine function
+    def __init__(self, period, tick, overrunPolicy="skip", maxCatchUp=4):
+        if overrunPolicy not in OVERRUN_POLICIES:
+            raise ValueError(f"unknown overrun policy: {overrunPolicy}")
+        self.__period = period
+        self.__tick = tick
+        self.__overrunPolicy = overrunPolicy
+        self.__maxCatchUp = maxCatchUp
+        self.__condition = threading.Condition()
+        self.__loop = None
+        self.__wakeEvent = None
+        self.__isRunning = False
+        self.__isTerminated = False
+        self.__deadline = None
+        self.__lastStartTime = None
+        self.__tickCount = 0
+        self.__overrunCount = 0
+        self.__skipCount = 0
+        self.__latencyHistogram = Histogram()
+        self.__jitterHistogram = Histogram()
+        self.__overrunHistogram = Histogram()
+
+    def start(self):
+        with self.__condition:
+            if not self.__isRunning:
+                self.__isRunning = True
+                self.__deadline = time.monotonic()
+                self.__lastStartTime = None
+                self.__wake()
+
+    def stop(self):
+        with self.__condition:
+            self.__isRunning = False
+            self.__wake()
+
+    def terminate(self):
+        with self.__condition:
+            self.__isTerminated = True
+            self.__isRunning = False
+            self.__wake()
+
+    def isRunning(self):
+        return self.__isRunning
+
+    def isTerminated(self):
+        return self.__isTerminated
+
+    def setPeriod(self, period):
+        with self.__condition:
+            self.__period = period
+            self.__wake()
+
+    def getPeriod(self):
+        return self.__period
+
+    def run(self):
+        with self.__condition:
+            while not self.__isTerminated:
+                if not self.__isRunning:
+                    self.__condition.wait()
+                    continue
+                now = time.monotonic()
+                if now < self.__deadline:
+                    # start, stop, terminate and setPeriod wake this wait early
+                    self.__condition.wait(self.__deadline - now)
+                    continue
+                self.__runTick(now)
+
+    async def runAsync(self):
+        # wake reads the loop first, so the event has to exist before the loop
+        # is published and outlive it at the end
+        self.__wakeEvent = asyncio.Event()
+        self.__loop = asyncio.get_running_loop()
+        try:
+            while not self.__isTerminated:
+                self.__wakeEvent.clear()
+                if not self.__isRunning:
+                    await self.__wakeEvent.wait()
+                    continue
+                now = time.monotonic()
+                if now < self.__deadline:
+                    try:
+                        await asyncio.wait_for(
+                            self.__wakeEvent.wait(), self.__deadline - now
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                with self.__condition:
+                    deadline = self.__beginTick(now)
+                result = self.__tick()
+                if inspect.isawaitable(result):
+                    await result
+                with self.__condition:
+                    self.__endTick(deadline)
+        finally:
+            self.__loop = None
+            self.__wakeEvent = None
+
+    def __wake(self):
+        self.__condition.notify_all()
+        loop = self.__loop
+        wakeEvent = self.__wakeEvent
+        if loop != None and wakeEvent != None:
+            try:
+                loop.call_soon_threadsafe(wakeEvent.set)
+            except RuntimeError:
+                # the loop is already closed
+                pass
+
+    def __runTick(self, startTime):
+        deadline = self.__beginTick(startTime)
+        self.__condition.release()
+        try:
+            self.__tick()
+        finally:
+            self.__condition.acquire()
+        self.__endTick(deadline)
+
+    def __beginTick(self, startTime):
+        deadline = self.__deadline
+        self.__latencyHistogram.add(startTime - deadline)
+        if self.__lastStartTime != None:
+            interval = startTime - self.__lastStartTime
+            self.__jitterHistogram.add(abs(interval - self.__period))
+        self.__lastStartTime = startTime
+        return deadline
+
+    def __endTick(self, deadline):
+        self.__tickCount += 1
+        endTime = time.monotonic()
+        nextDeadline = deadline + self.__period
+        if endTime > nextDeadline:
+            self.__overrunCount += 1
+            self.__overrunHistogram.add(endTime - nextDeadline)
+            nextDeadline = self.__getOverrunDeadline(deadline, endTime)
+        if self.__isRunning:
+            self.__deadline = nextDeadline
+
+    def __getOverrunDeadline(self, deadline, endTime):
+        period = self.__period
+        missed = math.ceil((endTime - deadline) / period) - 1
+        if self.__overrunPolicy == "stretch":
+            return endTime
+        if self.__overrunPolicy == "catchup" and missed <= self.__maxCatchUp:
+            return deadline + period
+        # the first deadline on the grid that is still ahead
+        self.__skipCount += missed
+        return deadline + (missed + 1) * period
+
+    def getStatData(self):
+        with self.__condition:
+            return {
+                "period": self.__period,
+                "overrunPolicy": self.__overrunPolicy,
+                "ticks": self.__tickCount,
+                "overruns": self.__overrunCount,
+                "skipped": self.__skipCount,
+                "latency": self.__latencyHistogram.getData(),
+                "jitter": self.__jitterHistogram.getData(),
+                "overrun": self.__overrunHistogram.getData(),
+            }
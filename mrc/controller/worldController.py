@@ -1,124 +1,139 @@
-from mrc.model.worldModel import WorldStateModel
-from mrc.view.worldView import WorldView
-from threading import Thread
-import time
-from .sim import SIM
+from mrc.view.worldView import WorldView, FRAME_RATE_DEFAULT
+from mrc.view.renderSys import RenderMailbox
+from mrc.view.voiceRcgSys import VoicePipeline
+from mrc.logSys import LogPipeline, LOG_LEVEL_DEFAULT
+from .asyncController import ControllerCore
+from .missionSys import loadMission
+from .commandSys import parseCommand
 
 
 class MobileRobotController:
-    __INIT_ROBOT_DIRECTION = (0, 1)
+    # the tk mainloop keeps the calling thread, the mission runs on the event
+    # loop of ControllerCore. view events are forwarded to the loop and world
+    # changes come back through the render mailbox
     __MOVE_DELAY = 0.3
-
-    def __init__(self):
-        self.__worldStateModel = WorldStateModel()
-        self.__worldView = WorldView()
-        self.__isStop = True
-        self.__isTerminated = False
-        self.__mainThread = Thread(target=self.__mainloop)
+    __CLOSE_TIMEOUT = 2.0
+
+    def __init__(
+        self,
+        frameRate=FRAME_RATE_DEFAULT,
+        overrunPolicy="skip",
+        logLevel=LOG_LEVEL_DEFAULT,
+        logPath=None,
+        recordDir=None,
+        missionPath=None,
+        voiceBackend="google",
+        voiceSource=None,
+        sensorRange=None,
+    ):
+        # log records are written by a background thread, to stderr or logPath
+        self.__logPipeline = LogPipeline(logLevel, path=logPath)
+        self.__renderMailbox = RenderMailbox()
+        # a mission file replaces the setup form
+        self.__mission = None
+        # read by the recognizer thread to clip voice command shapes
+        self.__mapSize = None
+        if missionPath != None:
+            self.__mission = loadMission(missionPath)
+        self.__controllerCore = ControllerCore(
+            self.__renderMailbox,
+            self.__MOVE_DELAY,
+            overrunPolicy,
+            recordDir,
+            sensorRange,
+        )
+        self.__worldView = WorldView(frameRate)
+        self.__worldView.setRenderMailbox(self.__renderMailbox)
+        # the microphone stays open from run() until the window closes
+        self.__voicePipeline = VoicePipeline(voiceBackend, voiceSource)
+        self.__voicePipeline.registerResultEventListener(self.__onVoiceResult)
         self.__addEventListener()
-        self.__sim = None
 
     def run(self):
-        self.__worldView.runGUI()
+        self.__logPipeline.start()
+        self.__controllerCore.start()
+        self.__voicePipeline.start()
+        if self.__mission != None:
+            self.__onSubmit(self.__mission)
+        self.__worldView.runGUI(self.__mission)
+        self.__controllerCore.join(self.__CLOSE_TIMEOUT)
+        self.__voicePipeline.stop(self.__CLOSE_TIMEOUT)
+        self.__logPipeline.stop()
 
-    def __mainloop(self):
-        while not self.__isTerminated:
-            if self.__isStop:
-                time.sleep(self.__MOVE_DELAY)
-                continue
+    def getRateStatData(self):
+        frameStatData = self.__worldView.getFrameStatData()
+        return {
+            "tickRate": self.__controllerCore.getTickRate(),
+            "frameRate": frameStatData["frameRate"],
+            "droppedFrames": self.__renderMailbox.getStatData()["dropped"],
+        }
 
-            behavior = self.__worldStateModel.getNextRobotBehavior()
-            print("behavior: ", behavior)
-            self.__worldStateModel.printRobotStat()
-            if behavior == None:
-                time.sleep(self.__MOVE_DELAY)
-                continue
-            # if behavior == "move":
-            #    self.__worldStateModel.moveRobot()
-            # elif behavior == "rotate":
-            #    self.__worldStateModel.rotateRobot()
+    def getTickStatData(self):
+        return self.__controllerCore.getTickStatData()
 
-            # worldData = self.__worldStateModel.getWorldData()
-            # self.__worldView.drawMap(worldData)
+    def getLatencyStatData(self):
+        return self.__controllerCore.getLatencyStatData()
 
-            if behavior == "move":
-                self.__sim.move()
-            elif behavior == "rotate":
-                self.__sim.rotate()
+    def getVoiceStatData(self):
+        return self.__voicePipeline.getStatData()
 
-            addedItem = self.__sim.getAddedItem()
-            robotPos = self.__sim.getRobotPos()
-            robotDir = self.__sim.getRobotDir()
+    def getLogStatData(self):
+        return self.__logPipeline.getStatData()
 
-            self.__worldStateModel.setRobotPosition(robotPos)
-            self.__worldStateModel.setRobotDirection(robotDir)
+    def setLogLevel(self, level):
+        self.__logPipeline.setLevel(level)
 
-            for itemName in addedItem:
-                for itemPos in addedItem[itemName]:
-                    self.__worldStateModel.addItem(itemName, itemPos)
+    def setTracing(self, isEnabled, capacity=None):
+        self.__controllerCore.setTracing(isEnabled, capacity)
 
-            worldData = self.__worldStateModel.getWorldData()
-            self.__worldView.drawMap(worldData)
+    def getTraceData(self):
+        return self.__controllerCore.getTraceData()
 
-            time.sleep(self.__MOVE_DELAY)
+    def exportTrace(self, path, format="jsonl"):
+        self.__controllerCore.exportTrace(path, format)
 
     def __onWindowClose(self):
-        self.__isTerminated = True
+        self.__controllerCore.postEvent("windowClose")
 
     def __onRobotMove(self, isStop):
-        self.__isStop = isStop
-
-    def __onVoiceResult(self, data):
-        if data != None:
-            itemName = data[0]
-            pos = data[1]
-            self.__worldStateModel.addItem(itemName, pos)
-            worldData = self.__worldStateModel.getWorldData()
-            self.__worldView.drawMap(worldData)
+        self.__controllerCore.postEvent("robotMove", isStop)
+
+    def __onVoiceRcg(self):
+        # the view waits for a status to end the command, so a request the
+        # pipeline turned down ends it here
+        if not self.__voicePipeline.requestCommand():
+            if self.__voicePipeline.isPending():
+                self.__worldView.setVoiceStatus("voice busy")
+            else:
+                self.__worldView.setVoiceStatus("voice not running")
+
+    def __onVoiceResult(self, voiceResult):
+        # runs on the recognizer thread, the command goes to the event queue of
+        # the core together with the capture times
+        text = voiceResult["text"]
+        if voiceResult["error"] != None:
+            self.__worldView.setVoiceStatus(voiceResult["error"])
+            return
+        if text == None:
+            self.__worldView.setVoiceStatus("no input")
+            return
+        command = parseCommand(text, self.__mapSize)
+        if command == None:
+            self.__worldView.setVoiceStatus(f"invalid input: {text}")
+        else:
+            self.__worldView.setVoiceStatus(text)
+            self.__controllerCore.postEvent("voiceResult", command, voiceResult)
 
     def __onSubmit(self, data):
         if data == None:
             return
 
-        mapSize = data["mapSize"]
-        startingPoint = data["startingPoint"]
-        targetPosArray = data["target"]
-        hazardPosArray = data["hazard"]
-
-        self.__worldView.initialize(mapSize)
-        self.__worldStateModel.initialize(
-            mapSize, startingPoint, self.__INIT_ROBOT_DIRECTION
-        )
-
-        # sim 초기화 부분. sim 맵은 초기 입력의 모든 아이템을 가지고 있다.
-
-        self.__sim = SIM(mapSize, startingPoint, self.__INIT_ROBOT_DIRECTION)
-
-        for targetPos in targetPosArray:
-            self.__worldStateModel.addItem("target", targetPos, updatePath=False)
-            self.__sim.addItem("target", targetPos)
-        for hazardPos in hazardPosArray:
-            self.__worldStateModel.addItem("hazard", hazardPos, updatePath=False)
-            self.__sim.addItem("hazard", hazardPos)
-
-        # sim에서 랜덤 위치에 보이지 않는 아이템 추가
-        self.__sim.addItemRandPos("blob")
-        self.__sim.addItemRandPos("blob")
-        self.__sim.addItemRandPos("hazard")
-        self.__sim.addItemRandPos("hazard")
-
-        addedItem = self.__sim.getAddedItem()
-        for itemName in addedItem:
-            for itemPos in addedItem[itemName]:
-                self.__worldStateModel.addItem(itemName, itemPos)
-
-        worldData = self.__worldStateModel.getWorldData()
-        self.__worldView.drawMap(worldData)
-
-        self.__mainThread.start()
+        self.__mapSize = tuple(data["mapSize"])
+        self.__worldView.initialize(data["mapSize"])
+        self.__controllerCore.postEvent("submit", data)
 
     def __addEventListener(self):
         self.__worldView.registerEventListener("submit", self.__onSubmit)
         self.__worldView.registerEventListener("robotMove", self.__onRobotMove)
         self.__worldView.registerEventListener("windowClose", self.__onWindowClose)
-        self.__worldView.registerEventListener("voiceResult", self.__onVoiceResult)
+        self.__worldView.registerEventListener("voiceRcg", self.__onVoiceRcg)
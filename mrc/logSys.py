@@ -0,0 +1,170 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+LOG_ROOT = "mrc"
+LOG_FORMATS = ("text", "json")
+LOG_LEVEL_DEFAULT = "INFO"
+LOG_QUEUE_SIZE_DEFAULT = 10000
+
+# nothing is written until a LogPipeline is started
+logging.getLogger(LOG_ROOT).addHandler(logging.NullHandler())
+
+
+def getLogger(name):
+    # modules pass __name__, so loggers follow the package layout under "mrc"
+    return logging.getLogger(name)
+
+
+class StructuredFormatter(logging.Formatter):
+    # fields passed as extra={"fields": {...}} are written as key=value pairs
+    # after the message, or as keys of one json object per line
+    def __init__(self, format="text"):
+        if format not in LOG_FORMATS:
+            raise ValueError(f"unknown log format: {format}")
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.__format = format
+
+    def format(self, record):
+        fields = dict(getattr(record, "fields", None) or {})
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+        if self.__format == "json":
+            logData = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": record.getMessage(),
+            }
+            logData.update(fields)
+            if record.exc_info:
+                logData["exc"] = self.formatException(record.exc_info)
+            return json.dumps(logData, default=str)
+        text = super().format(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class RateLimitFilter(logging.Filter):
+    # token bucket per logger and message. records below level that come faster
+    # than rate per second (after a burst) are dropped, and the next record
+    # that passes carries how many were dropped in between
+    def __init__(self, rate=10.0, burst=20, level=logging.WARNING):
+        super().__init__()
+        self.__rate = rate
+        self.__burst = burst
+        self.__level = level
+        self.__buckets = {}
+        self.__suppressedCount = 0
+        self.__lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.__level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.__lock:
+            bucket = self.__buckets.get(key)
+            if bucket == None:
+                bucket = [self.__burst, now, 0]
+                self.__buckets[key] = bucket
+            tokens = min(self.__burst, bucket[0] + (now - bucket[1]) * self.__rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                self.__suppressedCount += 1
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2] > 0:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+    def getSuppressedCount(self):
+        return self.__suppressedCount
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # a full queue drops the record instead of blocking the logging thread
+    def __init__(self, logQueue):
+        super().__init__(logQueue)
+        self.__droppedCount = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.__droppedCount += 1
+
+    def getDroppedCount(self):
+        return self.__droppedCount
+
+
+class LogPipeline:
+    # records from every mrc logger go through a bounded queue to a listener
+    # thread, which does the formatting and the writes. the thread that logs
+    # only pays for the filter and the enqueue
+    def __init__(
+        self,
+        level=LOG_LEVEL_DEFAULT,
+        stream=None,
+        path=None,
+        format="text",
+        rate=10.0,
+        burst=20,
+        queueSize=LOG_QUEUE_SIZE_DEFAULT,
+    ):
+        formatter = StructuredFormatter(format)
+        if path != None:
+            outputHandler = logging.FileHandler(path, encoding="utf-8")
+        else:
+            outputHandler = logging.StreamHandler(
+                stream if stream != None else sys.stderr
+            )
+        outputHandler.setFormatter(formatter)
+        self.__level = level
+        self.__rateLimitFilter = RateLimitFilter(rate, burst)
+        self.__queueHandler = DroppingQueueHandler(queue.Queue(queueSize))
+        self.__queueHandler.addFilter(self.__rateLimitFilter)
+        self.__listener = logging.handlers.QueueListener(
+            self.__queueHandler.queue, outputHandler
+        )
+        self.__isRunning = False
+
+    def start(self):
+        if self.__isRunning:
+            return
+        logger = logging.getLogger(LOG_ROOT)
+        logger.setLevel(self.__level)
+        logger.addHandler(self.__queueHandler)
+        self.__listener.start()
+        self.__isRunning = True
+
+    def stop(self):
+        # writes whatever is still queued before returning
+        if not self.__isRunning:
+            return
+        logging.getLogger(LOG_ROOT).removeHandler(self.__queueHandler)
+        self.__listener.stop()
+        self.__isRunning = False
+
+    def isRunning(self):
+        return self.__isRunning
+
+    def setLevel(self, level):
+        self.__level = level
+        logging.getLogger(LOG_ROOT).setLevel(level)
+
+    def getStatData(self):
+        return {
+            "queued": self.__queueHandler.queue.qsize(),
+            "dropped": self.__queueHandler.getDroppedCount(),
+            "suppressed": self.__rateLimitFilter.getSuppressedCount(),
+        }
@@ -1,13 +1,33 @@
+from mrc.logSys import getLogger
+from mrc.traceSys import TRACER
 from .mapSys import *
 
+logger = getLogger(__name__)
+
 
 class LatticeMap2DActor:
-    def __init__(self, map):
+    def __init__(self, map, robotId=0):
         self.__pos = None
         self.__dir = None
         self.__path = None
         self.__pathIndex = 0
+        self.__pathGoal = None
+        # the planned route while the robot steps from the distance field
+        self.__route = None
         self.__map = map
+        self.__robotId = robotId
+        self.__fleetPlanner = None
+        self.__particleFilter = None
+
+    def getRobotId(self):
+        return self.__robotId
+
+    def setFleetPlanner(self, fleetPlanner):
+        # a robot in a fleet takes its goal and path from the fleet planner
+        self.__fleetPlanner = fleetPlanner
+        self.__path = None
+        self.__pathIndex = 0
+        self.__route = None
 
     def setPosition(self, pos):
         self.__pos = pos
@@ -23,11 +43,42 @@ class LatticeMap2DActor:
     def getDirection(self):
         return self.__dir
 
+    def setParticleFilter(self, particleFilter):
+        # the filter starts at the current pose
+        self.__particleFilter = particleFilter
+        if particleFilter != None and self.__pos != None:
+            particleFilter.reset(self.__pos, self.__dir)
+
+    def localize(self, behavior, sensedPositions=()):
+        if self.__particleFilter == None:
+            return
+        spanStart = TRACER.startSpan()
+        self.__particleFilter.predict(behavior)
+        self.__particleFilter.correct(
+            sensedPositions, self.__map.getHazardData(), self.__map.getSensedData()
+        )
+        TRACER.endSpan("actor.localize", spanStart)
+
+    def getEstimatedPose(self):
+        # (pos, dir) the robot believes it has, None without a particle filter
+        if self.__particleFilter == None:
+            return None
+        pos, dir, confidence = self.__particleFilter.getEstimate()
+        return pos, dir
+
+    def getPoseConfidence(self):
+        # the share of the belief on the estimated pose
+        if self.__particleFilter == None:
+            return None
+        return self.__particleFilter.getEstimate()[2]
+
     def getNextBehavior(self):
+        if self.__fleetPlanner != None and self.__fleetPlanner.needsReplan(self):
+            self.updatePath()
         if self.__path == None or self.__pathIndex + 1 >= len(self.__path):
-            if self.__map.getGoalItem() == None:
+            if self.__getGoalItem() == None:
                 return None
-            else:
+            elif not self.__rejoinRoute():
                 self.updatePath()
                 if self.__path == None:
                     return None
@@ -37,15 +88,32 @@ class LatticeMap2DActor:
 
         x, y = self.__pos
         nextX, nextY = self.__path[self.__pathIndex + 1]
+        if nextX == x and nextY == y:
+            return "wait"
         dx, dy = self.__dir
         if nextX - x == dx and nextY - y == dy:
             return "move"
         return "rotate"
 
     def updatePath(self):
-        print("updatePath")
-        self.__path = self.__map.getPath(self)
+        logger.debug("updatePath", extra={"fields": {"robot": self.__robotId}})
+        TRACER.count("replans")
+        spanStart = TRACER.startSpan()
+        if self.__fleetPlanner != None:
+            self.__path = self.__fleetPlanner.getPath(self)
+        else:
+            self.__path = self.__map.getPath(self)
+        TRACER.endSpan("actor.updatePath", spanStart)
         self.__pathIndex = 0
+        self.__pathGoal = self.__path[-1] if self.__path else None
+        self.__route = None
+
+    def recoverPath(self):
+        # a robot that slipped off its route keeps its goal. it goes on along
+        # the route when it landed on it, otherwise it takes the next step from
+        # the distance field of the map instead of planning again
+        if not self.__rejoinRoute() and not self.__stepField():
+            self.updatePath()
 
     def isOnPath(self):
         if self.__pos == None or self.__path == None:
@@ -66,3 +134,62 @@ class LatticeMap2DActor:
         if self.__path == None:
             return None
         return self.__path[:]
+
+    def getPathGoal(self):
+        # the goal of the last planned route, also while following the field
+        return self.__pathGoal
+
+    def getRemainingPathData(self):
+        # from the current step to the goal
+        if self.__path == None:
+            return None
+        return self.__path[self.__pathIndex :]
+
+    def __stepField(self):
+        # the path becomes the next cell only, the planned route is kept so the
+        # robot can go back to it after the step. a fleet robot needs its
+        # reservations, so it always plans
+        if not self.__isPathGoalCurrent():
+            return False
+        nextStep = self.__map.getNextStep(self.__pos)
+        if nextStep == None:
+            return False
+        TRACER.count("recoveries")
+        if self.__route == None:
+            self.__route = self.__path
+        self.__path = [self.__pos, nextStep]
+        self.__pathIndex = 0
+        return True
+
+    def __rejoinRoute(self):
+        # continues the planned route from the current position when it is on
+        # it and no hazard has been found on the rest of it since
+        route = self.__path if self.__route == None else self.__route
+        if route == None or not self.__isPathGoalCurrent():
+            return False
+        x, y = self.__pos
+        index = None
+        for k, (routeX, routeY) in enumerate(route):
+            if routeX == x and routeY == y:
+                index = k
+        if index == None or index + 1 >= len(route):
+            return False
+        width = self.__map.getMapSize()[0]
+        hazardData = self.__map.getHazardData()
+        if any(hazardData[routeY * width + routeX] for routeX, routeY in route[index:]):
+            return False
+        self.__path = route
+        self.__pathIndex = index
+        self.__route = None
+        return True
+
+    def __isPathGoalCurrent(self):
+        if self.__fleetPlanner != None or self.__pathGoal == None:
+            return False
+        goalItem = self.__getGoalItem()
+        return goalItem != None and goalItem.getPosition() == self.__pathGoal
+
+    def __getGoalItem(self):
+        if self.__fleetPlanner != None:
+            return self.__fleetPlanner.getGoalItem(self)
+        return self.__map.getGoalItem(self.__pos)
@@ -0,0 +1,137 @@
+from collections import deque
+
+
+class ChangeLog:
+    # bounded log of world changes. every change bumps the version; consumers
+    # that fall behind the oldest retained change need a full snapshot. inside
+    # a batch the changes share one version until the version is read
+    def __init__(self, maxLength=4096):
+        self.__changes = deque(maxlen=maxLength)
+        self.__version = 0
+        self.__baseVersion = 0
+        self.__batchDepth = 0
+        self.__isVersionShared = False
+
+    def beginBatch(self):
+        self.__batchDepth += 1
+
+    def endBatch(self):
+        self.__batchDepth -= 1
+        if self.__batchDepth == 0:
+            self.__isVersionShared = False
+
+    def record(self, change):
+        if not self.__isVersionShared:
+            self.__version += 1
+            self.__isVersionShared = self.__batchDepth > 0
+        if len(self.__changes) == self.__changes.maxlen:
+            self.__baseVersion = self.__changes[0][0]
+        self.__changes.append((self.__version, change))
+
+    def reset(self):
+        self.__changes.clear()
+        self.__version += 1
+        self.__baseVersion = self.__version
+
+    def getVersion(self):
+        self.__isVersionShared = False
+        return self.__version
+
+    def getChanges(self, sinceVersion):
+        self.__isVersionShared = False
+        if (
+            sinceVersion == None
+            or sinceVersion < self.__baseVersion
+            or sinceVersion > self.__version
+        ):
+            return None
+        changes = []
+        for version, change in reversed(self.__changes):
+            if version <= sinceVersion:
+                break
+            changes.append(change)
+        changes.reverse()
+        return changes
+
+
+class WorldDataMirror:
+    # consumer side copy of the world that is kept current by applying deltas
+    def __init__(self):
+        self.__version = None
+        self.__visitedData = None
+        self.__observedData = None
+        self.__itemData = None
+        self.__robotData = None
+        self.__fleetData = None
+
+    def getVersion(self):
+        return self.__version
+
+    def apply(self, delta):
+        if delta == None:
+            return
+        if delta["full"]:
+            worldData = delta["worldData"]
+            self.__visitedData = worldData["visitedData"]
+            self.__observedData = worldData["observedData"]
+            self.__itemData = {
+                itemName: dict.fromkeys(positions)
+                for itemName, positions in worldData["itemData"].items()
+            }
+            self.__robotData = worldData["robotData"]
+            self.__fleetData = dict(worldData["fleetData"])
+        else:
+            for x, y in delta["visited"]:
+                self.__visitedData[y][x] = True
+            for x, y in delta["observed"]:
+                self.__observedData[y][x] = True
+            for kind, itemName, pos in delta["itemChanges"]:
+                if kind == "add":
+                    self.__itemData.setdefault(itemName, {})[pos] = None
+                elif itemName in self.__itemData:
+                    self.__itemData[itemName].pop(pos, None)
+            if delta["robotData"] != None:
+                self.__robotData = delta["robotData"]
+            self.__fleetData.update(delta["fleetData"])
+        self.__version = delta["version"]
+
+    def getWorldData(self):
+        if self.__version == None:
+            return None
+        return {
+            "visitedData": self.__visitedData,
+            "observedData": self.__observedData,
+            "robotData": self.__robotData,
+            "fleetData": self.__fleetData,
+            "itemData": self.__itemData,
+        }
+
+
+def mergeWorldDelta(olderDelta, newerDelta):
+    # combines two consecutive deltas into one that takes a consumer from the
+    # version before olderDelta straight to the version of newerDelta
+    if olderDelta == None or newerDelta["full"]:
+        return newerDelta
+    if olderDelta["full"]:
+        worldDataMirror = WorldDataMirror()
+        worldDataMirror.apply(olderDelta)
+        worldDataMirror.apply(newerDelta)
+        return {
+            "version": newerDelta["version"],
+            "full": True,
+            "worldData": worldDataMirror.getWorldData(),
+        }
+    robotData = newerDelta["robotData"]
+    if robotData == None:
+        robotData = olderDelta["robotData"]
+    fleetData = dict(olderDelta["fleetData"])
+    fleetData.update(newerDelta["fleetData"])
+    return {
+        "version": newerDelta["version"],
+        "full": False,
+        "visited": olderDelta["visited"] + newerDelta["visited"],
+        "observed": olderDelta["observed"] + newerDelta["observed"],
+        "itemChanges": olderDelta["itemChanges"] + newerDelta["itemChanges"],
+        "robotData": robotData,
+        "fleetData": fleetData,
+    }
@@ -0,0 +1,336 @@
+import time
+from heapq import heappush, heappop
+from mrc.traceSys import TRACER
+
+
+class ReservationTable:
+    # space-time cells and edges claimed by planned robots. a robot without a
+    # plan parks on its cell, which blocks the cell from the park time on
+    def __init__(self):
+        self.__cells = {}
+        self.__edges = {}
+        self.__parked = {}
+        self.__keys = {}
+
+    def reserve(self, robotId, route, startTime):
+        self.release(robotId)
+        cellKeys = []
+        edgeKeys = []
+        for k, cell in enumerate(route):
+            key = (startTime + k, cell)
+            self.__cells[key] = robotId
+            cellKeys.append(key)
+            if k + 1 < len(route):
+                key = (startTime + k, cell, route[k + 1])
+                self.__edges[key] = robotId
+                edgeKeys.append(key)
+        self.__keys[robotId] = (cellKeys, edgeKeys, None)
+
+    def park(self, robotId, cell, startTime):
+        self.release(robotId)
+        self.__parked[cell] = (startTime, robotId)
+        self.__keys[robotId] = ([], [], cell)
+
+    def release(self, robotId):
+        keys = self.__keys.pop(robotId, None)
+        if keys == None:
+            return
+        cellKeys, edgeKeys, parkedCell = keys
+        for key in cellKeys:
+            if self.__cells.get(key) == robotId:
+                del self.__cells[key]
+        for key in edgeKeys:
+            if self.__edges.get(key) == robotId:
+                del self.__edges[key]
+        if parkedCell != None:
+            parked = self.__parked.get(parkedCell)
+            if parked != None and parked[1] == robotId:
+                del self.__parked[parkedCell]
+
+    def isFree(self, t, cell, robotId):
+        owner = self.__cells.get((t, cell))
+        if owner != None and owner != robotId:
+            return False
+        parked = self.__parked.get(cell)
+        if parked != None and parked[1] != robotId and parked[0] <= t:
+            return False
+        return True
+
+    def isEdgeFree(self, t, fromCell, toCell, robotId):
+        # two robots may not swap cells in the same step
+        owner = self.__edges.get((t, toCell, fromCell))
+        return owner == None or owner == robotId
+
+    def getSize(self):
+        return len(self.__cells) + len(self.__edges) + len(self.__parked)
+
+
+class CooperativePlanner:
+    # windowed cooperative a*: the first window steps are searched in space-time
+    # against the reservation table, waits included. past the window the search
+    # ignores other robots, the robot replans before it gets there
+    def __init__(self, map, reservationTable, window=16):
+        self.__map = map
+        self.__reservationTable = reservationTable
+        self.__window = window
+        self.__expandedCount = 0
+
+    def getWindow(self):
+        return self.__window
+
+    def getExpandedCount(self):
+        return self.__expandedCount
+
+    def plan(self, robotId, startPos, goalPos, startTime):
+        width, height = self.__map.getMapSize()
+        lastRow = (height - 1) * width
+        hazard = self.__map.getHazardData()
+        reservationTable = self.__reservationTable
+        window = self.__window
+
+        goalX, goalY = goalPos
+        start = startPos[1] * width + startPos[0]
+        goal = goalY * width + goalX
+
+        # a state is (cell, depth) with depth capped at the window
+        startState = (start, 0)
+        cost = {startState: 0}
+        parent = {startState: None}
+        h = abs(startPos[0] - goalX) + abs(startPos[1] - goalY)
+        heap = [(h, h, 0, start)]
+        expanded = 0
+        found = None
+        while heap:
+            f, h, depth, i = heappop(heap)
+            g = f - h
+            state = (i, depth)
+            if g > cost[state]:
+                continue
+            expanded += 1
+            if i == goal and (
+                depth == window
+                or self.__isFreeUntil(goal, startTime + g, startTime + window, robotId)
+            ):
+                found = state
+                break
+
+            t = startTime + g
+            nextDepth = min(depth + 1, window)
+            x = i % width
+            y = i // width
+            for j, nx, ny in (
+                (i - 1, x - 1, y) if x > 0 else (-1, 0, 0),
+                (i + 1, x + 1, y) if x < width - 1 else (-1, 0, 0),
+                (i - width, x, y - 1) if i >= width else (-1, 0, 0),
+                (i + width, x, y + 1) if i < lastRow else (-1, 0, 0),
+                (i, x, y) if depth < window else (-1, 0, 0),
+            ):
+                if j < 0 or hazard[j]:
+                    continue
+                if depth < window and (
+                    not reservationTable.isFree(t + 1, j, robotId)
+                    or not reservationTable.isEdgeFree(t, i, j, robotId)
+                ):
+                    continue
+                nextState = (j, nextDepth)
+                nextG = g + 1
+                if nextState in cost and cost[nextState] <= nextG:
+                    continue
+                cost[nextState] = nextG
+                parent[nextState] = state
+                h = abs(nx - goalX) + abs(ny - goalY)
+                heappush(heap, (nextG + h, h, nextDepth, j))
+        self.__expandedCount = expanded
+
+        if found == None:
+            return None
+        route = []
+        state = found
+        while state != None:
+            route.append(state[0])
+            state = parent[state]
+        route.reverse()
+        return route
+
+    def __isFreeUntil(self, cell, fromTime, toTime, robotId):
+        for t in range(fromTime, toTime + 1):
+            if not self.__reservationTable.isFree(t, cell, robotId):
+                return False
+        return True
+
+
+class FleetPlanner:
+    # plans for every robot on a shared map. each robot claims its own goal and
+    # reserves the first window steps of its route, later robots plan around
+    # those reservations. a robot replans when it leaves its route, loses its
+    # goal or is half way through its reserved window
+    def __init__(self, map, window=16):
+        self.__map = map
+        self.__reservationTable = ReservationTable()
+        self.__cooperativePlanner = CooperativePlanner(
+            map, self.__reservationTable, window
+        )
+        self.__time = 0
+        self.__goalClaim = {}
+        # goals no robot holds per type, each with its rank and position
+        self.__unclaimed = {"blob": {}, "target": {}}
+        self.__goalData = {}
+        self.__goalCount = 0
+        self.__reclaim = set()
+        self.__planStart = {}
+        self.__planStatData = {}
+        for type in self.__unclaimed:
+            for item in map.getItemList(type):
+                self.__addUnclaimed(item)
+
+    def addRobot(self, actor):
+        # until its first plan a robot holds the cell it starts on
+        width = self.__map.getMapSize()[0]
+        x, y = actor.getPosition()
+        self.__reservationTable.park(actor.getRobotId(), y * width + x, self.__time)
+
+    def advance(self):
+        self.__time += 1
+
+    def getTime(self):
+        return self.__time
+
+    def setTime(self, time):
+        self.__time = time
+
+    def getGoalItem(self, actor):
+        robotId = actor.getRobotId()
+        goalItem = self.__goalClaim.get(robotId)
+        if goalItem != None and self.__isAlive(goalItem):
+            return goalItem
+        goalItem = self.__claimGoal(robotId, actor.getPosition())
+        return goalItem
+
+    def notifyGoalAdded(self, item):
+        # a new blob goes before every target, so robots heading for a target
+        # pick their goal again
+        self.__addUnclaimed(item)
+        if item.getItemName() != "blob":
+            return
+        for robotId, goalItem in self.__goalClaim.items():
+            if goalItem.getItemName() != "blob":
+                self.__reclaim.add(robotId)
+
+    def notifyGoalRemoved(self, item):
+        # a claim on the item is dropped when its robot next looks at it
+        unclaimed = self.__unclaimed.get(item.getItemName())
+        if unclaimed != None:
+            unclaimed.pop(item, None)
+            self.__goalData.pop(item, None)
+
+    def needsReplan(self, actor):
+        robotId = actor.getRobotId()
+        if robotId in self.__reclaim:
+            self.__reclaim.discard(robotId)
+            self.__releaseGoal(robotId)
+            return True
+        goalItem = self.__goalClaim.get(robotId)
+        if goalItem != None and not self.__isAlive(goalItem):
+            return True
+        planStart = self.__planStart.get(robotId)
+        if planStart == None:
+            return False
+        return self.__time - planStart >= self.__cooperativePlanner.getWindow() // 2
+
+    def getPath(self, actor):
+        robotId = actor.getRobotId()
+        width = self.__map.getMapSize()[0]
+        startPos = actor.getPosition()
+        goalItem = self.getGoalItem(actor)
+        self.__reservationTable.release(robotId)
+        self.__planStart[robotId] = self.__time
+        start = startPos[1] * width + startPos[0]
+        if goalItem == None:
+            self.__reservationTable.park(robotId, start, self.__time)
+            return None
+
+        startTime = time.perf_counter()
+        route = self.__cooperativePlanner.plan(
+            robotId, startPos, goalItem.getPosition(), self.__time
+        )
+        self.__recordPlanTime(robotId, time.perf_counter() - startTime)
+        TRACER.count("expanded", self.__cooperativePlanner.getExpandedCount())
+        if route == None:
+            self.__reservationTable.park(robotId, start, self.__time)
+            return None
+        window = self.__cooperativePlanner.getWindow()
+        self.__reservationTable.reserve(robotId, route[: window + 1], self.__time)
+        return [(i % width, i // width) for i in route]
+
+    def removeRobot(self, robotId):
+        self.__reservationTable.release(robotId)
+        self.__releaseGoal(robotId)
+        self.__reclaim.discard(robotId)
+        self.__planStart.pop(robotId, None)
+
+    def getStatData(self):
+        robots = {}
+        totalTime = 0.0
+        totalCount = 0
+        for robotId, (count, lastTime, robotTotalTime) in self.__planStatData.items():
+            robots[robotId] = {
+                "count": count,
+                "time": lastTime,
+                "totalTime": robotTotalTime,
+            }
+            totalTime += robotTotalTime
+            totalCount += count
+        return {
+            "time": self.__time,
+            "robots": robots,
+            "count": totalCount,
+            "totalTime": totalTime,
+            "meanTime": totalTime / max(totalCount, 1),
+            "reservations": self.__reservationTable.getSize(),
+        }
+
+    def __recordPlanTime(self, robotId, planTime):
+        count, lastTime, totalTime = self.__planStatData.get(robotId, (0, 0.0, 0.0))
+        self.__planStatData[robotId] = (count + 1, planTime, totalTime + planTime)
+
+    def __isAlive(self, item):
+        return self.__map.getItem(item.getPosition()) is item
+
+    def __claimGoal(self, robotId, pos):
+        # blobs before targets as for a single robot, the nearest unclaimed goal
+        # first. when every goal is claimed robots share the map's next goal
+        self.__releaseGoal(robotId)
+        x, y = pos
+        for type in ("blob", "target"):
+            goals = self.__unclaimed[type]
+            goalItem = None
+            for item, (rank, goalX, goalY) in goals.items():
+                distance = abs(goalX - x) + abs(goalY - y)
+                if (
+                    goalItem == None
+                    or distance < goalDistance
+                    or (distance == goalDistance and rank < goalRank)
+                ):
+                    goalItem, goalDistance, goalRank = item, distance, rank
+            if goalItem != None:
+                del goals[goalItem]
+                self.__goalClaim[robotId] = goalItem
+                return goalItem
+        return self.__map.getGoalItem(pos)
+
+    def __releaseGoal(self, robotId):
+        goalItem = self.__goalClaim.pop(robotId, None)
+        if goalItem != None and self.__isAlive(goalItem):
+            unclaimed = self.__unclaimed.get(goalItem.getItemName())
+            if unclaimed != None and goalItem not in unclaimed:
+                unclaimed[goalItem] = self.__goalData[goalItem]
+
+    def __addUnclaimed(self, item):
+        # the rank is the insertion order, it breaks ties between equally near
+        # goals the way the map's item lists would
+        unclaimed = self.__unclaimed.get(item.getItemName())
+        if unclaimed == None or item in self.__goalData:
+            return
+        self.__goalData[item] = (self.__goalCount, *item.getPosition())
+        self.__goalCount += 1
+        unclaimed[item] = self.__goalData[item]
@@ -0,0 +1,249 @@
+import numpy as np
+
+PARTICLE_COUNT_DEFAULT = 4000
+# the direction index of a particle follows SIM's direction list
+LOCALIZATION_DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+LOCALIZATION_DIRECTION_X = np.array(
+    [dir[0] for dir in LOCALIZATION_DIRECTIONS], dtype=np.int32
+)
+LOCALIZATION_DIRECTION_Y = np.array(
+    [dir[1] for dir in LOCALIZATION_DIRECTIONS], dtype=np.int32
+)
+
+# the slip of SIM.move, a move does nothing or goes two cells
+LOCALIZATION_NO_MOVE_PROB = 0.05
+LOCALIZATION_TWO_MOVE_PROB = 0.05
+
+# likelihood of a sensed item for a particle that could see its cell and for
+# one that could not, and of a particle standing on a known hazard
+LOCALIZATION_HIT_PROB = 0.9
+LOCALIZATION_MISS_PROB = 0.05
+LOCALIZATION_HAZARD_PROB = 0.05
+# likelihood of a particle facing a known hazard that no robot has sensed yet.
+# every sensor sees the cell ahead, so the robot would have sensed it there
+LOCALIZATION_UNSENSED_PROB = 1 - LOCALIZATION_HIT_PROB
+
+
+class ParticleFilter:
+    # belief over the pose (x, y, direction index) of one robot, kept as flat
+    # numpy arrays so predict, correct and resample are a handful of array ops.
+    # sensed items are landmarks at known cells, a particle is weighted by
+    # whether the item falls in its sensor footprint of sensorRange cells and
+    # sensorArc degrees
+    def __init__(
+        self,
+        mapSize,
+        particleCount=PARTICLE_COUNT_DEFAULT,
+        sensorRange=1,
+        sensorArc=360,
+        seed=None,
+    ):
+        self.__width, self.__height = mapSize
+        self.__particleCount = particleCount
+        self.__sensorRange = sensorRange
+        self.__arcCosine = np.cos(np.radians(sensorArc / 2))
+        self.__isFullArc = sensorArc >= 360
+        self.__rng = np.random.default_rng(seed)
+        self.__x = np.zeros(particleCount, dtype=np.int32)
+        self.__y = np.zeros(particleCount, dtype=np.int32)
+        self.__dir = np.zeros(particleCount, dtype=np.int32)
+        self.__weights = np.full(particleCount, 1 / particleCount)
+        self.__particleIndex = np.arange(particleCount)
+        # the heading of each particle as a step and the cells from the origin
+        # to the map edge ahead, so room ahead is edge - dirX * x - dirY * y.
+        # they change only on a turn or a resample, not on every move
+        self.__edgeTable = np.array(
+            [self.__width - 1, self.__height - 1, 0, 0], dtype=np.int32
+        )
+        self.__dirX = np.zeros(particleCount, dtype=np.int32)
+        self.__dirY = np.zeros(particleCount, dtype=np.int32)
+        self.__edge = np.zeros(particleCount, dtype=np.int32)
+        # scratch arrays reused by every update instead of allocated per step
+        self.__prob = np.empty(particleCount)
+        self.__isSet = np.empty(particleCount, dtype=bool)
+        self.__steps = np.empty(particleCount, dtype=np.int32)
+        self.__room = np.empty(particleCount, dtype=np.int32)
+        self.__scratch = np.empty(particleCount, dtype=np.int32)
+        self.__hazard = np.empty(particleCount, dtype=np.uint8)
+        self.__sensed = np.empty(particleCount, dtype=np.uint8)
+        self.__isUnsensed = np.empty(particleCount, dtype=bool)
+        self.__estimate = None
+        self.__resampleCount = 0
+
+    def reset(self, pos, dir):
+        # the starting pose of a mission is known
+        self.__x[:] = pos[0]
+        self.__y[:] = pos[1]
+        self.__dir[:] = self.__getDirIndex(dir)
+        self.__updateHeading()
+        self.__weights[:] = 1 / self.__particleCount
+        self.__estimate = None
+
+    def predict(self, behavior):
+        if behavior == "rotate":
+            # SIM.rotate turns (x, y) into (y, -x), one index down
+            self.__dir += 3
+            self.__dir &= 3
+            self.__updateHeading()
+        elif behavior == "move":
+            # 0, 1 or 2 steps, cut short where the map ends. x and y stay in
+            # the map, which the hazard lookup of correct relies on
+            prob = self.__rng.random(out=self.__prob)
+            steps = self.__steps
+            np.greater_equal(prob, LOCALIZATION_NO_MOVE_PROB, out=self.__isSet)
+            np.copyto(steps, self.__isSet)
+            np.greater(prob, 1 - LOCALIZATION_TWO_MOVE_PROB, out=self.__isSet)
+            steps += self.__isSet
+            room = self.__room
+            scratch = self.__scratch
+            np.copyto(room, self.__edge)
+            room -= np.multiply(self.__dirX, self.__x, out=scratch)
+            room -= np.multiply(self.__dirY, self.__y, out=scratch)
+            np.minimum(steps, room, out=steps)
+            self.__x += np.multiply(self.__dirX, steps, out=scratch)
+            self.__y += np.multiply(self.__dirY, steps, out=scratch)
+        else:
+            return
+        self.__estimate = None
+
+    def correct(self, positions=(), hazardData=None, sensedData=None):
+        # positions are the items sensed this step, hazardData the hazard plane
+        # and sensedData the sensed plane of LatticeMap2D, both of the map size
+        # the filter was made for. resamples when the weights have degenerated
+        weights = self.__weights
+        if len(positions) > 0:
+            # one row per item, so the sum over items runs along whole rows
+            items = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+            dx = items[:, 0, None] - self.__x
+            dy = items[:, 1, None] - self.__y
+            distanceSquare = dx * dx + dy * dy
+            isSeen = (distanceSquare > 0) & (
+                distanceSquare <= self.__sensorRange * self.__sensorRange
+            )
+            if not self.__isFullArc:
+                isSeen &= (
+                    dx * self.__dirX + dy * self.__dirY
+                    >= self.__arcCosine * np.sqrt(distanceSquare) - 1e-9
+                )
+            # the likelihood for every hit count is looked up, not computed
+            hitCount = np.arange(len(items) + 1)
+            likelihood = LOCALIZATION_HIT_PROB**hitCount * LOCALIZATION_MISS_PROB ** (
+                len(items) - hitCount
+            )
+            weights *= likelihood[isSeen.sum(axis=0)]
+        if hazardData != None:
+            # predict keeps every particle inside the map, so each index is a
+            # cell of the plane
+            hazardPlane = np.frombuffer(hazardData, dtype=np.uint8)
+            cell = np.multiply(self.__y, self.__width, out=self.__scratch)
+            cell += self.__x
+            isHazard = np.take(hazardPlane, cell, out=self.__hazard).view(bool)
+            np.multiply(weights, LOCALIZATION_HAZARD_PROB, out=weights, where=isHazard)
+            if sensedData != None:
+                self.__correctAhead(hazardPlane, sensedData)
+        total = weights.sum()
+        if total <= 0:
+            weights[:] = 1 / self.__particleCount
+        else:
+            weights /= total
+        if 1 / np.dot(weights, weights) < self.__particleCount / 2:
+            self.__resample()
+        self.__estimate = None
+
+    def getEstimate(self):
+        # (pos, dir, confidence), the pose with the most weight and that weight
+        if self.__estimate == None:
+            # poses are counted in the box around the particles, which is small
+            # once the belief has settled. a wide belief is sorted instead
+            minX, maxX = int(self.__x.min()), int(self.__x.max())
+            minY, maxY = int(self.__y.min()), int(self.__y.max())
+            boxWidth = maxX - minX + 1
+            keys = np.subtract(self.__y, minY, out=self.__scratch)
+            keys *= boxWidth
+            keys += self.__x
+            keys -= minX
+            keys *= 4
+            keys += self.__dir
+            if boxWidth * (maxY - minY + 1) * 4 <= 16 * self.__particleCount:
+                poseWeights = np.bincount(keys, weights=self.__weights)
+                key = int(np.argmax(poseWeights))
+                confidence = poseWeights[key]
+            else:
+                uniqueKeys, inverse = np.unique(keys, return_inverse=True)
+                poseWeights = np.bincount(inverse, weights=self.__weights)
+                k = int(np.argmax(poseWeights))
+                key = int(uniqueKeys[k])
+                confidence = poseWeights[k]
+            cell, dirIndex = divmod(key, 4)
+            self.__estimate = (
+                (minX + cell % boxWidth, minY + cell // boxWidth),
+                LOCALIZATION_DIRECTIONS[dirIndex],
+                float(confidence),
+            )
+        return self.__estimate
+
+    def getParticleCount(self):
+        return self.__particleCount
+
+    def getResampleCount(self):
+        return self.__resampleCount
+
+    def __correctAhead(self, hazardPlane, sensedData):
+        # negative evidence: the cell ahead of a particle was sensed and held no
+        # new item. a particle at the map edge has no cell ahead and looks at
+        # its own cell, which the mask leaves out
+        isAhead = self.__isSet
+        room = self.__room
+        np.copyto(room, self.__edge)
+        room -= np.multiply(self.__dirX, self.__x, out=self.__scratch)
+        room -= np.multiply(self.__dirY, self.__y, out=self.__scratch)
+        np.greater(room, 0, out=isAhead)
+        cell = np.multiply(self.__dirY, isAhead, out=self.__steps)
+        cell += self.__y
+        cell *= self.__width
+        cell += self.__x
+        cell += np.multiply(self.__dirX, isAhead, out=self.__scratch)
+        isHazard = np.take(hazardPlane, cell, out=self.__hazard)
+        isSensed = np.take(
+            np.frombuffer(sensedData, dtype=np.uint8), cell, out=self.__sensed
+        )
+        isUnsensed = np.greater(isHazard, isSensed, out=self.__isUnsensed)
+        isUnsensed &= isAhead
+        np.multiply(
+            self.__weights,
+            LOCALIZATION_UNSENSED_PROB,
+            out=self.__weights,
+            where=isUnsensed,
+        )
+
+    def __resample(self):
+        # systematic resampling, one random offset for n evenly spaced pointers.
+        # the pointers below each cumulative weight give how often each
+        # particle is copied
+        n = self.__particleCount
+        pointerCount = (
+            np.floor(np.cumsum(self.__weights) * n - self.__rng.random()).astype(
+                np.int64
+            )
+            + 1
+        )
+        pointerCount[-1] = n
+        np.minimum(pointerCount, n, out=pointerCount)
+        index = np.repeat(self.__particleIndex, np.diff(pointerCount, prepend=0))
+        self.__x = self.__x[index]
+        self.__y = self.__y[index]
+        self.__dir = self.__dir[index]
+        self.__updateHeading()
+        self.__weights[:] = 1 / n
+        self.__resampleCount += 1
+
+    def __updateHeading(self):
+        np.take(LOCALIZATION_DIRECTION_X, self.__dir, out=self.__dirX)
+        np.take(LOCALIZATION_DIRECTION_Y, self.__dir, out=self.__dirY)
+        np.take(self.__edgeTable, self.__dir, out=self.__edge)
+
+    def __getDirIndex(self, dir):
+        dir = tuple(dir)
+        if dir not in LOCALIZATION_DIRECTIONS:
+            raise ValueError(f"unknown direction: {dir}")
+        return LOCALIZATION_DIRECTIONS.index(dir)
@@ -1,116 +1,108 @@
-from queue import Queue
+import time
+from types import MappingProxyType
+from mrc.traceSys import TRACER
+from .planSys import *
+from .tourSys import *
 
 
 class PathCalculator:
-    def __init__(self, map):
+    def __init__(self, map, planner="bfs"):
         self.__map = map
-        width, height = map.getMapSize()
-        self.__inf = width * height
-        self.__minMove = [[self.__inf for i in range(width)] for j in range(height)]
+        self.__plannerName = None
+        self.__planner = None
+        self.__recoveryField = None
+        self.__planTime = 0.0
+        self.__planCount = 0
+        self.__totalPlanTime = 0.0
+        self.setPlanner(planner)
+
+    def setPlanner(self, planner):
+        if planner not in PLANNER_TYPES:
+            raise ValueError(f"unknown planner: {planner}")
+        # search buffers are allocated on the first search, not with the map
+        self.__plannerName = planner
+        self.__planner = None
+        self.__recoveryField = None
+
+    def getPlannerName(self):
+        return self.__plannerName
 
     def calculatePath(self, actor):
         startPos = actor.getPosition()
-        goalItem = self.__map.getGoalItem()
+        goalItem = self.__map.getGoalItem(startPos)
 
         if goalItem == None:
             return None
-        goalCell = goalItem.getCell()
-        goalPos = goalCell.getPosition()
-
-        self.__fillMinMove(startPos, goalPos)
-        return self.__getRoute(startPos, goalPos)
-
-    def __initMinMove(self):
-        width, height = self.__map.getMapSize()
-        for y in range(height):
-            for x in range(width):
-                self.__minMove[y][x] = self.__inf
-
-    def __fillMinMove(self, startPos, goalPos):
-        self.__initMinMove()
+        goalPos = goalItem.getPosition()
+
+        planner = self.__getPlanner()
+        startTime = time.perf_counter()
+        route = planner.plan(startPos, goalPos)
+        self.__planTime = time.perf_counter() - startTime
+        TRACER.count("expanded", planner.getExpandedCount())
+        self.__planCount += 1
+        self.__totalPlanTime += self.__planTime
+        return route
 
-        x, y = startPos
-        width, height = self.__map.getMapSize()
+    def calculateNextStep(self, pos):
+        goalItem = self.__map.getGoalItem(pos)
 
-        q = Queue()
-        q.put((x, y, 0))
-        while not q.empty():
-            x, y, moveCnt = q.get()
-            if moveCnt >= self.__minMove[y][x]:
-                continue
-            self.__minMove[y][x] = moveCnt
-            if (x, y) == goalPos:
-                break
-            if x > 0 and self.__map.getItemName((x - 1, y)) != "hazard":
-                q.put((x - 1, y, moveCnt + 1))
-            if x < width - 1 and self.__map.getItemName((x + 1, y)) != "hazard":
-                q.put((x + 1, y, moveCnt + 1))
-            if y > 0 and self.__map.getItemName((x, y - 1)) != "hazard":
-                q.put((x, y - 1, moveCnt + 1))
-            if y < height - 1 and self.__map.getItemName((x, y + 1)) != "hazard":
-                q.put((x, y + 1, moveCnt + 1))
-
-    def __getRoute(self, startPos, goalPos):
-        x, y = goalPos
-        width, height = self.__map.getMapSize()
-
-        if self.__minMove[y][x] >= self.__inf:
+        if goalItem == None:
             return None
-        route = []
-        move_cnt = self.__minMove[y][x]
-        route.append((x, y))
-        while move_cnt > 0:
-            if x > 0 and self.__minMove[y][x - 1] == move_cnt - 1:
-                x -= 1
-            elif x < width - 1 and self.__minMove[y][x + 1] == move_cnt - 1:
-                x += 1
-            elif y > 0 and self.__minMove[y - 1][x] == move_cnt - 1:
-                y -= 1
-            elif y < height - 1 and self.__minMove[y + 1][x] == move_cnt - 1:
-                y += 1
+        goalPos = goalItem.getPosition()
+        return self.__getRecoveryField().getNextStep(pos, goalPos)
+
+    def notifyCellChanged(self, pos):
+        if self.__planner != None:
+            self.__planner.notifyCellChanged(pos)
+        if self.__recoveryField != None and self.__recoveryField is not self.__planner:
+            self.__recoveryField.notifyCellChanged(pos)
+
+    def getStatData(self):
+        statData = self.__getPlanner().getStatData()
+        statData["planner"] = self.__plannerName
+        statData["time"] = self.__planTime
+        statData["count"] = self.__planCount
+        statData["totalTime"] = self.__totalPlanTime
+        return statData
+
+    def __getPlanner(self):
+        if self.__planner == None:
+            self.__planner = createPlanner(self.__plannerName, self.__map)
+        return self.__planner
+
+    def __getRecoveryField(self):
+        # next steps always come from a distance field, whatever plans the
+        # routes. it is only built on the first recovery, and the field planner
+        # is reused when it is the planner
+        if self.__recoveryField == None:
+            if self.__plannerName == "field":
+                self.__recoveryField = self.__getPlanner()
             else:
-                return None
-            route.append((x, y))
-            move_cnt -= 1
-
-        a, b = startPos
-        if x != a and y != b:
-            return None
-
-        route.reverse()
-        return route
-
-
-class Cell:
-    def __init__(self, x, y):
-        self.__x = x
-        self.__y = y
-        self.__item = None
-        self.__visited = False
-
-    def setVisited(self):
-        self.__visited = True
-
-    def getVisited(self):
-        return self.__visited
-
-    def setItem(self, item):
-        self.__item = item
-
-    def getItem(self):
-        return self.__item
-
-    def getPosition(self):
-        return (self.__x, self.__y)
+                self.__recoveryField = DistanceFieldPlanner(self.__map)
+        return self.__recoveryField
 
 
 class LatticeMap2D:
-    def __init__(self, width, height):
+    # per cell state lives in flat byte planes indexed by y * width + x and item
+    # objects only in a side table, so an empty cell costs four bytes
+    __ITEM_CODE = {"target": 1, "blob": 2, "hazard": 3}
+
+    def __init__(self, width, height, planner="bfs", goalOrder="insertion"):
         self.__width = width
         self.__height = height
-        self.__mapCells = [[Cell(i, j) for i in range(width)] for j in range(height)]
+        self.__visitedPlane = bytearray(width * height)
+        self.__observedPlane = bytearray(width * height)
+        self.__sensedPlane = bytearray(width * height)
+        self.__itemPlane = bytearray(width * height)
+        self.__hazardPlane = bytearray(width * height)
+        self.__itemTable = {}
         self.__itemFactory = ItemFactory()
-        self.__pathCalculator = PathCalculator(self)
+        self.__pathCalculator = PathCalculator(self, planner)
+        self.__tourPlanner = None
+        self.__fleetPlanner = None
+        self.__changeLog = None
+        self.setGoalOrder(goalOrder)
 
     def isValidLocation(self, loc):
         if loc != None:
@@ -121,46 +113,171 @@ class LatticeMap2D:
     def getPath(self, actor):
         return self.__pathCalculator.calculatePath(actor)
 
+    def getNextStep(self, pos):
+        if not self.isValidLocation(pos):
+            return None
+        return self.__pathCalculator.calculateNextStep(pos)
+
+    def setPlanner(self, planner):
+        self.__pathCalculator.setPlanner(planner)
+
+    def setGoalOrder(self, goalOrder):
+        if goalOrder == "insertion":
+            self.__tourPlanner = None
+        elif goalOrder == "tour":
+            self.__tourPlanner = TourPlanner(self)
+        else:
+            raise ValueError(f"unknown goal order: {goalOrder}")
+
+    def setFleetPlanner(self, fleetPlanner):
+        # the fleet planner keeps its unclaimed goals from the goals added and
+        # removed here
+        self.__fleetPlanner = fleetPlanner
+
+    def getTourData(self):
+        if self.__tourPlanner == None:
+            return None
+        return [item.getPosition() for item in self.__tourPlanner.getTour()]
+
+    def getPathStatData(self):
+        return self.__pathCalculator.getStatData()
+
+    def setChangeLog(self, changeLog):
+        self.__changeLog = changeLog
+
     def setVisited(self, pos):
         if self.isValidLocation(pos):
             x, y = pos
-            cell = self.__mapCells[y][x]
-            cell.setVisited()
-            item = cell.getItem()
+            i = y * self.__width + x
+            if not self.__visitedPlane[i]:
+                self.__visitedPlane[i] = 1
+                if self.__changeLog != None:
+                    self.__changeLog.record(("visited", (x, y)))
+            item = self.__itemTable.pop(i, None)
 
             if item != None:
-                cell.setItem(None)
-                self.__itemFactory.removeItem(item)
+                self.__itemPlane[i] = 0
+                self.__removeFactoryItem(item)
+                self.__setHazard(i, False)
+
+    def setObserved(self, positions):
+        # cells a sensor has seen, unlike a visited cell the item on it stays
+        width = self.__width
+        observedPlane = self.__observedPlane
+        for pos in positions:
+            if self.isValidLocation(pos):
+                x, y = pos
+                i = y * width + x
+                if not observedPlane[i]:
+                    observedPlane[i] = 1
+                    if self.__changeLog != None:
+                        self.__changeLog.record(("observed", (x, y)))
+
+    def setSensed(self, positions):
+        # cells whose item a robot has sensed, the items of the other cells
+        # only came from the mission or a voice command so far
+        width = self.__width
+        sensedPlane = self.__sensedPlane
+        for pos in positions:
+            if self.isValidLocation(pos):
+                x, y = pos
+                sensedPlane[y * width + x] = 1
 
     def addItem(self, type, loc):
         if not self.isValidLocation(loc):
             return
-        cell = self.__getCell(loc)
-        oldItem = cell.getItem()
+        x, y = loc
+        i = y * self.__width + x
+        oldItem = self.__itemTable.get(i)
         if oldItem != None:
             if oldItem.getItemName() == type:
                 return
-            self.__itemFactory.removeItem(oldItem)
-        item = self.__itemFactory.createItem(type)
+            self.__removeFactoryItem(oldItem)
+        item = self.__itemFactory.createItem(type, (x, y))
         if item != None:
-            cell.setItem(item)
-            item.setCell(cell)
+            self.__itemTable[i] = item
+            self.__itemPlane[i] = self.__ITEM_CODE[type]
+            if self.__changeLog != None:
+                self.__changeLog.record(("add", type, (x, y)))
+            if self.__isGoal(item):
+                self.__notifyGoalAdded(item)
+        self.__setHazard(i, self.__itemPlane[i] == self.__ITEM_CODE["hazard"])
+
+    def addItems(self, type, positions):
+        # addItem for many positions of one type. runs of empty cells are filled
+        # in one pass, a cell that already holds an item goes through addItem so
+        # the items keep the order of positions
+        code = self.__ITEM_CODE.get(type)
+        if code == None:
+            return
+        width = self.__width
+        height = self.__height
+        itemPlane = self.__itemPlane
+        itemTable = self.__itemTable
+        pending = []
+        for x, y in positions:
+            if x < 0 or x >= width or y < 0 or y >= height:
+                continue
+            i = y * width + x
+            if itemPlane[i]:
+                # a cell claimed by pending is not in the table yet
+                if i in itemTable:
+                    self.__addNewItems(type, pending)
+                    pending = []
+                    self.addItem(type, (x, y))
+                continue
+            itemPlane[i] = code
+            pending.append((i, (x, y)))
+        self.__addNewItems(type, pending)
 
     def removeItem(self, loc):
         if not self.isValidLocation(loc):
             return
-        cell = self.__getCell(loc)
-        item = cell.getItem()
+        x, y = loc
+        i = y * self.__width + x
+        item = self.__itemTable.pop(i, None)
         if item != None:
-            cell.setItem(None)
-            self.__itemFactory.removeItem(item)
+            self.__itemPlane[i] = 0
+            self.__removeFactoryItem(item)
+            self.__setHazard(i, False)
+
+    def removeItems(self, positions):
+        # removeItem for many positions, the item version moves once
+        width = self.__width
+        height = self.__height
+        itemTable = self.__itemTable
+        removed = []
+        for x, y in positions:
+            if x < 0 or x >= width or y < 0 or y >= height:
+                continue
+            i = y * width + x
+            item = itemTable.pop(i, None)
+            if item != None:
+                self.__itemPlane[i] = 0
+                removed.append((i, item))
+        if not removed:
+            return
+        self.__itemFactory.removeItems([item for i, item in removed])
+        for i, item in removed:
+            if self.__changeLog != None:
+                self.__changeLog.record(
+                    ("remove", item.getItemName(), item.getPosition())
+                )
+            if self.__isGoal(item):
+                self.__notifyGoalRemoved(item)
+            self.__setHazard(i, False)
+
+    def beginBatch(self):
+        self.__itemFactory.beginBatch()
+
+    def endBatch(self):
+        self.__itemFactory.endBatch()
 
     def getItem(self, loc):
         if not self.isValidLocation(loc):
             return None
-        cell = self.__getCell(loc)
-        item = cell.getItem()
-        return item
+        x, y = loc
+        return self.__itemTable.get(y * self.__width + x)
 
     def getItemName(self, loc):
         item = self.getItem(loc)
@@ -172,39 +289,120 @@ class LatticeMap2D:
         return self.__itemFactory.getData()
 
     def getVisitedData(self):
-        visitedData = []
-        for cellRow in self.__mapCells:
-            visitedDataRow = []
-            for cell in cellRow:
-                visitedDataRow.append(cell.getVisited())
-            visitedData.append(visitedDataRow)
-        return visitedData
-
-    def getGoalItem(self):
+        width = self.__width
+        visitedPlane = self.__visitedPlane
+        return [
+            list(map(bool, visitedPlane[i : i + width]))
+            for i in range(0, width * self.__height, width)
+        ]
+
+    def getObservedData(self):
+        width = self.__width
+        observedPlane = self.__observedPlane
+        return [
+            list(map(bool, observedPlane[i : i + width]))
+            for i in range(0, width * self.__height, width)
+        ]
+
+    def getHazardData(self):
+        return self.__hazardPlane
+
+    def getSensedData(self):
+        return self.__sensedPlane
+
+    def getItemList(self, type):
+        return self.__itemFactory.getItemList(type)
+
+    def getGoalItem(self, startPos=None):
+        if self.__tourPlanner != None:
+            return self.__tourPlanner.getNextGoal(startPos)
         return self.__itemFactory.getNextGoal()
 
     def getMapSize(self):
         return (self.__width, self.__height)
 
-    def __getCell(self, loc):
-        if self.isValidLocation(loc):
-            x, y = loc
-            return self.__mapCells[y][x]
-        return None
+    def getSnapshot(self):
+        # positions per item type in insertion order, which decides the next goal
+        items = {
+            type: [item.getPosition() for item in self.__itemFactory.getItemList(type)]
+            for type in self.__ITEM_CODE
+        }
+        return {
+            "visited": bytes(self.__visitedPlane),
+            "observed": bytes(self.__observedPlane),
+            "items": items,
+        }
+
+    def restoreSnapshot(self, snapshot):
+        # the snapshot replaces the items on the map, it does not add to them
+        width = self.__width
+        self.removeItems([(i % width, i // width) for i in list(self.__itemTable)])
+        self.__visitedPlane[:] = snapshot["visited"]
+        self.__observedPlane[:] = snapshot["observed"]
+        for type, positions in snapshot["items"].items():
+            for pos in positions:
+                self.addItem(type, pos)
+
+    def __setHazard(self, i, isHazard):
+        value = 1 if isHazard else 0
+        if self.__hazardPlane[i] != value:
+            self.__hazardPlane[i] = value
+            loc = (i % self.__width, i // self.__width)
+            self.__pathCalculator.notifyCellChanged(loc)
+            if self.__tourPlanner != None:
+                self.__tourPlanner.notifyCellChanged(loc)
+
+    def __addNewItems(self, type, pending):
+        # pending cells are empty and already carry the item code
+        if not pending:
+            return
+        items = self.__itemFactory.createItems(type, [pos for i, pos in pending])
+        for (i, pos), item in zip(pending, items):
+            self.__itemTable[i] = item
+            if self.__changeLog != None:
+                self.__changeLog.record(("add", type, pos))
+        if type == "hazard":
+            for i, pos in pending:
+                self.__setHazard(i, True)
+        else:
+            for item in items:
+                self.__notifyGoalAdded(item)
+
+    def __isGoal(self, item):
+        return item.getItemName() == "blob" or item.getItemName() == "target"
+
+    def __removeFactoryItem(self, item):
+        self.__itemFactory.removeItem(item)
+        if self.__changeLog != None:
+            self.__changeLog.record(("remove", item.getItemName(), item.getPosition()))
+        if self.__isGoal(item):
+            self.__notifyGoalRemoved(item)
+
+    def __notifyGoalAdded(self, item):
+        if self.__tourPlanner != None:
+            self.__tourPlanner.notifyGoalAdded(item)
+        if self.__fleetPlanner != None:
+            self.__fleetPlanner.notifyGoalAdded(item)
+
+    def __notifyGoalRemoved(self, item):
+        if self.__tourPlanner != None:
+            self.__tourPlanner.notifyGoalRemoved(item)
+        if self.__fleetPlanner != None:
+            self.__fleetPlanner.notifyGoalRemoved(item)
 
 
 class MapItem:
-    def __init__(self):
-        self.__cell = None
+    def __init__(self, pos=None):
+        self.__pos = pos
 
     def getItemName(self):
         return "default"
 
-    def setCell(self, cell):
-        self.__cell = cell
+    def setPosition(self, pos):
+        self.__pos = pos
 
-    def getCell(self):
-        return self.__cell
+    def getPosition(self):
+        return self.__pos
 
 
 class Target(MapItem):
@@ -223,50 +421,132 @@ class Hazard(MapItem):
 
 
 class ItemFactory:
+    # items of each type are kept in insertion-ordered dicts used as sets, so
+    # removal is O(1) and the first goal is still the earliest one added
+    __ITEM_CLASS = {"target": Target, "blob": ColorBlob, "hazard": Hazard}
+
     def __init__(self):
         self.__itemStore = {}
-
-    def createItem(self, type):
-        item = None
-        if type == "target":
-            item = Target()
-        elif type == "blob":
-            item = ColorBlob()
-        elif type == "hazard":
-            item = Hazard()
-
-        if item != None:
-            if type not in self.__itemStore:
-                self.__itemStore[type] = []
-            self.__itemStore[type].append(item)
+        self.__itemByPos = {}
+        self.__version = 0
+        self.__typeVersion = {}
+        self.__positionCache = {}
+        self.__data = None
+        self.__dataVersion = -1
+        self.__batchDepth = 0
+        self.__isVersionShared = False
+
+    def createItem(self, type, pos=None):
+        if type not in self.__ITEM_CLASS:
+            return None
+        item = self.__ITEM_CLASS[type](pos)
+        if type not in self.__itemStore:
+            self.__itemStore[type] = {}
+        self.__itemStore[type][item] = None
+        if pos != None:
+            self.__itemByPos[pos] = item
+        self.__touch(type)
         return item
 
+    def createItems(self, type, positions):
+        # createItem for many positions of one type, the version moves once
+        itemClass = self.__ITEM_CLASS.get(type)
+        if itemClass == None:
+            return []
+        if type not in self.__itemStore:
+            self.__itemStore[type] = {}
+        itemStore = self.__itemStore[type]
+        itemByPos = self.__itemByPos
+        items = []
+        for pos in positions:
+            item = itemClass(pos)
+            itemStore[item] = None
+            itemByPos[pos] = item
+            items.append(item)
+        self.__touch(type)
+        return items
+
     def removeItem(self, item):
         if item != None:
             itemName = item.getItemName()
-            self.__itemStore[itemName].remove(item)
+            del self.__itemStore[itemName][item]
+            pos = item.getPosition()
+            if self.__itemByPos.get(pos) is item:
+                del self.__itemByPos[pos]
+            self.__touch(itemName)
+
+    def removeItems(self, items):
+        # removeItem for many items, the version moves once
+        types = set()
+        for item in items:
+            itemName = item.getItemName()
+            del self.__itemStore[itemName][item]
+            pos = item.getPosition()
+            if self.__itemByPos.get(pos) is item:
+                del self.__itemByPos[pos]
+            types.add(itemName)
+        self.beginBatch()
+        for type in types:
+            self.__touch(type)
+        self.endBatch()
+
+    def beginBatch(self):
+        # touches inside a batch share one version until the data is read
+        self.__batchDepth += 1
+
+    def endBatch(self):
+        self.__batchDepth -= 1
+        if self.__batchDepth == 0:
+            self.__isVersionShared = False
+
+    def getItem(self, pos):
+        return self.__itemByPos.get(pos)
 
     def getItemList(self, type):
         if type in self.__itemStore:
-            return self.__itemStore[type]
+            return list(self.__itemStore[type])
         return []
 
+    def getItemCount(self, type):
+        if type in self.__itemStore:
+            return len(self.__itemStore[type])
+        return 0
+
     def getNextGoal(self):
-        for blob in self.getItemList("blob"):
-            if blob != None:
-                return blob
-        for target in self.getItemList("target"):
-            if target != None:
-                return target
+        for type in ("blob", "target"):
+            if type in self.__itemStore:
+                for item in self.__itemStore[type]:
+                    return item
 
         return None
 
+    def getVersion(self):
+        self.__isVersionShared = False
+        return self.__version
+
     def getData(self):
-        data = {}
-        for itemName in self.__itemStore:
-            data[itemName] = []
-            for item in self.__itemStore[itemName]:
-                cell = item.getCell()
-                data[itemName].append(cell.getPosition())
-
-        return data
+        # the snapshot is shared between calls until an item is added or removed
+        self.__isVersionShared = False
+        if self.__dataVersion != self.__version:
+            data = {}
+            for itemName in self.__itemStore:
+                version, positions = self.__positionCache.get(itemName, (-1, ()))
+                if version != self.__typeVersion[itemName]:
+                    positions = tuple(
+                        item.getPosition() for item in self.__itemStore[itemName]
+                    )
+                    self.__positionCache[itemName] = (
+                        self.__typeVersion[itemName],
+                        positions,
+                    )
+                data[itemName] = positions
+            self.__data = MappingProxyType(data)
+            self.__dataVersion = self.__version
+
+        return self.__data
+
+    def __touch(self, type):
+        if not self.__isVersionShared:
+            self.__version += 1
+            self.__isVersionShared = self.__batchDepth > 0
+        self.__typeVersion[type] = self.__version
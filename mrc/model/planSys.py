@@ -0,0 +1,738 @@
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+
+class SearchStamp:
+    __MAX_GENERATION = 0xFFFFFFFF
+
+    def __init__(self, size):
+        self.__size = size
+        self.__stamp = array("I", [0]) * size
+        self.__generation = 0
+
+    def nextGeneration(self):
+        # cells whose stamp differs from the current generation count as unvisited,
+        # so the search buffers never have to be cleared between searches
+        if self.__generation >= self.__MAX_GENERATION:
+            self.__stamp = array("I", [0]) * self.__size
+            self.__generation = 0
+        self.__generation += 1
+        return self.__generation
+
+    def getStamp(self):
+        return self.__stamp
+
+    def getGeneration(self):
+        return self.__generation
+
+
+class Planner(ABC):
+    def __init__(self, map):
+        self.__map = map
+        self.__expandedCount = 0
+
+    def getPlannerName(self):
+        return "default"
+
+    @abstractmethod
+    def plan(self, startPos, goalPos):
+        pass
+
+    def notifyCellChanged(self, pos):
+        pass
+
+    def getNextStep(self, pos, goalPos):
+        route = self.plan(pos, goalPos)
+        if route == None or len(route) < 2:
+            return None
+        return route[1]
+
+    def getStatData(self):
+        return {"expanded": self.__expandedCount}
+
+    def getMap(self):
+        return self.__map
+
+    def setExpandedCount(self, expandedCount):
+        self.__expandedCount = expandedCount
+
+    def getExpandedCount(self):
+        return self.__expandedCount
+
+
+class BFSPlanner(Planner):
+    def __init__(self, map):
+        super().__init__(map)
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__minMove = array("i", [0]) * (width * height)
+        self.__stamp = SearchStamp(width * height)
+
+    def getPlannerName(self):
+        return "bfs"
+
+    def plan(self, startPos, goalPos):
+        self.__fillMinMove(startPos, goalPos)
+        return self.__getRoute(startPos, goalPos)
+
+    def __fillMinMove(self, startPos, goalPos):
+        generation = self.__stamp.nextGeneration()
+        width, height = self.__width, self.__height
+        lastRow = (height - 1) * width
+        minMove = self.__minMove
+        stamp = self.__stamp.getStamp()
+        hazard = self.getMap().getHazardData()
+
+        start = startPos[1] * width + startPos[0]
+        goal = goalPos[1] * width + goalPos[0]
+        stamp[start] = generation
+        minMove[start] = 0
+
+        q = deque((start,))
+        pop = q.popleft
+        push = q.append
+        expanded = 0
+        while q:
+            i = pop()
+            expanded += 1
+            if i == goal:
+                break
+            moveCnt = minMove[i] + 1
+            x = i % width
+            if x > 0:
+                j = i - 1
+                if stamp[j] != generation and not hazard[j]:
+                    stamp[j] = generation
+                    minMove[j] = moveCnt
+                    push(j)
+            if x < width - 1:
+                j = i + 1
+                if stamp[j] != generation and not hazard[j]:
+                    stamp[j] = generation
+                    minMove[j] = moveCnt
+                    push(j)
+            if i >= width:
+                j = i - width
+                if stamp[j] != generation and not hazard[j]:
+                    stamp[j] = generation
+                    minMove[j] = moveCnt
+                    push(j)
+            if i < lastRow:
+                j = i + width
+                if stamp[j] != generation and not hazard[j]:
+                    stamp[j] = generation
+                    minMove[j] = moveCnt
+                    push(j)
+        self.setExpandedCount(expanded)
+
+    def __getMinMove(self, i):
+        if self.__stamp.getStamp()[i] != self.__stamp.getGeneration():
+            return -1
+        return self.__minMove[i]
+
+    def __getRoute(self, startPos, goalPos):
+        x, y = goalPos
+        width, height = self.__width, self.__height
+
+        move_cnt = self.__getMinMove(y * width + x)
+        if move_cnt < 0:
+            return None
+        route = []
+        route.append((x, y))
+        while move_cnt > 0:
+            i = y * width + x
+            if x > 0 and self.__getMinMove(i - 1) == move_cnt - 1:
+                x -= 1
+            elif x < width - 1 and self.__getMinMove(i + 1) == move_cnt - 1:
+                x += 1
+            elif y > 0 and self.__getMinMove(i - width) == move_cnt - 1:
+                y -= 1
+            elif y < height - 1 and self.__getMinMove(i + width) == move_cnt - 1:
+                y += 1
+            else:
+                return None
+            route.append((x, y))
+            move_cnt -= 1
+
+        a, b = startPos
+        if x != a and y != b:
+            return None
+
+        route.reverse()
+        return route
+
+
+class AStarPlanner(Planner):
+    def __init__(self, map):
+        super().__init__(map)
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__cost = array("i", [0]) * (width * height)
+        self.__parent = array("i", [0]) * (width * height)
+        self.__stamp = SearchStamp(width * height)
+
+    def getPlannerName(self):
+        return "astar"
+
+    def plan(self, startPos, goalPos):
+        generation = self.__stamp.nextGeneration()
+        width, height = self.__width, self.__height
+        lastRow = (height - 1) * width
+        cost = self.__cost
+        parent = self.__parent
+        stamp = self.__stamp.getStamp()
+        hazard = self.getMap().getHazardData()
+
+        goalX, goalY = goalPos
+        start = startPos[1] * width + startPos[0]
+        goal = goalY * width + goalX
+        stamp[start] = generation
+        cost[start] = 0
+        parent[start] = -1
+
+        h = abs(startPos[0] - goalX) + abs(startPos[1] - goalY)
+        # equal f values are broken toward the smaller heuristic, i.e. toward the goal
+        heap = [(h, h, start)]
+        expanded = 0
+        while heap:
+            f, h, i = heappop(heap)
+            g = f - h
+            if g > cost[i]:
+                continue
+            expanded += 1
+            if i == goal:
+                break
+            g += 1
+            x = i % width
+            y = i // width
+            if x > 0:
+                j = i - 1
+                if not hazard[j] and (stamp[j] != generation or g < cost[j]):
+                    stamp[j] = generation
+                    cost[j] = g
+                    parent[j] = i
+                    h = abs(x - 1 - goalX) + abs(y - goalY)
+                    heappush(heap, (g + h, h, j))
+            if x < width - 1:
+                j = i + 1
+                if not hazard[j] and (stamp[j] != generation or g < cost[j]):
+                    stamp[j] = generation
+                    cost[j] = g
+                    parent[j] = i
+                    h = abs(x + 1 - goalX) + abs(y - goalY)
+                    heappush(heap, (g + h, h, j))
+            if i >= width:
+                j = i - width
+                if not hazard[j] and (stamp[j] != generation or g < cost[j]):
+                    stamp[j] = generation
+                    cost[j] = g
+                    parent[j] = i
+                    h = abs(x - goalX) + abs(y - 1 - goalY)
+                    heappush(heap, (g + h, h, j))
+            if i < lastRow:
+                j = i + width
+                if not hazard[j] and (stamp[j] != generation or g < cost[j]):
+                    stamp[j] = generation
+                    cost[j] = g
+                    parent[j] = i
+                    h = abs(x - goalX) + abs(y + 1 - goalY)
+                    heappush(heap, (g + h, h, j))
+        self.setExpandedCount(expanded)
+
+        if stamp[goal] != generation:
+            return None
+        route = []
+        i = goal
+        while i != -1:
+            route.append((i % width, i // width))
+            i = parent[i]
+        route.reverse()
+        return route
+
+
+class JPSPlanner(Planner):
+    # jump point search on a uniform 4-connected grid. vertical scans spawn
+    # horizontal scans, so canonical routes go vertical first and turn only at
+    # jump points where a horizontal scan finds the goal or a forced neighbour
+    def __init__(self, map):
+        super().__init__(map)
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__cost = array("i", [0]) * (width * height)
+        self.__parent = array("i", [0]) * (width * height)
+        self.__stamp = SearchStamp(width * height)
+
+    def getPlannerName(self):
+        return "jps"
+
+    def plan(self, startPos, goalPos):
+        generation = self.__stamp.nextGeneration()
+        width, height = self.__width, self.__height
+        cost = self.__cost
+        parent = self.__parent
+        stamp = self.__stamp.getStamp()
+        hazard = self.getMap().getHazardData()
+
+        goalX, goalY = goalPos
+        start = startPos[1] * width + startPos[0]
+        goal = goalY * width + goalX
+
+        def jumpHorizontal(x, y, dx):
+            i = y * width + x
+            up = y > 0
+            down = y < height - 1
+            while True:
+                x += dx
+                if x < 0 or x >= width:
+                    return -1
+                i += dx
+                if hazard[i]:
+                    return -1
+                if i == goal:
+                    return i
+                if up and hazard[i - dx - width] and not hazard[i - width]:
+                    return i
+                if down and hazard[i - dx + width] and not hazard[i + width]:
+                    return i
+
+        def jumpVertical(x, y, dy):
+            while True:
+                y += dy
+                if y < 0 or y >= height:
+                    return -1
+                i = y * width + x
+                if hazard[i]:
+                    return -1
+                if i == goal:
+                    return i
+                if jumpHorizontal(x, y, 1) >= 0 or jumpHorizontal(x, y, -1) >= 0:
+                    return i
+
+        stamp[start] = generation
+        cost[start] = 0
+        parent[start] = -1
+
+        h = abs(startPos[0] - goalX) + abs(startPos[1] - goalY)
+        heap = [(h, h, start, 0, 0)]
+        expanded = 0
+        while heap:
+            f, h, i, dx, dy = heappop(heap)
+            g = f - h
+            if g > cost[i]:
+                continue
+            expanded += 1
+            if i == goal:
+                break
+            x = i % width
+            y = i // width
+            if dx != 0:
+                successors = ((dx, 0), (0, 1), (0, -1))
+            elif dy != 0:
+                successors = ((0, dy), (1, 0), (-1, 0))
+            else:
+                successors = ((1, 0), (-1, 0), (0, 1), (0, -1))
+            for sx, sy in successors:
+                if sx != 0:
+                    j = jumpHorizontal(x, y, sx)
+                else:
+                    j = jumpVertical(x, y, sy)
+                if j < 0:
+                    continue
+                nx = j % width
+                ny = j // width
+                ng = g + abs(nx - x) + abs(ny - y)
+                if stamp[j] != generation or ng < cost[j]:
+                    stamp[j] = generation
+                    cost[j] = ng
+                    parent[j] = i
+                    h = abs(nx - goalX) + abs(ny - goalY)
+                    heappush(heap, (ng + h, h, j, sx, sy))
+        self.setExpandedCount(expanded)
+
+        if stamp[goal] != generation:
+            return None
+        route = [goalPos]
+        i = goal
+        while parent[i] != -1:
+            x, y = i % width, i // width
+            i = parent[i]
+            px, py = i % width, i // width
+            while (x, y) != (px, py):
+                x += (px > x) - (px < x)
+                y += (py > y) - (py < y)
+                route.append((x, y))
+        route.reverse()
+        return route
+
+
+class DStarLitePlanner(Planner):
+    # D* Lite searches backward from the goal and keeps g/rhs values between
+    # calls, so a moved robot or a changed cell only repairs the affected part
+    __INF = 0x3FFFFFFF
+
+    def __init__(self, map):
+        super().__init__(map)
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__g = array("i", [0]) * (width * height)
+        self.__rhs = array("i", [0]) * (width * height)
+        self.__stamp = SearchStamp(width * height)
+        self.__open = {}
+        self.__heap = []
+        self.__km = 0
+        self.__start = None
+        self.__goal = None
+        self.__changedCells = []
+        self.__updatedCount = 0
+        self.__expanded = 0
+        self.__isRepair = False
+
+    def getPlannerName(self):
+        return "dstar"
+
+    def notifyCellChanged(self, pos):
+        if self.__goal != None:
+            self.__changedCells.append(pos[1] * self.__width + pos[0])
+
+    def plan(self, startPos, goalPos):
+        start = startPos[1] * self.__width + startPos[0]
+        goal = goalPos[1] * self.__width + goalPos[0]
+        self.__updatedCount = 0
+        self.__expanded = 0
+
+        if goal != self.__goal:
+            self.__reset(start, goal)
+            self.__isRepair = False
+        else:
+            self.__isRepair = True
+            if start != self.__start:
+                self.__km += self.__heuristic(self.__start, start)
+                self.__start = start
+            changedCells = self.__changedCells
+            self.__changedCells = []
+            for v in set(changedCells):
+                for u in self.__neighbors(v):
+                    self.__updateVertex(u)
+
+        self.__computeShortestPath()
+        self.setExpandedCount(self.__expanded)
+        return self.__getRoute()
+
+    def getStatData(self):
+        return {
+            "expanded": self.__expanded,
+            "updated": self.__updatedCount,
+            "touched": self.__expanded + self.__updatedCount,
+            "repair": self.__isRepair,
+        }
+
+    def __reset(self, start, goal):
+        self.__stamp.nextGeneration()
+        self.__open = {}
+        self.__heap = []
+        self.__km = 0
+        self.__start = start
+        self.__goal = goal
+        self.__changedCells = []
+        self.__touch(goal)
+        self.__rhs[goal] = 0
+        self.__push(goal)
+
+    def __touch(self, i):
+        stamp = self.__stamp.getStamp()
+        generation = self.__stamp.getGeneration()
+        if stamp[i] != generation:
+            stamp[i] = generation
+            self.__g[i] = self.__INF
+            self.__rhs[i] = self.__INF
+
+    def __getG(self, i):
+        if self.__stamp.getStamp()[i] != self.__stamp.getGeneration():
+            return self.__INF
+        return self.__g[i]
+
+    def __heuristic(self, a, b):
+        width = self.__width
+        return abs(a % width - b % width) + abs(a // width - b // width)
+
+    def __calculateKey(self, i):
+        m = min(self.__g[i], self.__rhs[i])
+        return (m + self.__heuristic(self.__start, i) + self.__km, m)
+
+    def __push(self, i):
+        key = self.__calculateKey(i)
+        self.__open[i] = key
+        heappush(self.__heap, (key[0], key[1], i))
+
+    def __neighbors(self, i):
+        width = self.__width
+        x = i % width
+        neighbors = []
+        if x > 0:
+            neighbors.append(i - 1)
+        if x < width - 1:
+            neighbors.append(i + 1)
+        if i >= width:
+            neighbors.append(i - width)
+        if i < (self.__height - 1) * width:
+            neighbors.append(i + width)
+        return neighbors
+
+    def __updateVertex(self, u):
+        self.__updatedCount += 1
+        self.__touch(u)
+        if u != self.__goal:
+            hazard = self.getMap().getHazardData()
+            best = self.__INF
+            for v in self.__neighbors(u):
+                if not hazard[v]:
+                    cost = self.__getG(v) + 1
+                    if cost < best:
+                        best = cost
+            self.__rhs[u] = best
+        if self.__g[u] != self.__rhs[u]:
+            self.__push(u)
+        else:
+            self.__open.pop(u, None)
+
+    def __computeShortestPath(self):
+        heap = self.__heap
+        open = self.__open
+        g = self.__g
+        rhs = self.__rhs
+        start = self.__start
+        self.__touch(start)
+        while heap:
+            k1, k2, u = heap[0]
+            key = (k1, k2)
+            if open.get(u) != key:
+                heappop(heap)
+                continue
+            if key >= self.__calculateKey(start) and rhs[start] == g[start]:
+                break
+            heappop(heap)
+            newKey = self.__calculateKey(u)
+            if key < newKey:
+                open[u] = newKey
+                heappush(heap, (newKey[0], newKey[1], u))
+                continue
+            self.__expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                del open[u]
+                for p in self.__neighbors(u):
+                    self.__updateVertex(p)
+            else:
+                g[u] = self.__INF
+                self.__updateVertex(u)
+                for p in self.__neighbors(u):
+                    self.__updateVertex(p)
+
+    def __getRoute(self):
+        width = self.__width
+        hazard = self.getMap().getHazardData()
+        i = self.__start
+        if self.__getG(i) >= self.__INF:
+            return None
+        route = [(i % width, i // width)]
+        while i != self.__goal:
+            best = self.__INF
+            nextCell = -1
+            for v in self.__neighbors(i):
+                if not hazard[v]:
+                    cost = self.__getG(v)
+                    if cost < best:
+                        best = cost
+                        nextCell = v
+            if nextCell < 0 or len(route) > width * self.__height:
+                return None
+            i = nextCell
+            route.append((i % width, i // width))
+        return route
+
+
+class DistanceFieldPlanner(Planner):
+    # breadth-first distance field rooted at the goal. it is rebuilt only when
+    # the goal changes or a new hazard cuts cells off their shortest way to the
+    # goal, so a robot that slipped off its route finds its next step from the
+    # neighbouring cells. a LatticeMap2D builds one for getNextStep on the
+    # first recovery
+    def __init__(self, map):
+        super().__init__(map)
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__dist = None
+        self.__goal = None
+        self.__isDirty = True
+        self.__isRebuilt = False
+
+    def getPlannerName(self):
+        return "field"
+
+    def notifyCellChanged(self, pos):
+        # a new hazard only forces a rebuild when some cell next to it had no
+        # other way toward the goal. a cleared cell lowers the distances around
+        # it in place
+        if self.__dist == None or self.__isDirty:
+            return
+        i = pos[1] * self.__width + pos[0]
+        dist = self.__dist
+        if not self.getMap().getHazardData()[i]:
+            self.__lowerField(i)
+            return
+        if dist[i] < 0:
+            return
+        if i == self.__goal:
+            self.__isDirty = True
+            return
+        nextDist = dist[i] + 1
+        dist[i] = -1
+        for j in self.__neighbors(i):
+            if dist[j] == nextDist and not any(
+                dist[k] == nextDist - 1 for k in self.__neighbors(j)
+            ):
+                self.__isDirty = True
+                return
+
+    def plan(self, startPos, goalPos):
+        width = self.__width
+        goal = goalPos[1] * width + goalPos[0]
+        self.__updateField(goal)
+
+        i = startPos[1] * width + startPos[0]
+        route = [startPos]
+        while i != goal:
+            i = self.__getNextStep(i)
+            if i < 0:
+                return None
+            route.append((i % width, i // width))
+        return route
+
+    def getNextStep(self, pos, goalPos):
+        width = self.__width
+        self.__updateField(goalPos[1] * width + goalPos[0])
+        i = self.__getNextStep(pos[1] * width + pos[0])
+        if i < 0:
+            return None
+        return (i % width, i // width)
+
+    def getStatData(self):
+        return {"expanded": self.getExpandedCount(), "rebuilt": self.__isRebuilt}
+
+    def __updateField(self, goal):
+        self.__isRebuilt = goal != self.__goal or self.__isDirty
+        if not self.__isRebuilt:
+            self.setExpandedCount(0)
+            return
+        self.__goal = goal
+        self.__isDirty = False
+        self.__fillField(goal)
+
+    def __fillField(self, goal):
+        width, height = self.__width, self.__height
+        lastRow = (height - 1) * width
+        hazard = self.getMap().getHazardData()
+        # 4 bytes per cell and no second buffer, -1 marks unreached cells
+        dist = array("i", [-1]) * (width * height)
+        dist[goal] = 0
+
+        q = deque((goal,))
+        pop = q.popleft
+        push = q.append
+        expanded = 0
+        while q:
+            i = pop()
+            expanded += 1
+            moveCnt = dist[i] + 1
+            x = i % width
+            if x > 0:
+                j = i - 1
+                if dist[j] < 0 and not hazard[j]:
+                    dist[j] = moveCnt
+                    push(j)
+            if x < width - 1:
+                j = i + 1
+                if dist[j] < 0 and not hazard[j]:
+                    dist[j] = moveCnt
+                    push(j)
+            if i >= width:
+                j = i - width
+                if dist[j] < 0 and not hazard[j]:
+                    dist[j] = moveCnt
+                    push(j)
+            if i < lastRow:
+                j = i + width
+                if dist[j] < 0 and not hazard[j]:
+                    dist[j] = moveCnt
+                    push(j)
+        self.__dist = dist
+        self.setExpandedCount(expanded)
+
+    def __lowerField(self, i):
+        # breadth first from the cleared cell, only cells that get closer to
+        # the goal are touched
+        dist = self.__dist
+        hazard = self.getMap().getHazardData()
+        best = -1
+        for j in self.__neighbors(i):
+            if dist[j] >= 0 and (best < 0 or dist[j] < best):
+                best = dist[j]
+        if best < 0 or (dist[i] >= 0 and dist[i] <= best + 1):
+            return
+        dist[i] = best + 1
+        q = deque((i,))
+        while q:
+            j = q.popleft()
+            moveCnt = dist[j] + 1
+            for k in self.__neighbors(j):
+                if not hazard[k] and (dist[k] < 0 or dist[k] > moveCnt):
+                    dist[k] = moveCnt
+                    q.append(k)
+
+    def __getNextStep(self, i):
+        # a robot standing on a hazard may still leave it, so an unreached cell
+        # steps to its closest reached neighbour
+        dist = self.__dist
+        best = dist[i]
+        nextCell = -1
+        for j in self.__neighbors(i):
+            if dist[j] >= 0 and (best < 0 or dist[j] < best):
+                best = dist[j]
+                nextCell = j
+        return nextCell
+
+    def __neighbors(self, i):
+        width = self.__width
+        x = i % width
+        neighbors = []
+        if x > 0:
+            neighbors.append(i - 1)
+        if x < width - 1:
+            neighbors.append(i + 1)
+        if i >= width:
+            neighbors.append(i - width)
+        if i < (self.__height - 1) * width:
+            neighbors.append(i + width)
+        return neighbors
+
+
+PLANNER_TYPES = {
+    "bfs": BFSPlanner,
+    "astar": AStarPlanner,
+    "jps": JPSPlanner,
+    "dstar": DStarLitePlanner,
+    "field": DistanceFieldPlanner,
+}
+
+
+def createPlanner(name, map):
+    if name not in PLANNER_TYPES:
+        raise ValueError(f"unknown planner: {name}")
+    return PLANNER_TYPES[name](map)
@@ -0,0 +1,409 @@
+class TourPlanner:
+    # orders the remaining goals as an open tour from the robot. blobs always
+    # come before targets, the order is built with nearest neighbour and
+    # improved with 2-opt and or-opt moves inside each of the two segments.
+    # distances come from one breadth-first search over all sources at once,
+    # each source is a bit of a mask that spreads through the cells, and the
+    # cells remember which searches went over them so a changed cell only
+    # invalidates the rows it could have changed
+    __OR_OPT_LENGTH = 3
+    # the robot is source 0, goals take the bits after it
+    __START_BIT = 0
+
+    def __init__(self, map):
+        self.__map = map
+        width, height = map.getMapSize()
+        self.__width = width
+        self.__height = height
+        self.__inf = width * height * 4
+        self.__goalDist = {}
+        self.__startDist = {}
+        self.__startPos = None
+        self.__goalBits = {}
+        self.__nextBit = self.__START_BIT + 1
+        # per cell, the sources that reached it in the current search and in
+        # any search since the last build. seen is cleared after each search
+        self.__seenMask = [0] * (width * height)
+        self.__areaMask = [0] * (width * height)
+        self.__dirtyMask = 0
+        self.__tour = []
+        self.__isBuilt = False
+        self.__searchCount = 0
+
+        for type in ("blob", "target"):
+            for item in map.getItemList(type):
+                self.__goalDist[item] = {}
+
+    def getNextGoal(self, startPos=None):
+        # the tour is anchored again whenever the robot has moved
+        if startPos != None and tuple(startPos) != self.__startPos:
+            self.__startPos = tuple(startPos)
+            self.__dirtyMask |= 1 << self.__START_BIT
+        if not self.__goalDist:
+            return None
+        if not self.__isBuilt:
+            self.__build()
+        elif self.__dirtyMask:
+            self.__refresh()
+        if not self.__tour:
+            return None
+        return self.__tour[0]
+
+    def getTour(self):
+        return self.__tour[:]
+
+    def notifyGoalAdded(self, item):
+        self.__goalDist[item] = {}
+        if not self.__isBuilt or self.__startPos == None:
+            self.__isBuilt = False
+            return
+        bit = self.__nextBit
+        self.__nextBit += 1
+        self.__goalBits[item] = bit
+        self.__storeRows(self.__search([(bit, item.getPosition())]))
+        self.__insert(item)
+        self.__improve()
+
+    def notifyGoalRemoved(self, item):
+        if item not in self.__goalDist:
+            return
+        del self.__goalDist[item]
+        self.__startDist.pop(item, None)
+        bit = self.__goalBits.pop(item, None)
+        if bit != None:
+            self.__dirtyMask &= ~(1 << bit)
+        for other in self.__goalDist:
+            self.__goalDist[other].pop(item, None)
+        if item in self.__tour:
+            self.__tour.remove(item)
+
+    def notifyCellChanged(self, pos):
+        # a new hazard can only lengthen the distances of searches that went
+        # over its cell, a cleared cell only shortens those of searches that
+        # reached a cell next to it
+        if not self.__isBuilt:
+            return
+        width = self.__width
+        i = pos[1] * width + pos[0]
+        areaMask = self.__areaMask
+        if self.__map.getHazardData()[i]:
+            self.__dirtyMask |= areaMask[i]
+            return
+        x = pos[0]
+        for j in (
+            i,
+            i - 1 if x > 0 else -1,
+            i + 1 if x < width - 1 else -1,
+            i - width if i >= width else -1,
+            i + width if i < len(areaMask) - width else -1,
+        ):
+            if j >= 0:
+                self.__dirtyMask |= areaMask[j]
+
+    def getStatData(self):
+        return {
+            "goals": len(self.__tour),
+            "length": self.__getTourLength(self.__tour),
+            "searches": self.__searchCount,
+        }
+
+    def __build(self):
+        goals = list(self.__goalDist)
+        self.__goalBits = {item: k + 1 for k, item in enumerate(goals)}
+        self.__nextBit = len(goals) + 1
+        self.__areaMask = [0] * (self.__width * self.__height)
+        self.__dirtyMask = 0
+        sources = [(self.__goalBits[item], item.getPosition()) for item in goals]
+        if self.__startPos != None:
+            sources.append((self.__START_BIT, self.__startPos))
+        self.__startDist = {}
+        self.__storeRows(self.__search(sources))
+
+        blobs = [item for item in goals if item.getItemName() == "blob"]
+        targets = [item for item in goals if item.getItemName() != "blob"]
+        tour = []
+        last = None
+        for segment in (blobs, targets):
+            remaining = segment[:]
+            while remaining:
+                nearest = min(remaining, key=lambda item: self.__getDist(last, item))
+                remaining.remove(nearest)
+                tour.append(nearest)
+                last = nearest
+        self.__tour = tour
+        self.__isBuilt = True
+        self.__improve()
+
+    def __refresh(self):
+        # searches again from the sources whose rows a change touched. when
+        # only the robot moved, the tour just gets a new start
+        dirtyMask = self.__dirtyMask
+        self.__dirtyMask = 0
+        sources = [
+            (bit, item.getPosition())
+            for item, bit in self.__goalBits.items()
+            if dirtyMask >> bit & 1
+        ]
+        if dirtyMask >> self.__START_BIT & 1 and self.__startPos != None:
+            sources.append((self.__START_BIT, self.__startPos))
+        self.__storeRows(self.__search(sources))
+        if dirtyMask == 1 << self.__START_BIT:
+            self.__improveStart()
+        else:
+            self.__improve()
+
+    def __storeRows(self, rows):
+        # a row is keyed by the goal items it reached and None for the robot,
+        # an unreached key is out of reach
+        inf = self.__inf
+        bitItems = {bit: item for item, bit in self.__goalBits.items()}
+        for bit, row in rows.items():
+            if bit == self.__START_BIT:
+                self.__startDist = {
+                    other: row.get(other, inf) for other in self.__goalDist
+                }
+                continue
+            item = bitItems[bit]
+            itemDist = self.__goalDist[item]
+            for other in self.__goalDist:
+                if other is not item:
+                    dist = row.get(other, inf)
+                    itemDist[other] = dist
+                    self.__goalDist[other][item] = dist
+            if self.__startPos != None:
+                self.__startDist[item] = row.get(None, inf)
+
+    def __search(self, sources):
+        # sources are (bit, pos) pairs. each frontier cell holds the mask of
+        # the sources that reached it at the current distance, and a source
+        # stops spreading once it has found every goal and the robot
+        self.__searchCount += 1
+        width = self.__width
+        lastRow = (self.__height - 1) * width
+        hazard = self.__map.getHazardData()
+
+        targets = {}
+        if self.__startPos != None:
+            targets[self.__startPos[1] * width + self.__startPos[0]] = None
+        for item in self.__goalDist:
+            x, y = item.getPosition()
+            targets[y * width + x] = item
+
+        rows = {}
+        remaining = {}
+        frontier = {}
+        activeMask = 0
+        for bit, (x, y) in sources:
+            rows[bit] = {}
+            remaining[bit] = len(targets)
+            i = y * width + x
+            frontier[i] = frontier.get(i, 0) | 1 << bit
+            activeMask |= 1 << bit
+        seenMask = self.__seenMask
+        seenCells = list(frontier)
+        for i, mask in frontier.items():
+            seenMask[i] = mask
+
+        dist = 0
+        while frontier and activeMask:
+            for i in targets if len(targets) < len(frontier) else frontier:
+                if i not in frontier or i not in targets:
+                    continue
+                mask = frontier[i]
+                key = targets[i]
+                while mask:
+                    low = mask & -mask
+                    bit = low.bit_length() - 1
+                    rows[bit][key] = dist
+                    remaining[bit] -= 1
+                    if remaining[bit] == 0:
+                        activeMask &= ~low
+                    mask ^= low
+
+            nextFrontier = {}
+            for i, mask in frontier.items():
+                mask &= activeMask
+                if not mask:
+                    continue
+                x = i % width
+                for j in (
+                    i - 1 if x > 0 else -1,
+                    i + 1 if x < width - 1 else -1,
+                    i - width if i >= width else -1,
+                    i + width if i < lastRow else -1,
+                ):
+                    if j >= 0 and not hazard[j]:
+                        newMask = mask & ~seenMask[j]
+                        if newMask:
+                            if not seenMask[j]:
+                                seenCells.append(j)
+                            seenMask[j] |= newMask
+                            nextFrontier[j] = nextFrontier.get(j, 0) | newMask
+            frontier = nextFrontier
+            dist += 1
+
+        areaMask = self.__areaMask
+        for i in seenCells:
+            areaMask[i] |= seenMask[i]
+            seenMask[i] = 0
+        return rows
+
+    def __getDist(self, a, b):
+        if a == None:
+            return self.__startDist.get(b, self.__inf)
+        return self.__goalDist[a].get(b, self.__inf)
+
+    def __getTourLength(self, tour):
+        length = 0
+        last = None
+        for item in tour:
+            length += self.__getDist(last, item)
+            last = item
+        return length
+
+    def __getSegment(self, item):
+        blobCount = sum(1 for other in self.__tour if other.getItemName() == "blob")
+        if item.getItemName() == "blob":
+            return 0, blobCount
+        return blobCount, len(self.__tour)
+
+    def __insert(self, item):
+        lo, hi = self.__getSegment(item)
+        tour = self.__tour
+        bestIndex = lo
+        bestCost = None
+        for k in range(lo, hi + 1):
+            prev = tour[k - 1] if k > 0 else None
+            cost = self.__getDist(prev, item)
+            if k < len(tour):
+                cost += self.__getDist(item, tour[k]) - self.__getDist(prev, tour[k])
+            if bestCost == None or cost < bestCost:
+                bestCost = cost
+                bestIndex = k
+        tour.insert(bestIndex, item)
+
+    def __improveStart(self):
+        # after the robot moved only the first edge of the tour changed, so
+        # only the moves that change it are tried: reversing a head of the
+        # first segment or moving a chunk of it to the front
+        tour = self.__tour
+        n = len(tour)
+        if n < 2:
+            return
+        blobCount = sum(1 for item in tour if item.getItemName() == "blob")
+        hi = blobCount if blobCount > 0 else n
+        getDist = self.__getDist
+        first = tour[0]
+        startCost = getDist(None, first)
+        bestDelta = 0
+        bestMove = None
+        for j in range(1, hi):
+            next = tour[j + 1] if j + 1 < n else None
+            delta = getDist(None, tour[j]) - startCost
+            if next != None:
+                delta += getDist(first, next) - getDist(tour[j], next)
+            if delta < bestDelta:
+                bestDelta = delta
+                bestMove = (0, j + 1, True)
+        for length in range(1, self.__OR_OPT_LENGTH + 1):
+            for i in range(1, hi - length + 1):
+                chunkFirst = tour[i]
+                chunkLast = tour[i + length - 1]
+                prev = tour[i - 1]
+                next = tour[i + length] if i + length < n else None
+                gain = getDist(prev, chunkFirst)
+                if next != None:
+                    gain += getDist(chunkLast, next) - getDist(prev, next)
+                delta = (
+                    getDist(None, chunkFirst)
+                    + getDist(chunkLast, first)
+                    - startCost
+                    - gain
+                )
+                if delta < bestDelta:
+                    bestDelta = delta
+                    bestMove = (i, i + length, False)
+        if bestMove == None:
+            return
+        lo, hi, isReversed = bestMove
+        if isReversed:
+            tour[lo:hi] = tour[lo:hi][::-1]
+        else:
+            tour[:] = tour[lo:hi] + tour[:lo] + tour[hi:]
+        self.__improve()
+
+    def __improve(self):
+        tour = self.__tour
+        n = len(tour)
+        if n < 2:
+            return
+        # index 0 is the robot, goals are 1..n in the current tour order
+        nodes = [None] + tour
+        dist = [
+            [self.__getDist(a, b) if b != None else 0 for b in nodes] for a in nodes
+        ]
+        for row in dist:
+            row.append(0)
+        blobCount = sum(1 for item in tour if item.getItemName() == "blob")
+        segments = [(0, blobCount), (blobCount, n)]
+        order = list(range(1, n + 1))
+
+        improved = True
+        while improved:
+            improved = False
+            for lo, hi in segments:
+                if self.__twoOpt(order, dist, lo, hi):
+                    improved = True
+                if self.__orOpt(order, dist, lo, hi):
+                    improved = True
+        self.__tour = [nodes[k] for k in order]
+
+    def __twoOpt(self, order, dist, lo, hi):
+        # the last column of dist is the open end of the tour
+        n = len(order)
+        end = n + 1
+        improved = False
+        for i in range(lo, hi - 1):
+            prev = order[i - 1] if i > 0 else 0
+            for j in range(i + 1, hi):
+                next = order[j + 1] if j + 1 < n else end
+                delta = (
+                    dist[prev][order[j]]
+                    + dist[order[i]][next]
+                    - dist[prev][order[i]]
+                    - dist[order[j]][next]
+                )
+                if delta < 0:
+                    order[i : j + 1] = order[i : j + 1][::-1]
+                    improved = True
+        return improved
+
+    def __orOpt(self, order, dist, lo, hi):
+        n = len(order)
+        end = n + 1
+        improved = False
+        for length in range(1, self.__OR_OPT_LENGTH + 1):
+            i = lo
+            while i + length <= hi:
+                chunk = order[i : i + length]
+                first, last = chunk[0], chunk[-1]
+                prev = order[i - 1] if i > 0 else 0
+                next = order[i + length] if i + length < n else end
+                gain = dist[prev][first] + dist[last][next] - dist[prev][next]
+                rest = order[:i] + order[i + length :]
+                bestDelta = 0
+                bestIndex = -1
+                for k in range(lo, hi - length + 1):
+                    if k == i:
+                        continue
+                    a = rest[k - 1] if k > 0 else 0
+                    b = rest[k] if k < len(rest) else end
+                    delta = dist[a][first] + dist[last][b] - dist[a][b] - gain
+                    if delta < bestDelta:
+                        bestDelta = delta
+                        bestIndex = k
+                if bestIndex >= 0:
+                    order[:] = rest[:bestIndex] + chunk + rest[bestIndex:]
+                    improved = True
+                i += 1
+        return improved
@@ -1,77 +1,392 @@
+from contextlib import contextmanager
+from mrc.logSys import getLogger
+from mrc.traceSys import TRACER
 from .mapSys import *
 from .actorSys import *
+from .changeSys import *
+from .fleetSys import *
+from .localizationSys import *
+
+logger = getLogger(__name__)
 
 
 class WorldStateModel:
     def __init__(self):
         self.__map = None
         self.__robot = None
+        self.__robotList = []
+        self.__fleetPlanner = None
+        self.__changeLog = ChangeLog()
+        self.__batchDepth = 0
+        self.__batchChanges = []
+        self.__localization = None
 
-    def initialize(self, mapSize, robotPos, robotDir):
+    def initialize(
+        self, mapSize, robotPos, robotDir, planner="bfs", goalOrder="insertion"
+    ):
         width, height = mapSize
-        self.__map = LatticeMap2D(width, height)
+        self.__map = LatticeMap2D(width, height, planner, goalOrder)
         self.__robot = LatticeMap2DActor(self.__map)
+        self.__robotList = [self.__robot]
+        self.__fleetPlanner = None
+        self.__batchChanges = []
+        self.__changeLog.reset()
+        self.__map.setChangeLog(self.__changeLog)
         self.setRobotPosition(robotPos)
         self.setRobotDirection(robotDir)
-        self.printRobotStat()
+        self.__setParticleFilter(self.__robot)
+        self.logRobotStat()
+
+    def setLocalization(
+        self,
+        particleCount=PARTICLE_COUNT_DEFAULT,
+        sensorRange=1,
+        sensorArc=360,
+        seed=None,
+    ):
+        # every robot tracks its pose with a particle filter, from its current
+        # pose on. the range and arc should be those of the sim sensor. None
+        # turns it off
+        self.__localization = None
+        if particleCount != None:
+            self.__localization = (particleCount, sensorRange, sensorArc, seed)
+        for robot in self.__robotList:
+            self.__setParticleFilter(robot)
+
+    def localizeRobot(self, behavior, addedItem, robotId=0):
+        # behavior is the one that was commanded, addedItem what was sensed after.
+        # the sensed cells are kept for every robot, a filter started later
+        # must not expect an item another robot has already sensed
+        if self.__map == None:
+            return
+        sensedPositions = []
+        for positions in addedItem.values():
+            sensedPositions.extend(positions)
+        self.__map.setSensed(sensedPositions)
+        if self.__localization == None:
+            return
+        self.__robotList[robotId].localize(behavior, sensedPositions)
+
+    def getEstimatedPose(self, robotId=0):
+        if self.__robot == None:
+            return None
+        return self.__robotList[robotId].getEstimatedPose()
+
+    def getPoseConfidence(self, robotId=0):
+        if self.__robot == None:
+            return None
+        return self.__robotList[robotId].getPoseConfidence()
+
+    def addRobot(self, robotPos, robotDir):
+        # the second robot turns the world into a fleet, from then on every
+        # robot plans through the shared reservation table
+        if self.__map == None:
+            return None
+        robotId = len(self.__robotList)
+        robot = LatticeMap2DActor(self.__map, robotId)
+        robot.setDirection(tuple(robotDir))
+        robot.setPosition(tuple(robotPos))
+        self.__robotList.append(robot)
+        if self.__fleetPlanner == None:
+            self.__fleetPlanner = FleetPlanner(self.__map)
+            self.__map.setFleetPlanner(self.__fleetPlanner)
+            for other in self.__robotList[:-1]:
+                other.setFleetPlanner(self.__fleetPlanner)
+                self.__fleetPlanner.addRobot(other)
+        robot.setFleetPlanner(self.__fleetPlanner)
+        self.__fleetPlanner.addRobot(robot)
+        self.__setParticleFilter(robot)
+        self.__changeLog.record(("robot", robotId, robot.getStatData()))
+        self.__map.setVisited(robot.getPosition())
+        return robotId
+
+    def getRobotCount(self):
+        return len(self.__robotList)
+
+    def getSnapshot(self):
+        if self.__map == None:
+            return None
+        snapshot = self.__map.getSnapshot()
+        snapshot["mapSize"] = self.__map.getMapSize()
+        snapshot["robots"] = [
+            (robot.getPosition(), robot.getDirection()) for robot in self.__robotList
+        ]
+        snapshot["time"] = 0
+        if self.__fleetPlanner != None:
+            snapshot["time"] = self.__fleetPlanner.getTime()
+        return snapshot
+
+    def restoreSnapshot(self, snapshot, planner="bfs", goalOrder="insertion"):
+        # poses, visited cells and items come back exactly, paths are planned
+        # again on the next behavior. consumers get a full world on their next
+        # delta
+        robotPos, robotDir = snapshot["robots"][0]
+        self.initialize(snapshot["mapSize"], robotPos, robotDir, planner, goalOrder)
+        self.__map.restoreSnapshot(snapshot)
+        for robotPos, robotDir in snapshot["robots"][1:]:
+            self.addRobot(robotPos, robotDir)
+        if self.__fleetPlanner != None:
+            self.__fleetPlanner.setTime(snapshot["time"])
+        self.__changeLog.reset()
+
+    def advanceTick(self):
+        if self.__fleetPlanner != None:
+            self.__fleetPlanner.advance()
 
     def addItem(self, type, pos, updatePath=True):
         if self.__map == None or self.__robot == None:
             return
-        if self.__map.isValidLocation(pos):
-            self.__map.addItem(type, pos)
+        TRACER.count("itemsAdded")
+        spanStart = TRACER.startSpan()
+        self.__addItem(type, pos, updatePath)
+        TRACER.endSpan("model.addItem", spanStart)
+
+    def addItems(self, type, positions, updatePath=True):
+        # like addItem for every position, but the robots replan once at the end
+        if self.__map == None or self.__robot == None:
+            return
+        TRACER.count("itemsAdded", len(positions))
+        spanStart = TRACER.startSpan()
+        self.__map.addItems(type, positions)
         if updatePath:
-            self.__robot.updatePath()
+            self.__updatePathAfterChange(type, positions)
+        TRACER.endSpan("model.addItems", spanStart)
+
+    def removeItems(self, positions, updatePath=True):
+        if self.__map == None or self.__robot == None:
+            return
+        spanStart = TRACER.startSpan()
+        self.__map.removeItems(positions)
+        if updatePath:
+            self.__updatePathAfterChange(None, positions)
+        TRACER.endSpan("model.removeItems", spanStart)
+
+    @contextmanager
+    def batch(self):
+        # item changes inside the block are one transaction: the world and item
+        # versions move once and the robots replan at most once, when the
+        # outermost block ends
+        if self.__map == None:
+            yield self
+            return
+        map = self.__map
+        self.__batchDepth += 1
+        self.__changeLog.beginBatch()
+        map.beginBatch()
+        try:
+            yield self
+        finally:
+            map.endBatch()
+            self.__changeLog.endBatch()
+            self.__batchDepth -= 1
+            if self.__batchDepth == 0:
+                changes = self.__batchChanges
+                self.__batchChanges = []
+                self.__updatePath(changes)
 
-    def setRobotPosition(self, pos):
+    def setRobotPosition(self, pos, robotId=0):
         if self.__map == None or self.__robot == None:
             return
-        self.__robot.setPosition(pos)
+        robot = self.__robotList[robotId]
+        pos = tuple(pos)
+        if pos != robot.getPosition():
+            self.__changeLog.record(
+                ("robot", robotId, {"pos": pos, "dir": robot.getDirection()})
+            )
+        robot.setPosition(pos)
         self.__map.setVisited(pos)
-        if not self.__robot.isOnPath():
-            self.__robot.updatePath()
+        if not robot.isOnPath():
+            robot.recoverPath()
+
+    def setObserved(self, positions):
+        if self.__map == None:
+            return
+        self.__map.setObserved(positions)
 
     def getWorldData(self):
         if self.__map == None or self.__robot == None:
             return
+        spanStart = TRACER.startSpan()
         itemData = self.__map.getItemData()
         visitedData = self.__map.getVisitedData()
+        observedData = self.__map.getObservedData()
         robotStatData = self.__robot.getStatData()
 
         worldData = {}
         worldData["visitedData"] = visitedData
+        worldData["observedData"] = observedData
         worldData["robotData"] = robotStatData
+        worldData["fleetData"] = {
+            robot.getRobotId(): robot.getStatData() for robot in self.__robotList
+        }
         worldData["itemData"] = itemData
+        TRACER.endSpan("model.getWorldData", spanStart)
 
         return worldData
 
-    def getPathData(self):
-        return self.__getPathData()
+    def getWorldVersion(self):
+        return self.__changeLog.getVersion()
+
+    def getWorldDelta(self, sinceVersion=None):
+        if self.__map == None or self.__robot == None:
+            return
+        version = self.__changeLog.getVersion()
+        changes = self.__changeLog.getChanges(sinceVersion)
+        if changes == None:
+            return {"version": version, "full": True, "worldData": self.getWorldData()}
+
+        delta = {
+            "version": version,
+            "full": False,
+            "visited": [],
+            "observed": [],
+            "itemChanges": [],
+            "robotData": None,
+            "fleetData": {},
+        }
+        for change in changes:
+            if change[0] == "visited":
+                delta["visited"].append(change[1])
+            elif change[0] == "observed":
+                delta["observed"].append(change[1])
+            elif change[0] == "robot":
+                delta["fleetData"][change[1]] = change[2]
+                if change[1] == 0:
+                    delta["robotData"] = change[2]
+            else:
+                delta["itemChanges"].append(change)
+        return delta
+
+    def getPathData(self, robotId=0):
+        if self.__robot == None:
+            return None
+        return self.__robotList[robotId].getPathData()
+
+    def getMapSize(self):
+        if self.__map == None:
+            return None
+        return self.__map.getMapSize()
+
+    def getItemName(self, pos):
+        if self.__map == None:
+            return None
+        return self.__map.getItemName(tuple(pos))
+
+    def hasGoal(self):
+        if self.__map == None:
+            return False
+        return self.__map.getGoalItem() != None
+
+    def getPathStatData(self):
+        if self.__map == None:
+            return None
+        return self.__map.getPathStatData()
 
-    def moveRobot(self):
+    def getFleetStatData(self):
+        if self.__fleetPlanner == None:
+            return None
+        return self.__fleetPlanner.getStatData()
+
+    def moveRobot(self, robotId=0):
         if self.__robot == None:
             return
-        x, y = self.__robot.getPosition()
-        dx, dy = self.__robot.getDirection()
-        self.setRobotPosition((x + dx, y + dy))
+        robot = self.__robotList[robotId]
+        x, y = robot.getPosition()
+        dx, dy = robot.getDirection()
+        self.setRobotPosition((x + dx, y + dy), robotId)
 
-    def setRobotDirection(self, dir):
+    def setRobotDirection(self, dir, robotId=0):
         if self.__robot == None:
             return
-        self.__robot.setDirection(dir)
+        robot = self.__robotList[robotId]
+        dir = tuple(dir)
+        if dir != robot.getDirection():
+            self.__changeLog.record(
+                ("robot", robotId, {"pos": robot.getPosition(), "dir": dir})
+            )
+        robot.setDirection(dir)
 
-    def rotateRobot(self):
+    def rotateRobot(self, robotId=0):
         if self.__robot == None:
             return
-        dx, dy = self.__robot.getDirection()
-        self.setRobotDirection((dy, -dx))
+        dx, dy = self.__robotList[robotId].getDirection()
+        self.setRobotDirection((dy, -dx), robotId)
 
-    def getNextRobotBehavior(self):
+    def getNextRobotBehavior(self, robotId=0):
         if self.__robot == None:
             return
-        return self.__robot.getNextBehavior()
+        return self.__robotList[robotId].getNextBehavior()
 
-    def printRobotStat(self):
+    def logRobotStat(self, robotId=0):
         if self.__robot == None:
             return
-        print(self.__robot.getStatData())
+        statData = self.__robotList[robotId].getStatData()
+        logger.debug("robot", extra={"fields": {"robot": robotId, **statData}})
+
+    def __addItem(self, type, pos, updatePath):
+        if self.__map.isValidLocation(pos):
+            self.__map.addItem(type, pos)
+        if updatePath:
+            self.__updatePathAfterChange(type, [pos])
+
+    def __updatePathAfterChange(self, type, positions):
+        # type is None for removed items
+        if self.__batchDepth > 0:
+            self.__batchChanges.append((type, positions))
+        else:
+            self.__updatePath([(type, positions)])
+
+    def __updatePath(self, changes):
+        if not changes:
+            return
+        if self.__fleetPlanner == None:
+            if self.__isPathAffected(self.__robot, changes):
+                self.__robot.updatePath()
+            return
+        # in a fleet only a hazard on a robot's route makes that robot replan.
+        # goals are claimed when a robot needs one, and the map tells the fleet
+        # planner about added and removed goals
+        hazardPositions = set()
+        for type, positions in changes:
+            if type == "hazard":
+                hazardPositions.update(map(tuple, positions))
+        if hazardPositions:
+            for robot in self.__robotList:
+                pathData = robot.getPathData()
+                if pathData != None and not hazardPositions.isdisjoint(pathData):
+                    robot.updatePath()
+
+    def __isPathAffected(self, robot, changes):
+        # the rest of the route stays valid unless a hazard was put on it or the
+        # next goal is somewhere else now. a cell cleared next to the route or
+        # inside its bounding box may open a shorter way, so it replans too
+        pathData = robot.getRemainingPathData()
+        if not pathData:
+            return True
+        goalItem = self.__map.getGoalItem(robot.getPosition())
+        if goalItem == None or goalItem.getPosition() != robot.getPathGoal():
+            return True
+        xs = [x for x, y in pathData]
+        ys = [y for x, y in pathData]
+        left, right, top, bottom = min(xs) - 1, max(xs) + 1, min(ys) - 1, max(ys) + 1
+        for type, positions in changes:
+            if type == "hazard" and not set(map(tuple, positions)).isdisjoint(pathData):
+                return True
+            if type == None:
+                for x, y in positions:
+                    if left <= x <= right and top <= y <= bottom:
+                        return True
+        return False
+
+    def __setParticleFilter(self, robot):
+        if self.__localization == None:
+            robot.setParticleFilter(None)
+            return
+        particleCount, sensorRange, sensorArc, seed = self.__localization
+        if seed != None:
+            seed += robot.getRobotId()
+        robot.setParticleFilter(
+            ParticleFilter(
+                self.__map.getMapSize(), particleCount, sensorRange, sensorArc, seed
+            )
+        )
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_CAPACITY_DEFAULT = 256
+TRACE_FORMATS = ("jsonl", "chrome")
+
+
+class Tracer:
+    # spans and counters are collected per tick. a tick runs from one markTick
+    # to the next, so it also holds what happened between two ticks (publish,
+    # drawing). the last capacity ticks are kept in a ring buffer
+    def __init__(self, capacity=TRACE_CAPACITY_DEFAULT):
+        self.__isEnabled = False
+        self.__lock = threading.Lock()
+        self.__ticks = deque(maxlen=capacity)
+        self.__tickIndex = None
+        self.__tickStart = None
+        self.__spans = []
+        self.__counters = {}
+        self.__threadNames = {}
+        self.__originTime = time.perf_counter()
+
+    def enable(self, capacity=None):
+        with self.__lock:
+            if capacity != None and capacity != self.__ticks.maxlen:
+                self.__ticks = deque(self.__ticks, maxlen=capacity)
+            self.__tickIndex = None
+            self.__tickStart = None
+            self.__spans = []
+            self.__counters = {}
+            self.__isEnabled = True
+
+    def disable(self):
+        self.__isEnabled = False
+
+    def isEnabled(self):
+        return self.__isEnabled
+
+    def reset(self):
+        with self.__lock:
+            self.__ticks.clear()
+            self.__tickIndex = None
+            self.__tickStart = None
+            self.__spans = []
+            self.__counters = {}
+
+    def startSpan(self):
+        # a span is a startSpan/endSpan pair rather than a with block, which
+        # keeps a disabled span down to two calls
+        if not self.__isEnabled:
+            return None
+        return time.perf_counter()
+
+    def endSpan(self, name, startTime):
+        if startTime == None:
+            return
+        endTime = time.perf_counter()
+        thread = threading.get_ident()
+        with self.__lock:
+            if thread not in self.__threadNames:
+                self.__threadNames[thread] = threading.current_thread().name
+            self.__spans.append((name, startTime, endTime - startTime, thread))
+
+    def count(self, name, value=1):
+        if not self.__isEnabled:
+            return
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def markTick(self):
+        if not self.__isEnabled:
+            return
+        now = time.perf_counter()
+        with self.__lock:
+            if self.__tickIndex != None:
+                self.__ticks.append(self.__closeTick(now))
+                self.__tickIndex += 1
+            else:
+                self.__tickIndex = 0
+                self.__spans = []
+                self.__counters = {}
+            self.__tickStart = now
+
+    def getTicks(self):
+        # completed ticks, oldest first
+        with self.__lock:
+            return list(self.__ticks)
+
+    def getCapacity(self):
+        return self.__ticks.maxlen
+
+    def export(self, path, format="jsonl"):
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"unknown trace format: {format}")
+        if format == "jsonl":
+            self.exportJsonl(path)
+        else:
+            self.exportChromeTrace(path)
+
+    def exportJsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for tickData in self.getTicks():
+                f.write(json.dumps(tickData) + "\n")
+
+    def exportChromeTrace(self, path):
+        # trace event format, loads in chrome://tracing and perfetto
+        pid = os.getpid()
+        events = []
+        with self.__lock:
+            threadNames = dict(self.__threadNames)
+        for thread, threadName in threadNames.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread,
+                    "args": {"name": threadName},
+                }
+            )
+        for tickData in self.getTicks():
+            tickStart = tickData["start"] * 1e6
+            events.append(
+                {
+                    "name": f"tick {tickData['tick']}",
+                    "cat": "tick",
+                    "ph": "X",
+                    "ts": tickStart,
+                    "dur": (tickData["end"] - tickData["start"]) * 1e6,
+                    "pid": pid,
+                    "tid": 0,
+                }
+            )
+            if tickData["counters"]:
+                events.append(
+                    {
+                        "name": "counters",
+                        "ph": "C",
+                        "ts": tickStart,
+                        "pid": pid,
+                        "args": tickData["counters"],
+                    }
+                )
+            for spanData in tickData["spans"]:
+                events.append(
+                    {
+                        "name": spanData["name"],
+                        "cat": "span",
+                        "ph": "X",
+                        "ts": spanData["start"] * 1e6,
+                        "dur": spanData["duration"] * 1e6,
+                        "pid": pid,
+                        "tid": spanData["thread"],
+                    }
+                )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def __closeTick(self, endTime):
+        originTime = self.__originTime
+        tickData = {
+            "tick": self.__tickIndex,
+            "start": self.__tickStart - originTime,
+            "end": endTime - originTime,
+            "spans": [
+                {
+                    "name": name,
+                    "start": startTime - originTime,
+                    "duration": duration,
+                    "thread": thread,
+                }
+                for name, startTime, duration, thread in self.__spans
+            ],
+            "counters": self.__counters,
+        }
+        self.__spans = []
+        self.__counters = {}
+        return tickData
+
+
+# one tracer per process, the model, controller and view all report to it
+TRACER = Tracer()
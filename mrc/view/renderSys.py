@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import deque
+from mrc.model.changeSys import mergeWorldDelta
+
+
+class RateMeter:
+    # events per second over a sliding time window
+    def __init__(self, window=2.0):
+        self.__window = window
+        self.__times = deque()
+        self.__count = 0
+
+    def mark(self):
+        now = time.monotonic()
+        self.__times.append(now)
+        self.__count += 1
+        self.__trim(now)
+
+    def getRate(self):
+        self.__trim(time.monotonic())
+        if len(self.__times) < 2:
+            return 0.0
+        elapsed = self.__times[-1] - self.__times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self.__times) - 1) / elapsed
+
+    def getCount(self):
+        return self.__count
+
+    def __trim(self, now):
+        while self.__times and now - self.__times[0] > self.__window:
+            self.__times.popleft()
+
+
+class RenderMailbox:
+    # holds at most one pending world delta between the control thread and the
+    # tk thread. a delta posted before the last one was taken is merged into it,
+    # so the frame in between is dropped but none of its changes are lost.
+    # sourceTime is the perf_counter time of the event behind a delta, the
+    # oldest one still pending is carried until the frame is rendered
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending = None
+        self.__pendingSourceTime = None
+        self.__takenSourceTime = None
+        self.__postRateMeter = RateMeter()
+        self.__takeCount = 0
+        self.__dropCount = 0
+        self.__renderCount = 0
+        self.__lastLatency = 0.0
+        self.__totalLatency = 0.0
+        self.__maxLatency = 0.0
+
+    def post(self, worldDelta, sourceTime=None):
+        with self.__lock:
+            if self.__pending != None:
+                self.__dropCount += 1
+            self.__pending = mergeWorldDelta(self.__pending, worldDelta)
+            if sourceTime != None and (
+                self.__pendingSourceTime == None
+                or sourceTime < self.__pendingSourceTime
+            ):
+                self.__pendingSourceTime = sourceTime
+            self.__postRateMeter.mark()
+
+    def take(self):
+        with self.__lock:
+            worldDelta = self.__pending
+            self.__pending = None
+            if worldDelta != None:
+                self.__takeCount += 1
+                self.__takenSourceTime = self.__pendingSourceTime
+                self.__pendingSourceTime = None
+            return worldDelta
+
+    def markRendered(self):
+        with self.__lock:
+            if self.__takenSourceTime == None:
+                return
+            latency = time.perf_counter() - self.__takenSourceTime
+            self.__takenSourceTime = None
+            self.__renderCount += 1
+            self.__lastLatency = latency
+            self.__totalLatency += latency
+            self.__maxLatency = max(self.__maxLatency, latency)
+
+    def getStatData(self):
+        with self.__lock:
+            return {
+                "posted": self.__postRateMeter.getCount(),
+                "taken": self.__takeCount,
+                "dropped": self.__dropCount,
+                "postRate": self.__postRateMeter.getRate(),
+                "lastLatency": self.__lastLatency,
+                "meanLatency": self.__totalLatency / max(self.__renderCount, 1),
+                "maxLatency": self.__maxLatency,
+            }
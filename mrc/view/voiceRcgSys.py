@@ -1,43 +1,379 @@
-import speech_recognition as sr
+import queue
+import time
+from threading import Thread, Lock
+from mrc.logSys import getLogger
 
+logger = getLogger(__name__)
+
+VOICE_LISTEN_TIMEOUT = 3
+VOICE_PHRASE_LIMIT = 5
+VOICE_CALIBRATE_DURATION = 1.0
+VOICE_REFRESH_DURATION = 0.3
+VOICE_REFRESH_INTERVAL = 30.0
+
+# speech_recognition (and the microphone stack under it) is imported by the
+# classes that need it, so the fixture classes work without it
+
+
+class GoogleBackend:
+    # google web speech api, every phrase is a network request
+    def __init__(self, language="en-US"):
+        import speech_recognition as sr
+
+        self.__recognizer = sr.Recognizer()
+        self.__language = language
+
+    def recognize(self, audio):
+        import speech_recognition as sr
+
+        try:
+            return self.__recognizer.recognize_google(audio, language=self.__language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise RuntimeError(f"voice request failed: {e}")
+
+
+class SphinxBackend:
+    # cmu sphinx runs locally and needs no network, it needs pocketsphinx
+    def __init__(self, language="en-US", keywords=None):
+        import speech_recognition as sr
 
-class VoiceRcg:
-    def __init__(self):
         self.__recognizer = sr.Recognizer()
-        self.__isRecording = False
+        self.__language = language
+        self.__keywords = keywords
+
+    def recognize(self, audio):
+        import speech_recognition as sr
+
+        try:
+            return self.__recognizer.recognize_sphinx(
+                audio, language=self.__language, keyword_entries=self.__keywords
+            )
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            raise RuntimeError(f"voice request failed: {e}")
+
+
+class FixtureBackend:
+    # for FixtureSource, whose audio is already the text. delay stands in for
+    # the time a real backend takes
+    def __init__(self, delay=0.0):
+        self.__delay = delay
+
+    def recognize(self, audio):
+        if self.__delay > 0:
+            time.sleep(self.__delay)
+        return audio
+
+
+VOICE_BACKENDS = {
+    "google": GoogleBackend,
+    "sphinx": SphinxBackend,
+    "fixture": FixtureBackend,
+}
+
+
+def createBackend(name):
+    if name not in VOICE_BACKENDS:
+        raise ValueError(f"unknown voice backend: {name}")
+    return VOICE_BACKENDS[name]()
+
+
+class MicrophoneSource:
+    # keeps one microphone stream open for the whole session. the ambient noise
+    # is calibrated once when it opens, and calibrated again for a short time
+    # when no command came for refreshInterval seconds
+    def __init__(
+        self,
+        deviceIndex=None,
+        timeout=VOICE_LISTEN_TIMEOUT,
+        phraseLimit=VOICE_PHRASE_LIMIT,
+        refreshInterval=VOICE_REFRESH_INTERVAL,
+    ):
+        import speech_recognition as sr
+
+        self.__recognizer = sr.Recognizer()
+        self.__microphone = sr.Microphone(device_index=deviceIndex)
+        self.__timeout = timeout
+        self.__phraseLimit = phraseLimit
+        self.__refreshInterval = refreshInterval
+        self.__stream = None
+        self.__calibrateTime = None
+        self.__calibrateCount = 0
+
+    def open(self):
+        self.__stream = self.__microphone.__enter__()
+        self.__calibrate(VOICE_CALIBRATE_DURATION)
+
+    def close(self):
+        if self.__stream != None:
+            self.__microphone.__exit__(None, None, None)
+            self.__stream = None
+
+    def listen(self):
+        import speech_recognition as sr
+
+        try:
+            return self.__recognizer.listen(
+                self.__stream,
+                timeout=self.__timeout,
+                phrase_time_limit=self.__phraseLimit,
+            )
+        except sr.WaitTimeoutError:
+            return None
+        finally:
+            # speech just ended, the noise level is as fresh as it gets
+            self.__calibrateTime = time.monotonic()
+
+    def refresh(self):
+        if time.monotonic() - self.__calibrateTime >= self.__refreshInterval:
+            self.__calibrate(VOICE_REFRESH_DURATION)
+
+    def getNoiseData(self):
+        return {
+            "energyThreshold": self.__recognizer.energy_threshold,
+            "calibrations": self.__calibrateCount,
+        }
+
+    def __calibrate(self, duration):
+        self.__recognizer.adjust_for_ambient_noise(self.__stream, duration=duration)
+        self.__calibrateTime = time.monotonic()
+        self.__calibrateCount += 1
+
+
+class FileSource:
+    # plays recorded phrases (wav, aiff or flac) in order, one per command
+    def __init__(self, paths):
+        import speech_recognition as sr
+
+        self.__recognizer = sr.Recognizer()
+        self.__paths = list(paths)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def listen(self):
+        import speech_recognition as sr
+
+        if not self.__paths:
+            return None
+        with sr.AudioFile(self.__paths.pop(0)) as audioFile:
+            return self.__recognizer.record(audioFile)
+
+    def refresh(self):
+        pass
+
+    def getNoiseData(self):
+        return {}
+
+
+class FixtureSource:
+    # hands out text phrases in order, delay stands in for the time spent
+    # speaking. used with FixtureBackend for tests and benchmarks
+    def __init__(self, phrases, delay=0.0):
+        self.__phrases = list(phrases)
+        self.__delay = delay
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def listen(self):
+        if self.__delay > 0:
+            time.sleep(self.__delay)
+        if not self.__phrases:
+            return None
+        return self.__phrases.pop(0)
+
+    def refresh(self):
+        pass
+
+    def getNoiseData(self):
+        return {}
+
+
+class VoicePipeline:
+    # a capture thread owns the audio source and a recognizer thread runs the
+    # backend, so neither the tk thread nor the next capture waits for a
+    # recognition. every command ends in one result:
+    # {"text", "error", "requestTime", "listenTime", "audioTime", "textTime"}
+    # with perf_counter times. results go to the registered listener (on the
+    # recognizer thread) or else to a queue read with getResult
+    __POLL_INTERVAL = 1.0
+
+    def __init__(self, backend="google", source=None):
+        self.__backend = createBackend(backend) if isinstance(backend, str) else backend
+        self.__source = source
+        self.__requestQueue = queue.Queue()
+        self.__audioQueue = queue.Queue()
+        self.__resultQueue = queue.Queue()
         self.__onResult = None
+        self.__lock = Lock()
+        self.__isPending = False
+        self.__isRunning = False
+        self.__sourceError = None
+        self.__captureThread = None
+        self.__recognizeThread = None
+        self.__requestCount = 0
+        self.__resultCount = 0
+        self.__recognizedCount = 0
 
     def registerResultEventListener(self, callback):
         self.__onResult = callback
 
-    def isRecording(self):
-        return self.__isRecording
+    def start(self):
+        if self.__isRunning:
+            return
+        self.__isRunning = True
+        self.__captureThread = Thread(
+            target=self.__captureLoop, name="voiceCapture", daemon=True
+        )
+        self.__recognizeThread = Thread(
+            target=self.__recognizeLoop, name="voiceRecognize", daemon=True
+        )
+        self.__captureThread.start()
+        self.__recognizeThread.start()
+
+    def stop(self, timeout=None):
+        # a phrase that is being captured is finished first
+        if not self.__isRunning:
+            return
+        self.__requestQueue.put(None)
+        self.__captureThread.join(timeout)
+        self.__recognizeThread.join(timeout)
+        self.__isRunning = False
+
+    def isRunning(self):
+        return self.__isRunning
+
+    def isPending(self):
+        return self.__isPending
 
-    def record(self):
-        self.__isRecording = True
+    def requestCommand(self):
+        # returns at once, False while the last command has no result yet
+        with self.__lock:
+            if self.__isPending or not self.__isRunning:
+                return False
+            self.__isPending = True
+            self.__requestCount += 1
+        self.__requestQueue.put(time.perf_counter())
+        return True
 
-        result = None
+    def getResult(self, timeout=None):
+        try:
+            return self.__resultQueue.get(timeout=timeout)
+        except queue.Empty:
+            return None
 
-        with sr.Microphone() as source:
-            print("Say something...")
-            self.__recognizer.adjust_for_ambient_noise(
-                source
-            )  # Adjust for ambient noise
+    def getStatData(self):
+        statData = {
+            "requests": self.__requestCount,
+            "results": self.__resultCount,
+            "recognized": self.__recognizedCount,
+            "sourceError": self.__sourceError,
+        }
+        if self.__sourceError == None and self.__source != None:
+            statData.update(self.__source.getNoiseData())
+        return statData
 
-            try:
-                # Listen for speech using the microphone
-                audio = self.__recognizer.listen(source, timeout=3)
+    def __captureLoop(self):
+        try:
+            if self.__source == None:
+                self.__source = MicrophoneSource()
+            self.__source.open()
+        except Exception as e:
+            self.__sourceError = f"{type(e).__name__}: {e}"
+            logger.error("voice source failed", extra={"fields": {"error": e}})
+        try:
+            while True:
+                try:
+                    requestTime = self.__requestQueue.get(timeout=self.__POLL_INTERVAL)
+                except queue.Empty:
+                    if self.__sourceError == None:
+                        try:
+                            self.__source.refresh()
+                        except Exception as e:
+                            logger.error(
+                                "voice calibration failed",
+                                extra={"fields": {"error": e}},
+                            )
+                    continue
+                if requestTime == None:
+                    break
+                listenTime = time.perf_counter()
+                audio = None
+                error = self.__sourceError
+                if error == None:
+                    # a failed capture still ends in a result, so the command
+                    # does not stay pending
+                    try:
+                        audio = self.__source.listen()
+                    except Exception as e:
+                        error = f"voice capture failed: {type(e).__name__}: {e}"
+                        logger.error(
+                            "voice capture failed", extra={"fields": {"error": e}}
+                        )
+                self.__audioQueue.put(
+                    (audio, error, requestTime, listenTime, time.perf_counter())
+                )
+        finally:
+            if self.__sourceError == None:
+                self.__source.close()
+            self.__audioQueue.put(None)
 
-                # Use the Google Web Speech API to recognize the audio
-                result = self.__recognizer.recognize_google(audio)
-                print("You said:", result)
-            except sr.WaitTimeoutError:
-                print("Input waiting time exceeded. ")
-            except sr.UnknownValueError:
-                print("Sorry, could not understand audio.")
-            except sr.RequestError as e:
-                print(f"Error with the API request;")
+    def __recognizeLoop(self):
+        while True:
+            capture = self.__audioQueue.get()
+            if capture == None:
+                break
+            audio, error, requestTime, listenTime, audioTime = capture
+            text = None
+            if audio != None:
+                try:
+                    text = self.__backend.recognize(audio)
+                except Exception as e:
+                    error = str(e) if isinstance(e, RuntimeError) else repr(e)
+                    logger.error(
+                        "voice recognition failed", extra={"fields": {"error": e}}
+                    )
+            result = {
+                "text": text,
+                "error": error,
+                "requestTime": requestTime,
+                "listenTime": listenTime,
+                "audioTime": audioTime,
+                "textTime": time.perf_counter(),
+            }
+            logger.info("voice", extra={"fields": {"text": text, "error": error}})
+            with self.__lock:
+                self.__isPending = False
+                self.__resultCount += 1
+                if text != None:
+                    self.__recognizedCount += 1
+            if self.__onResult != None:
+                self.__notifyResult(result)
+            else:
+                self.__resultQueue.put(result)
 
-        self.__isRecording = False
-        if self.__onResult != None:
+    def __notifyResult(self, result):
+        # a listener that fails gets the same command once more as an error
+        # result, the recognizer thread keeps running either way
+        try:
             self.__onResult(result)
+            return
+        except Exception as e:
+            logger.error("voice listener failed", extra={"fields": {"error": e}})
+            errorResult = dict(result)
+            errorResult["text"] = None
+            errorResult["error"] = f"voice result failed: {type(e).__name__}: {e}"
+        try:
+            self.__onResult(errorResult)
+        except Exception as e:
+            logger.error("voice listener failed", extra={"fields": {"error": e}})
@@ -1,13 +1,17 @@
 import tkinter as tk
 from PIL import Image, ImageTk
 import re
-from .voiceRcgSys import VoiceRcg
+import time
+from mrc.model.changeSys import WorldDataMirror
+from mrc.traceSys import TRACER
+from .renderSys import RateMeter
 
 MAPSIZE_DEFAULT = "(5 5)"
 STARTING_POINT_DEFAULT = "(0 0)"
 TARGET_DEFAULT = "((4 4))"
 HAZARD_DEFAULT = "((1 1)(2 2)(2 3))"
 MOVE_DELAY = 0.3
+FRAME_RATE_DEFAULT = 30
 
 
 class WorldView:
@@ -23,16 +27,37 @@ class WorldView:
         "blob": "mrc/resources/colorBlob_icon.png",
         "target": "mrc/resources/goal_icon.png",
     }
+    __ROBOT_IMG_TYPE = {
+        (1, 0): "robot_right",
+        (-1, 0): "robot_left",
+        (0, 1): "robot_down",
+        (0, -1): "robot_up",
+    }
 
-    def __init__(self):
+    def __init__(self, frameRate=FRAME_RATE_DEFAULT):
         self.__mapSize = None
         self.__isRobotStop = True
         self.__callbackMap = {}
+        self.__spriteCache = {}
+        self.__drawnMapSize = None
+        self.__fogIds = []
+        self.__fogVisible = bytearray()
+        self.__itemIds = {}
+        self.__robotIds = {}
+        self.__robotTypes = {}
+        self.__frameCount = 0
+        self.__lastFrameTime = 0.0
+        self.__totalFrameTime = 0.0
+        self.__frameRate = frameRate
+        self.__frameRateMeter = RateMeter()
+        self.__renderMailbox = None
+        self.__worldDataMirror = WorldDataMirror()
         self.__root = tk.Tk()
         self.__root.resizable(True, True)
         self.__root.protocol("WM_DELETE_WINDOW", self.__onWindowClose)
-        self.__voiceRcg = VoiceRcg()
-        self.__voiceRcg.registerResultEventListener(self.__onVoiceResult)
+        # set from the voice threads, shown by the render timer
+        self.__isVoicePending = False
+        self.__voiceStatus = None
 
         self.__initMapFrame()
         self.__initConfigFrame()
@@ -43,6 +68,16 @@ class WorldView:
         self.__mapSize = mapSize
         self.__resizeCanvas()
 
+    def setRenderMailbox(self, renderMailbox):
+        self.__renderMailbox = renderMailbox
+
+    def setFrameRate(self, frameRate):
+        self.__frameRate = frameRate
+
+    def setVoiceStatus(self, text):
+        # safe to call from any thread, it also ends the pending voice command
+        self.__voiceStatus = text
+
     def __runCallback(self, eventName, *args):
         if eventName in self.__callbackMap:
             callback = self.__callbackMap[eventName]
@@ -131,39 +166,24 @@ class WorldView:
                 self.__runCallback("submit", data)
                 self.__showMainView(data)
 
-    def __onVoiceResult(self, text):
-        if text == None:
-            self.__voiceRcgText.config(text="no input")
-            self.__runCallback("voiceResult", None)
-        else:
-            nums = re.findall(r"\d+", text)
-            itemName = None
-            if len(nums) < 2:
-                self.__voiceRcgText.config(text=f"invalid input: {text}")
-                return
-            if text[0] == "H":
-                itemName = "hazard"
-            elif text[0] == "B":
-                itemName = "blob"
-            elif text[0] == "T":
-                itemName = "target"
-            else:
-                self.__voiceRcgText.config(text=f"invalid input: {text}")
-
-            if itemName != None:
-                self.__runCallback(
-                    "voiceResult", [itemName, (int(nums[0]), int(nums[1]))]
-                )
-            else:
-                self.__runCallback("voiceResult", None)
-
-        self.__robotMoveButton.config(state="normal")
-
     def __onVoiceRcg(self):
-        isRecording = self.__voiceRcg.isRecording()
-        if not isRecording:
+        # the capture runs on the voice threads, the result comes back through
+        # setVoiceStatus
+        if not self.__isVoicePending:
+            self.__isVoicePending = True
             self.__robotMoveButton.config(state="disabled")
-            self.__voiceRcg.record()
+            self.__voiceRcgText.config(text="listening...")
+            self.__runCallback("voiceRcg")
+
+    def __updateVoiceStatus(self):
+        voiceStatus = self.__voiceStatus
+        if voiceStatus == None:
+            return
+        self.__voiceStatus = None
+        self.__voiceRcgText.config(text=voiceStatus)
+        if self.__isVoicePending:
+            self.__isVoicePending = False
+            self.__robotMoveButton.config(state="normal")
 
     def __robotMove(self):
         self.__isRobotStop = not self.__isRobotStop
@@ -258,16 +278,52 @@ class WorldView:
         self.__voiceRcgText = tk.Label(self.__controlFrame)
         self.__voiceRcgText.grid(row=1, column=0, columnspan=2)
 
-    def drawMap(self, worldData):
-        if self.__mapSize == None:
-            return
+        self.__rateText = tk.Label(self.__controlFrame)
+        self.__rateText.grid(row=2, column=0, columnspan=2)
 
-        itemData = worldData["itemData"]
-        robotData = worldData["robotData"]
-        visitedData = worldData["visitedData"]
+    def drawMap(self, worldData, worldDelta=None):
+        # retained mode: the fog, grid and sprites are canvas items that are only
+        # created, hidden or moved when the world data differs from the last frame.
+        # with the delta that led to worldData only the cells it uncovered are
+        # cleared and the items it changed are redrawn, the whole fog and item
+        # set are compared on a full delta or without one
+        if self.__mapSize == None or worldData == None:
+            return
+        startTime = time.perf_counter()
 
-        self.__canvas.image_references = []
+        spanStart = TRACER.startSpan()
+        isFull = worldDelta == None or worldDelta["full"]
+        if self.__drawnMapSize != self.__mapSize:
+            self.__initCanvasItems()
+            isFull = True
 
+        if isFull:
+            self.__drawFog(worldData["visitedData"], worldData.get("observedData"))
+            self.__drawItems(worldData["itemData"])
+        else:
+            self.__clearFog(worldDelta["visited"])
+            self.__clearFog(worldDelta["observed"])
+            self.__changeItems(worldDelta["itemChanges"])
+        fleetData = worldData.get("fleetData")
+        if not fleetData:
+            fleetData = {0: worldData["robotData"]}
+        for robotId, robotData in fleetData.items():
+            self.__drawRobot(robotId, robotData)
+        TRACER.endSpan("view.drawMap", spanStart)
+
+        self.__frameCount += 1
+        self.__lastFrameTime = time.perf_counter() - startTime
+        self.__totalFrameTime += self.__lastFrameTime
+
+    def getFrameStatData(self):
+        return {
+            "frames": self.__frameCount,
+            "frameRate": self.__frameRateMeter.getRate(),
+            "lastFrameTime": self.__lastFrameTime,
+            "meanFrameTime": self.__totalFrameTime / max(self.__frameCount, 1),
+        }
+
+    def __initCanvasItems(self):
         cols, rows = self.__mapSize
 
         self.__canvas.config(
@@ -275,11 +331,13 @@ class WorldView:
             height=cols * self.__CELL_SIZE + 2 * self.__MAP_MARGIN,
         )
         self.__canvas.delete("all")
-        for i in range(cols):
-            for j in range(rows):
-                if not visitedData[j][i]:
-                    x = i * self.__CELL_SIZE
-                    y = j * self.__CELL_SIZE
+
+        self.__fogIds = []
+        for j in range(rows):
+            for i in range(cols):
+                x = i * self.__CELL_SIZE
+                y = j * self.__CELL_SIZE
+                self.__fogIds.append(
                     self.__canvas.create_rectangle(
                         x + self.__MAP_MARGIN - self.__CELL_SIZE / 2,
                         y + self.__MAP_MARGIN - self.__CELL_SIZE / 2,
@@ -288,6 +346,8 @@ class WorldView:
                         fill="gray",
                         outline="",
                     )
+                )
+        self.__fogVisible = bytearray(b"\x01") * (cols * rows)
 
         for j in range(rows):
             y = j * self.__CELL_SIZE
@@ -309,57 +369,147 @@ class WorldView:
                 fill="black",
             )
 
-        if "target" in itemData:
-            targetPosArr = itemData["target"]
-            for targetPos in targetPosArr:
-                self.__drawItem("target", targetPos)
-
-        if "blob" in itemData:
-            blobPosArr = itemData["blob"]
-            for blobPos in blobPosArr:
-                self.__drawItem("blob", blobPos)
+        self.__itemIds = {}
+        self.__robotIds = {}
+        self.__robotTypes = {}
+        self.__drawnMapSize = self.__mapSize
 
-        if "hazard" in itemData:
-            hazardPosArr = itemData["hazard"]
-            for hazardPos in hazardPosArr:
-                self.__drawItem("hazard", hazardPos)
+    def __drawFog(self, visitedData, observedData=None):
+        # cells a sensor has observed are clear like the visited ones
+        cols, rows = self.__mapSize
+        fogVisible = self.__fogVisible
+        for j in range(rows):
+            visitedRow = visitedData[j]
+            observedRow = observedData[j] if observedData != None else visitedRow
+            for i in range(cols):
+                visible = 0 if visitedRow[i] or observedRow[i] else 1
+                k = j * cols + i
+                if fogVisible[k] != visible:
+                    fogVisible[k] = visible
+                    self.__canvas.itemconfig(
+                        self.__fogIds[k], state="normal" if visible else "hidden"
+                    )
 
-        robotPos = robotData["pos"]
-        robotDir = robotData["dir"]
-        if robotDir == (1, 0):
-            self.__drawItem("robot_right", robotPos)
-        elif robotDir == (-1, 0):
-            self.__drawItem("robot_left", robotPos)
-        elif robotDir == (0, 1):
-            self.__drawItem("robot_down", robotPos)
-        elif robotDir == (0, -1):
-            self.__drawItem("robot_up", robotPos)
-
-    def __drawItem(self, type, pos):
-        if self.__mapSize == None:
+    def __clearFog(self, positions):
+        # cells are only ever uncovered between full deltas
+        cols = self.__mapSize[0]
+        fogVisible = self.__fogVisible
+        for x, y in positions:
+            k = y * cols + x
+            if fogVisible[k]:
+                fogVisible[k] = 0
+                self.__canvas.itemconfig(self.__fogIds[k], state="hidden")
+
+    def __drawItems(self, itemData):
+        items = set()
+        for type in ("target", "blob", "hazard"):
+            if type in itemData:
+                for pos in itemData[type]:
+                    items.add((type, tuple(pos)))
+
+        for key in list(self.__itemIds):
+            if key not in items:
+                self.__canvas.delete(self.__itemIds.pop(key))
+        for type, pos in items:
+            if (type, pos) not in self.__itemIds:
+                itemId = self.__createSprite(type, pos)
+                if itemId != None:
+                    self.__itemIds[(type, pos)] = itemId
+        self.__raiseRobots()
+
+    def __changeItems(self, itemChanges):
+        # changes are in the order they were made, a replaced item is removed
+        # before its successor is added
+        if not itemChanges:
             return
-        if not (type in self.__ITEM_IMG_SRC):
+        for kind, type, pos in itemChanges:
+            key = (type, tuple(pos))
+            if kind == "add":
+                if key not in self.__itemIds:
+                    itemId = self.__createSprite(type, key[1])
+                    if itemId != None:
+                        self.__itemIds[key] = itemId
+            elif key in self.__itemIds:
+                self.__canvas.delete(self.__itemIds.pop(key))
+        self.__raiseRobots()
+
+    def __raiseRobots(self):
+        for spriteId in self.__robotIds.values():
+            self.__canvas.tag_raise(spriteId)
+
+    def __drawRobot(self, robotId, robotData):
+        robotPos = robotData["pos"]
+        robotDir = tuple(robotData["dir"])
+        type = self.__ROBOT_IMG_TYPE.get(robotDir)
+        if type == None or not self.__isOnMap(robotPos):
             return
+        spriteId = self.__robotIds.get(robotId)
+        if spriteId == None:
+            self.__robotIds[robotId] = self.__createSprite(type, robotPos)
+        else:
+            x, y = robotPos
+            self.__canvas.coords(
+                spriteId,
+                x * self.__CELL_SIZE + self.__MAP_MARGIN,
+                y * self.__CELL_SIZE + self.__MAP_MARGIN,
+            )
+            if type != self.__robotTypes.get(robotId):
+                self.__canvas.itemconfig(spriteId, image=self.__getSprite(type))
+        self.__robotTypes[robotId] = type
+
+    def __getSprite(self, type):
+        # icons are decoded and scaled once and shared by every canvas item
+        if type not in self.__spriteCache:
+            img = Image.open(self.__ITEM_IMG_SRC[type])
+            img_resized = img.resize((self.__ICON_SIZE, self.__ICON_SIZE))
+            self.__spriteCache[type] = ImageTk.PhotoImage(img_resized)
+        return self.__spriteCache[type]
+
+    def __isOnMap(self, pos):
         x, y = pos
-        if x < 0 or y < 0 or x >= self.__mapSize[0] or y >= self.__mapSize[1]:
-            return
-        img = Image.open(self.__ITEM_IMG_SRC[type])
-        img_resized = img.resize((self.__ICON_SIZE, self.__ICON_SIZE))
+        return x >= 0 and y >= 0 and x < self.__mapSize[0] and y < self.__mapSize[1]
 
-        image = ImageTk.PhotoImage(img_resized)
-
-        self.__canvas.create_image(
+    def __createSprite(self, type, pos):
+        if not (type in self.__ITEM_IMG_SRC):
+            return None
+        if not self.__isOnMap(pos):
+            return None
+        x, y = pos
+        return self.__canvas.create_image(
             x * self.__CELL_SIZE + self.__MAP_MARGIN,
             y * self.__CELL_SIZE + self.__MAP_MARGIN,
             anchor=tk.CENTER,
-            image=image,
+            image=self.__getSprite(type),
         )
-        self.__canvas.image_references.append(image)
 
-    def runGUI(self):
-        self.__showConfigView()
+    def runGUI(self, data=None):
+        # with mission data the setup form is skipped
+        if data != None:
+            self.__showMainView(data)
+        else:
+            self.__showConfigView()
+        self.__root.after(0, self.__onRenderTimer)
         self.__root.mainloop()
 
+    def __onRenderTimer(self):
+        # runs on the tk thread and draws whatever the control thread published
+        # since the last frame, at most frameRate times per second
+        if self.__renderMailbox != None:
+            worldDelta = self.__renderMailbox.take()
+            if worldDelta != None:
+                self.__worldDataMirror.apply(worldDelta)
+                self.drawMap(self.__worldDataMirror.getWorldData(), worldDelta)
+                self.__renderMailbox.markRendered()
+                self.__frameRateMeter.mark()
+            mailboxStatData = self.__renderMailbox.getStatData()
+            self.__rateText.config(
+                text=f"tick {mailboxStatData['postRate']:.1f}/s"
+                f"  frame {self.__frameRateMeter.getRate():.1f}/s"
+                f"  dropped {mailboxStatData['dropped']}"
+            )
+        self.__updateVoiceStatus()
+        self.__root.after(max(1, int(1000 / self.__frameRate)), self.__onRenderTimer)
+
     def registerEventListener(self, eventName, callback):
         if callable(callback):
             self.__callbackMap[eventName] = callback
@@ -13,7 +13,7 @@ setup(
     name=__package_name__,
     version=__version__,
     long_description=readme,
-    packages=find_packages(exclude=["contrib", "docs", "tests"]),
+    packages=find_packages(exclude=["contrib", "docs", "tests", "benchmarks"]),
     package_data={"": ["*.yaml", "*.yml"]},
     install_requires=requires,
     setup_requires=["pytest-runner"],
@@ -0,0 +1,65 @@
+import pytest
+
+import mrc.model.mapSys
+from mrc.model.actorSys import LatticeMap2DActor
+from mrc.model.mapSys import LatticeMap2D
+from mrc.model.planSys import DistanceFieldPlanner
+
+
+def makeActor(planner, targetPos=(6, 0)):
+    map = LatticeMap2D(10, 10, planner)
+    map.addItem("target", targetPos)
+    actor = LatticeMap2DActor(map)
+    actor.setPosition((0, 0))
+    actor.setDirection((1, 0))
+    actor.updatePath()
+    return map, actor
+
+
+def getRemainingPath(actor):
+    return [tuple(pos) for pos in actor.getRemainingPathData()]
+
+
+@pytest.mark.parametrize("planner", ["bfs", "astar", "field"])
+def test_slip_along_the_route_continues_it(planner):
+    map, actor = makeActor(planner)
+    route = [tuple(pos) for pos in actor.getPathData()]
+    # two cells in one move lands further on the route
+    actor.setPosition((2, 0))
+    assert not actor.isOnPath()
+    actor.recoverPath()
+    assert getRemainingPath(actor) == route[2:]
+
+
+@pytest.mark.parametrize("planner", ["bfs", "astar", "field"])
+def test_recovery_returns_to_the_planner_route(planner):
+    map, actor = makeActor(planner)
+    actor.setPosition((1, 1))
+    actor.recoverPath()
+    # one step from the field, then a whole route again
+    nextStep = getRemainingPath(actor)[1]
+    assert getRemainingPath(actor) == [(1, 1), nextStep]
+    actor.setPosition(nextStep)
+    assert actor.getNextBehavior() != None
+    remainingPath = getRemainingPath(actor)
+    assert remainingPath[0] == nextStep and remainingPath[-1] == (6, 0)
+    assert len(remainingPath) == abs(6 - nextStep[0]) + abs(nextStep[1]) + 1
+
+
+def test_recovery_field_is_built_on_the_first_recovery(monkeypatch):
+    built = []
+
+    class CountingFieldPlanner(DistanceFieldPlanner):
+        def __init__(self, map):
+            built.append(None)
+            super().__init__(map)
+
+    monkeypatch.setattr(mrc.model.mapSys, "DistanceFieldPlanner", CountingFieldPlanner)
+    map, actor = makeActor("bfs")
+    for pos in [(1, 0), (2, 0)]:
+        actor.getNextBehavior()
+        actor.setPosition(pos)
+    assert built == []
+    actor.setPosition((2, 1))
+    actor.recoverPath()
+    assert built == [None]
@@ -0,0 +1,63 @@
+import time
+
+from mrc.controller.asyncController import ControllerCore
+from mrc.controller.batchRunner import makeScenario
+from mrc.controller.missionRunner import MissionRunner
+from mrc.view.renderSys import RenderMailbox
+
+
+def waitForPosts(renderMailbox, count, timeout=5.0):
+    endTime = time.perf_counter() + timeout
+    while time.perf_counter() < endTime:
+        if renderMailbox.getStatData()["posted"] >= count:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def runCore(events, monkeypatch=None):
+    renderMailbox = RenderMailbox()
+    core = ControllerCore(renderMailbox, period=0.01)
+    core.start()
+    try:
+        for event in events:
+            core.postEvent(*event)
+        isPosted = waitForPosts(renderMailbox, 3)
+    finally:
+        core.postEvent("windowClose")
+        core.join(5.0)
+    return core, renderMailbox, isPosted
+
+
+def test_core_survives_a_failing_event():
+    mission = makeScenario(0, (10, 10))
+    core, renderMailbox, isPosted = runCore(
+        [
+            # a voice command before any mission and an event with missing
+            # arguments, neither may stop the events after them
+            ("voiceResult", [("add", "hazard", [(1, 1)])]),
+            ("voiceResult",),
+            ("submit", mission),
+            ("robotMove", False),
+        ]
+    )
+    assert isPosted
+    assert core.getWorldStateModel().getMapSize() == (10, 10)
+
+
+def test_core_survives_a_failing_tick(monkeypatch):
+    tick = MissionRunner.tick
+    calls = []
+
+    def failingTick(self):
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("tick failed")
+        return tick(self)
+
+    monkeypatch.setattr(MissionRunner, "tick", failingTick)
+    core, renderMailbox, isPosted = runCore(
+        [("submit", makeScenario(1, (10, 10))), ("robotMove", False)]
+    )
+    assert isPosted
+    assert len(calls) > 1
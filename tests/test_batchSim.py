@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+
+from mrc.controller.batchSim import BatchSIM
+from mrc.controller.sim import SIM
+
+MAP_SIZE = (8, 8)
+
+
+def makeSims(rng, fleetCount, fleetSize, itemCount):
+    width, height = MAP_SIZE
+    robotCount = fleetCount * fleetSize
+    batchSim = BatchSIM(robotCount, MAP_SIZE, seed=0, fleetSize=fleetSize)
+    sims = [SIM(MAP_SIZE, (0, 0), (0, 1)) for i in range(fleetCount)]
+    for i in range(itemCount):
+        typeName = rng.choice(["hazard", "blob"])
+        pos = (rng.randrange(width), rng.randrange(height))
+        batchSim.addItem(typeName, pos)
+        for sim in sims:
+            sim.addItem(typeName, pos)
+    # crowded starts, so the robots of a fleet keep running into each other
+    starts = [(rng.randrange(3), rng.randrange(3)) for i in range(robotCount)]
+    dirs = [rng.choice([(1, 0), (0, 1), (-1, 0), (0, -1)]) for i in range(robotCount)]
+    batchSim.setRobotPos(starts)
+    batchSim.setRobotDir(dirs)
+    for f, sim in enumerate(sims):
+        sim.setRobotPos(starts[f * fleetSize])
+        sim.setRobotDir(dirs[f * fleetSize])
+        for r in range(f * fleetSize + 1, (f + 1) * fleetSize):
+            sim.addRobot(starts[r], dirs[r])
+    return batchSim, sims
+
+
+@pytest.mark.parametrize("fleetSize", [1, 3])
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_matches_sim_step_for_step(fleetSize, seed):
+    rng = random.Random(seed)
+    batchSim, sims = makeSims(rng, 4, fleetSize, 12)
+    robotCount = batchSim.getRobotCount()
+    blockedCount = 0
+    for step in range(60):
+        behaviors = [rng.randrange(3) for r in range(robotCount)]
+        probs = [rng.random() for r in range(robotCount)]
+        batchSim.step(behaviors, probs)
+        batchAdded = batchSim.getAddedItem()
+
+        # the robots of a SIM are ticked in order like MissionRunner does
+        for r in range(robotCount):
+            sim = sims[r // fleetSize]
+            robotId = r % fleetSize
+            (x, y), (dx, dy) = sim.getRobotPos(robotId), sim.getRobotDir(robotId)
+            if behaviors[r] == BatchSIM.BEHAVIOR_MOVE:
+                sim.move(probs[r], robotId)
+                if (
+                    probs[r] >= 0.05
+                    and sim.isSafe(x + dx, y + dy)
+                    and list(sim.getRobotPos(robotId)) == [x, y]
+                ):
+                    blockedCount += 1
+            elif behaviors[r] == BatchSIM.BEHAVIOR_ROTATE:
+                sim.rotate(robotId)
+            assert batchAdded[r] == sim.getAddedItem(robotId)
+            assert list(sim.getRobotPos(robotId)) == batchSim.getRobotPos()[r].tolist()
+            assert list(sim.getRobotDir(robotId)) == batchSim.getRobotDir()[r].tolist()
+    # only the robots of a fleet have someone in their way
+    assert (blockedCount > 0) == (fleetSize > 1)
+
+
+def test_robots_of_a_fleet_block_each_other():
+    batchSim = BatchSIM(4, MAP_SIZE, fleetSize=2)
+    batchSim.setRobotPos([(0, 0), (0, 1), (0, 0), (5, 5)])
+    batchSim.setRobotDir([(0, 1)] * 4)
+    batchSim.move(probs=[0.5] * 4)
+    # the first robot waits behind the second, which moves away after it, the
+    # robot of the other fleet drives through the same cell
+    assert batchSim.getRobotPos().tolist() == [[0, 0], [0, 2], [0, 1], [5, 6]]
+    batchSim.move(probs=[0.99] * 4)
+    # a slip of two cells stops where the second one is taken
+    assert batchSim.getRobotPos().tolist() == [[0, 1], [0, 4], [0, 3], [5, 7]]
+
+
+def test_fleet_size_must_divide_the_robots():
+    with pytest.raises(ValueError):
+        BatchSIM(5, MAP_SIZE, fleetSize=2)
+
+
+def test_default_slips_are_seeded():
+    positions = []
+    for k in range(2):
+        batchSim = BatchSIM(50, MAP_SIZE, seed=3)
+        batchSim.setRobotDir([(0, 1)] * 50)
+        for step in range(5):
+            batchSim.move()
+        positions.append(batchSim.getRobotPos().copy())
+    assert np.array_equal(positions[0], positions[1])
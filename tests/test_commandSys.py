@@ -0,0 +1,108 @@
+import pytest
+
+from mrc.controller.commandSys import CommandHistory, applyCommand, parseCommand
+from mrc.model.worldModel import WorldStateModel
+
+
+def makeModel(mapSize=(10, 10)):
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize(mapSize, (0, 0), (0, 1))
+    return worldStateModel
+
+
+def getItems(worldStateModel, positions):
+    return [worldStateModel.getItemName(pos) for pos in positions]
+
+
+@pytest.mark.parametrize(
+    "text, command",
+    [
+        ("hazard 3 4", [("add", "hazard", [(3, 4)])]),
+        (
+            "hazard 1 1 and 2 2, blob seven one",
+            [("add", "hazard", [(1, 1), (2, 2)]), ("add", "blob", [(7, 1)])],
+        ),
+        ("add target twenty one 5", [("add", "target", [(21, 5)])]),
+        ("remove 3 4 and 5 6", [("remove", None, [(3, 4), (5, 6)])]),
+        ("undo", [("undo", 1)]),
+        ("hazard 1 1 undo 3", [("add", "hazard", [(1, 1)]), ("undo", 3)]),
+        (
+            "delete hazard row 2 from 0 to 3",
+            [("remove", "hazard", [(0, 2), (1, 2), (2, 2), (3, 2)])],
+        ),
+        ("blob column 1 from 3 to 2", [("add", "blob", [(1, 2), (1, 3)])]),
+        (
+            "hazard rectangle 0 0 through 1 1",
+            [("add", "hazard", [(0, 0), (1, 0), (0, 1), (1, 1)])],
+        ),
+    ],
+)
+def test_parse_command(text, command):
+    assert parseCommand(text) == command
+
+
+@pytest.mark.parametrize(
+    "text, command",
+    [
+        # "two" written as "to" or "too", and "four" as "for"
+        ("hazard to 3", [("add", "hazard", [(2, 3)])]),
+        ("hazard 3 too", [("add", "hazard", [(3, 2)])]),
+        ("blob for three", [("add", "blob", [(4, 3)])]),
+        ("hazard row to from 0 to 2", [("add", "hazard", [(0, 2), (1, 2), (2, 2)])]),
+        ("hazard row 1 0 to", [("add", "hazard", [(0, 1), (1, 1), (2, 1)])]),
+        # where the numbers are complete they stay range words
+        ("hazard 3 to 4", [("add", "hazard", [(3, 4)])]),
+        ("hazard row 1 from 0 to 1", [("add", "hazard", [(0, 1), (1, 1)])]),
+    ],
+)
+def test_parse_number_homophones(text, command):
+    assert parseCommand(text) == command
+
+
+@pytest.mark.parametrize(
+    "text",
+    [None, "", "hello robot", "hazard 3", "add 3 4", "hazard row 1 2", "blob 1 x 2"],
+)
+def test_parse_rejects_non_commands(text):
+    assert parseCommand(text) == None
+
+
+def test_shapes_are_clipped_to_the_map():
+    assert parseCommand("hazard row 9 from 8 to 1000000", (10, 10)) == [
+        ("add", "hazard", [(8, 9), (9, 9)])
+    ]
+    assert parseCommand("hazard rectangle 5 5 to 900 900", (6, 6)) == [
+        ("add", "hazard", [(5, 5)])
+    ]
+    # a shape that misses the map adds nothing
+    assert parseCommand("hazard column 20 from 0 to 5", (10, 10)) == [
+        ("add", "hazard", [])
+    ]
+
+
+def test_apply_and_undo():
+    worldStateModel = makeModel()
+    commandHistory = CommandHistory()
+    cells = [(1, 1), (2, 1), (3, 1)]
+
+    command = parseCommand("hazard row 1 from 1 to 3, blob 5 5 and 50 50")
+    assert applyCommand(command, worldStateModel, commandHistory) == 4
+    assert getItems(worldStateModel, cells + [(5, 5)]) == ["hazard"] * 3 + ["blob"]
+
+    # a target on a hazard replaces it, and undo brings the hazard back
+    command = parseCommand("target 2 1, remove hazard 1 1")
+    assert applyCommand(command, worldStateModel, commandHistory) == 2
+    assert getItems(worldStateModel, cells) == [None, "target", "hazard"]
+
+    assert applyCommand([("undo", 1)], worldStateModel, commandHistory) == 2
+    assert getItems(worldStateModel, cells) == ["hazard"] * 3
+
+    # undo past the history stops at its start
+    assert applyCommand([("undo", 5)], worldStateModel, commandHistory) == 4
+    assert getItems(worldStateModel, cells + [(5, 5)]) == [None] * 4
+    assert commandHistory.getSize() == 0
+
+
+def test_apply_without_a_map_changes_nothing():
+    worldStateModel = WorldStateModel()
+    assert applyCommand(parseCommand("hazard 1 1"), worldStateModel) == 0
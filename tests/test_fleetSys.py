@@ -0,0 +1,64 @@
+from mrc.model.actorSys import LatticeMap2DActor
+from mrc.model.fleetSys import FleetPlanner
+from mrc.model.mapSys import LatticeMap2D
+
+
+def makeFleet(robotPositions, targetPositions):
+    map = LatticeMap2D(10, 10)
+    for pos in targetPositions[:1]:
+        map.addItem("target", pos)
+    fleetPlanner = FleetPlanner(map)
+    map.setFleetPlanner(fleetPlanner)
+    # the rest arrive after the planner, through the map
+    for pos in targetPositions[1:]:
+        map.addItem("target", pos)
+    actors = []
+    for robotId, pos in enumerate(robotPositions):
+        actor = LatticeMap2DActor(map, robotId)
+        actor.setPosition(pos)
+        actor.setDirection((0, 1))
+        actor.setFleetPlanner(fleetPlanner)
+        fleetPlanner.addRobot(actor)
+        actors.append(actor)
+    return map, fleetPlanner, actors
+
+
+def getGoalPosition(fleetPlanner, actor):
+    goalItem = fleetPlanner.getGoalItem(actor)
+    return None if goalItem == None else goalItem.getPosition()
+
+
+def test_robots_claim_the_nearest_free_goal():
+    map, fleetPlanner, actors = makeFleet(
+        [(0, 0), (9, 9), (1, 0)], [(0, 2), (9, 7), (0, 1)]
+    )
+    assert getGoalPosition(fleetPlanner, actors[0]) == (0, 1)
+    assert getGoalPosition(fleetPlanner, actors[1]) == (9, 7)
+    # (0, 1) is taken, so the equally near goal after it is not either
+    assert getGoalPosition(fleetPlanner, actors[2]) == (0, 2)
+
+
+def test_equally_near_goals_are_taken_in_insertion_order():
+    map, fleetPlanner, actors = makeFleet([(5, 5)], [(5, 7), (7, 5), (3, 5)])
+    assert getGoalPosition(fleetPlanner, actors[0]) == (5, 7)
+
+
+def test_removed_and_released_goals():
+    map, fleetPlanner, actors = makeFleet([(0, 0), (9, 9)], [(0, 1), (9, 8)])
+    assert getGoalPosition(fleetPlanner, actors[0]) == (0, 1)
+    assert getGoalPosition(fleetPlanner, actors[1]) == (9, 8)
+
+    # a reached goal is gone, the robot takes the only goal left and shares it
+    map.removeItem((0, 1))
+    assert getGoalPosition(fleetPlanner, actors[0]) == (9, 8)
+
+    # a new blob makes the robot heading for a target give its claim back
+    map.addItem("blob", (5, 5))
+    assert fleetPlanner.needsReplan(actors[1])
+    assert getGoalPosition(fleetPlanner, actors[1]) == (5, 5)
+    assert getGoalPosition(fleetPlanner, actors[0]) == (9, 8)
+
+    # the blob of a removed robot is free again once the target is reached
+    fleetPlanner.removeRobot(1)
+    map.removeItem((9, 8))
+    assert getGoalPosition(fleetPlanner, actors[0]) == (5, 5)
@@ -0,0 +1,50 @@
+import pytest
+
+from mrc.controller.sim import SIM
+from mrc.model.localizationSys import ParticleFilter
+from mrc.model.mapSys import LatticeMap2D
+
+MAP_SIZE = (20, 20)
+
+
+def walkRow(seed, isDistinctive):
+    # the robot drives along row 10 with slips, the blobs next to the row tell
+    # how far it got. returns the share of steps the estimate was right
+    width, height = MAP_SIZE
+    sim = SIM(MAP_SIZE, (0, 10), (1, 0), seed=seed)
+    map = LatticeMap2D(width, height)
+    if isDistinctive:
+        for x in range(2, width, 3):
+            sim.addItem("blob", (x, 9 if x % 2 else 11))
+    for x in range(1, width, 4):
+        sim.addItem("hazard", (x, 8))
+        map.addItem("hazard", (x, 8))
+    particleFilter = ParticleFilter(MAP_SIZE, 2000, seed=seed)
+    particleFilter.reset((0, 10), (1, 0))
+    matchCount = 0
+    for k in range(16):
+        sim.move()
+        addedItem = sim.getAddedItem()
+        positions = [
+            pos for itemPositions in addedItem.values() for pos in itemPositions
+        ]
+        map.setSensed(positions)
+        for itemName, itemPositions in addedItem.items():
+            map.addItems(itemName, itemPositions)
+        particleFilter.predict("move")
+        particleFilter.correct(positions, map.getHazardData(), map.getSensedData())
+        pos, dir, confidence = particleFilter.getEstimate()
+        matchCount += pos == tuple(sim.getRobotPos()) and dir == (1, 0)
+    return matchCount / 16
+
+
+def test_filter_converges_on_a_distinctive_map():
+    matchRates = [walkRow(seed, True) for seed in range(8)]
+    plainMatchRates = [walkRow(seed, False) for seed in range(8)]
+    assert sum(matchRates) / 8 >= 0.85
+    assert sum(matchRates) > sum(plainMatchRates)
+
+
+def test_unknown_direction_is_rejected():
+    with pytest.raises(ValueError):
+        ParticleFilter(MAP_SIZE, 10).reset((0, 0), (1, 1))
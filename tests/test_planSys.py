@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from mrc.model.mapSys import LatticeMap2D
+from mrc.model.planSys import PLANNER_TYPES, Planner, createPlanner
+
+
+def makeMap(rng, size, density):
+    map = LatticeMap2D(size, size)
+    for y in range(size):
+        for x in range(size):
+            if rng.random() < density:
+                map.addItem("hazard", (x, y))
+    return map
+
+
+def getFreeCell(rng, map):
+    size = map.getMapSize()[0]
+    while True:
+        pos = (rng.randrange(size), rng.randrange(size))
+        if map.getItem(pos) == None:
+            return pos
+
+
+def getLength(route):
+    return None if route == None else len(route) - 1
+
+
+def checkRoute(map, route, startPos, goalPos):
+    assert route[0] == startPos and route[-1] == goalPos
+    for (x, y), (nextX, nextY) in zip(route, route[1:]):
+        assert abs(nextX - x) + abs(nextY - y) == 1
+        assert map.getItem((nextX, nextY)) == None or (nextX, nextY) == goalPos
+
+
+def test_planner_is_abstract():
+    with pytest.raises(TypeError):
+        Planner(LatticeMap2D(4, 4))
+
+
+@pytest.mark.parametrize("name", [name for name in PLANNER_TYPES if name != "bfs"])
+@pytest.mark.parametrize("seed", range(6))
+def test_route_length_matches_bfs(name, seed):
+    rng = random.Random(seed)
+    map = makeMap(rng, rng.choice([8, 15, 24]), rng.choice([0.0, 0.2, 0.35]))
+    bfsPlanner = createPlanner("bfs", map)
+    planner = createPlanner(name, map)
+    for k in range(10):
+        startPos = getFreeCell(rng, map)
+        goalPos = getFreeCell(rng, map)
+        route = planner.plan(startPos, goalPos)
+        assert getLength(route) == getLength(bfsPlanner.plan(startPos, goalPos))
+        if route != None:
+            checkRoute(map, route, startPos, goalPos)
+
+
+@pytest.mark.parametrize("name", ["dstar", "field"])
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_planner_follows_cell_changes(name, seed):
+    # the planners that keep state between calls are told about every change
+    # and must agree with a bfs planned from scratch
+    rng = random.Random(seed)
+    map = makeMap(rng, 16, 0.2)
+    planner = createPlanner(name, map)
+    startPos = getFreeCell(rng, map)
+    goalPos = getFreeCell(rng, map)
+    for k in range(30):
+        pos = getFreeCell(rng, map)
+        if pos != startPos and pos != goalPos:
+            map.addItem("hazard", pos)
+            planner.notifyCellChanged(pos)
+        if k % 3 == 0:
+            hazards = [item.getPosition() for item in map.getItemList("hazard")]
+            pos = rng.choice(hazards)
+            map.removeItems([pos])
+            planner.notifyCellChanged(pos)
+        route = planner.plan(startPos, goalPos)
+        bfsRoute = createPlanner("bfs", map).plan(startPos, goalPos)
+        assert getLength(route) == getLength(bfsRoute)
@@ -0,0 +1,158 @@
+import pytest
+
+from mrc.controller.batchRunner import INIT_ROBOT_DIRECTION, makeScenario, runEpisode
+from mrc.controller.missionRunner import MissionRunner
+from mrc.controller.missionSys import applyMission
+from mrc.controller.recordSys import MissionRecorder, MissionReplayer
+from mrc.controller.sensorSys import RangeSensor
+from mrc.controller.sim import SIM
+from mrc.model.mapSys import LatticeMap2D
+from mrc.model.worldModel import WorldStateModel
+
+KEYFRAME_INTERVAL = 16
+
+
+def recordMission(scenario, path, maxTicks=400, sensorRange=None):
+    # runEpisode step by step, keeping the model snapshot after every tick
+    missionRecorder = MissionRecorder(path, KEYFRAME_INTERVAL)
+    missionRecorder.recordMission(
+        scenario["mapSize"],
+        scenario["startingPoint"],
+        INIT_ROBOT_DIRECTION,
+        "bfs",
+        "insertion",
+        scenario["seed"],
+    )
+    worldStateModel = WorldStateModel()
+    sim = SIM(
+        scenario["mapSize"],
+        scenario["startingPoint"],
+        INIT_ROBOT_DIRECTION,
+        seed=scenario["seed"],
+        sensor=None if sensorRange == None else RangeSensor(sensorRange, 180),
+    )
+    applyMission(scenario, worldStateModel, sim, missionRecorder=missionRecorder)
+    for blobPos in scenario["hiddenBlob"]:
+        sim.addItem("blob", blobPos)
+    for hazardPos in scenario["hiddenHazard"]:
+        sim.addItem("hazard", hazardPos)
+    for robotPos in scenario["fleet"]:
+        missionRecorder.recordRobotAdded(robotPos, INIT_ROBOT_DIRECTION)
+        worldStateModel.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+        sim.addRobot(robotPos, INIT_ROBOT_DIRECTION)
+
+    missionRunner = MissionRunner(worldStateModel, sim, missionRecorder)
+    missionRunner.sense()
+    snapshots = {}
+    for tick in range(1, maxTicks):
+        behaviors = missionRunner.tick()
+        snapshots[tick] = worldStateModel.getSnapshot()
+        if behaviors == None:
+            break
+    missionRecorder.close()
+    return snapshots
+
+
+@pytest.mark.parametrize(
+    "seed, robotCount, sensorRange",
+    [(0, 1, None), (1, 1, None), (2, 1, None), (3, 3, None), (4, 1, 6), (5, 3, 4)],
+)
+def test_replay_and_seek_reproduce_snapshots(tmp_path, seed, robotCount, sensorRange):
+    path = str(tmp_path / "mission.mrec")
+    scenario = makeScenario(seed, (20, 20), robotCount=robotCount)
+    snapshots = recordMission(scenario, path, sensorRange=sensorRange)
+    missionReplayer = MissionReplayer(path)
+    try:
+        tickCount = missionReplayer.getTickCount()
+        assert tickCount == len(snapshots)
+        assert missionReplayer.getKeyframeTicks()
+
+        assert missionReplayer.replay().getSnapshot() == snapshots[tickCount]
+        assert missionReplayer.getDivergedCount() == 0
+
+        # a keyframe holds no paths, so after one the robots may plan other
+        # behaviors, but the recorded poses keep the model exact
+        for tick in sorted({1, KEYFRAME_INTERVAL, KEYFRAME_INTERVAL + 1, tickCount}):
+            worldStateModel = missionReplayer.seek(tick)
+            assert worldStateModel.getSnapshot() == snapshots[tick]
+            assert missionReplayer.replay(toTick=tick).getSnapshot() == snapshots[tick]
+            assert missionReplayer.getDivergedCount() == 0
+    finally:
+        missionReplayer.close()
+
+
+def test_map_snapshot_round_trip():
+    map = LatticeMap2D(6, 5)
+    map.addItems("hazard", [(1, 1), (2, 1)])
+    map.addItem("target", (4, 3))
+    map.setVisited((0, 0))
+    map.setObserved([(0, 1), (1, 1), (5, 4)])
+    snapshot = map.getSnapshot()
+
+    restoredMap = LatticeMap2D(6, 5)
+    restoredMap.restoreSnapshot(snapshot)
+    assert restoredMap.getSnapshot() == snapshot
+    assert restoredMap.getObservedData() == map.getObservedData()
+
+    # restoring onto a map with items replaces them
+    otherMap = LatticeMap2D(6, 5)
+    otherMap.addItems("blob", [(3, 3), (4, 3)])
+    otherMap.addItem("hazard", (0, 4))
+    otherMap.restoreSnapshot(snapshot)
+    assert otherMap.getSnapshot() == snapshot
+    assert otherMap.getItemName((3, 3)) == None
+    assert otherMap.getHazardData() == map.getHazardData()
+
+
+def test_seek_onto_a_model_with_items(tmp_path):
+    path = str(tmp_path / "mission.mrec")
+    snapshots = recordMission(makeScenario(6, (20, 20)), path, sensorRange=5)
+    missionReplayer = MissionReplayer(path)
+    try:
+        tick = missionReplayer.getKeyframeTicks()[0] + 1
+        worldStateModel = missionReplayer.replay()
+        worldStateModel.addItems("blob", [(x, 0) for x in range(20)])
+        worldStateModel = missionReplayer.seek(tick, worldStateModel)
+        assert worldStateModel.getSnapshot() == snapshots[tick]
+    finally:
+        missionReplayer.close()
+
+
+def test_run_episode_recording_replays_faithfully(tmp_path):
+    path = str(tmp_path / "episode.mrec")
+    result = runEpisode(makeScenario(5, (20, 20)), recordPath=path)
+    missionReplayer = MissionReplayer(path)
+    try:
+        assert missionReplayer.getTickCount() >= result["ticks"]
+        worldStateModel = missionReplayer.replay()
+        assert missionReplayer.getDivergedCount() == 0
+        assert worldStateModel.hasGoal() != result["success"]
+    finally:
+        missionReplayer.close()
+
+
+def test_truncated_recording_still_opens(tmp_path):
+    path = str(tmp_path / "mission.mrec")
+    snapshots = recordMission(makeScenario(0, (20, 20)), path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    # cut in the middle of the last records, as a crash during a write would
+    truncatedPath = str(tmp_path / "truncated.mrec")
+    with open(truncatedPath, "wb") as f:
+        f.write(data[: len(data) - 7])
+    missionReplayer = MissionReplayer(truncatedPath)
+    try:
+        tickCount = missionReplayer.getTickCount()
+        assert 0 < tickCount < len(snapshots)
+        assert missionReplayer.replay().getSnapshot() == snapshots[tickCount]
+        assert missionReplayer.seek(tickCount).getSnapshot() == snapshots[tickCount]
+    finally:
+        missionReplayer.close()
+
+
+def test_not_a_recording_is_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a recording")
+    with pytest.raises(ValueError):
+        MissionReplayer(str(path))
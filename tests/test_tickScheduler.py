@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import time
+
+from mrc.controller.tickScheduler import TickScheduler
+
+
+def test_run_async_is_woken_from_other_threads():
+    # start, stop and terminate come from other threads while the loop runs
+    ticks = []
+    tickScheduler = TickScheduler(0.005, lambda: ticks.append(time.monotonic()))
+
+    def control():
+        for k in range(20):
+            tickScheduler.start()
+            time.sleep(0.002)
+            tickScheduler.stop()
+        tickScheduler.start()
+        time.sleep(0.05)
+        tickScheduler.terminate()
+
+    async def main():
+        controlThread = threading.Thread(target=control)
+        controlThread.start()
+        await asyncio.wait_for(tickScheduler.runAsync(), 5.0)
+        controlThread.join()
+
+    asyncio.run(main())
+    assert tickScheduler.isTerminated()
+    assert len(ticks) >= 5
+
+
+def test_wake_before_and_after_run_async():
+    tickScheduler = TickScheduler(0.01, lambda: None)
+    tickScheduler.start()
+    tickScheduler.terminate()
+    asyncio.run(asyncio.wait_for(tickScheduler.runAsync(), 1.0))
+    # the loop is gone, waking does nothing
+    tickScheduler.start()
+    tickScheduler.stop()
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from mrc.model.mapSys import LatticeMap2D
+from mrc.model.planSys import createPlanner
+from mrc.model.tourSys import TourPlanner
+
+
+def makeMap(rng, size, density, goalCount):
+    map = LatticeMap2D(size, size)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    for pos in cells[:goalCount]:
+        map.addItem(rng.choice(["blob", "target"]), pos)
+    for pos in cells[goalCount:]:
+        if rng.random() < density:
+            map.addItem("hazard", pos)
+    return map, cells[goalCount:]
+
+
+def getTourLength(map, startPos, tour):
+    # the tour planner counts a goal out of reach as four times the map size
+    width, height = map.getMapSize()
+    planner = createPlanner("bfs", map)
+    length = 0
+    lastPos = startPos
+    for item in tour:
+        route = planner.plan(lastPos, item.getPosition())
+        length += width * height * 4 if route == None else len(route) - 1
+        lastPos = item.getPosition()
+    return length
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_tour_distances_follow_cell_changes(seed):
+    rng = random.Random(seed)
+    map, freeCells = makeMap(rng, 14, 0.2, 8)
+    startPos = freeCells.pop()
+    tourPlanner = TourPlanner(map)
+    tourPlanner.getNextGoal(startPos)
+    for k in range(25):
+        pos = rng.choice(freeCells)
+        if map.getItemName(pos) == "hazard":
+            map.removeItems([pos])
+        else:
+            map.addItem("hazard", pos)
+        tourPlanner.notifyCellChanged(pos)
+        if k % 5 == 4:
+            startPos = rng.choice(
+                [pos for pos in freeCells if map.getItem(pos) == None]
+            )
+        tourPlanner.getNextGoal(startPos)
+        tour = tourPlanner.getTour()
+        assert tourPlanner.getStatData()["length"] == getTourLength(map, startPos, tour)
+
+
+def test_cell_changes_only_search_the_rows_they_touched():
+    map = LatticeMap2D(30, 30)
+    for pos in [(1, 1), (3, 2), (2, 4)]:
+        map.addItem("target", pos)
+    tourPlanner = TourPlanner(map)
+    tourPlanner.getNextGoal((0, 0))
+    searchCount = tourPlanner.getStatData()["searches"]
+
+    # far from every goal and the robot, no search went there
+    map.addItem("hazard", (25, 25))
+    tourPlanner.notifyCellChanged((25, 25))
+    tourPlanner.getNextGoal((0, 0))
+    assert tourPlanner.getStatData()["searches"] == searchCount
+
+    map.addItem("hazard", (2, 2))
+    tourPlanner.notifyCellChanged((2, 2))
+    tourPlanner.getNextGoal((0, 0))
+    assert tourPlanner.getStatData()["searches"] == searchCount + 1
+
+
+def test_tour_is_anchored_at_the_robot():
+    map = LatticeMap2D(10, 3)
+    for x in (2, 5, 8):
+        map.addItem("target", (x, 1))
+    tourPlanner = TourPlanner(map)
+    tourPlanner.getNextGoal((0, 1))
+    assert [item.getPosition() for item in tourPlanner.getTour()] == [
+        (2, 1),
+        (5, 1),
+        (8, 1),
+    ]
+    assert tourPlanner.getNextGoal((9, 1)).getPosition() == (8, 1)
+    assert [item.getPosition() for item in tourPlanner.getTour()] == [
+        (8, 1),
+        (5, 1),
+        (2, 1),
+    ]
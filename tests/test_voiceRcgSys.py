@@ -0,0 +1,44 @@
+import queue
+
+from mrc.view.voiceRcgSys import FixtureBackend, FixtureSource, VoicePipeline
+
+
+def test_failing_listener_gets_an_error_result():
+    results = queue.Queue()
+
+    def onResult(result):
+        results.put(result)
+        if result["text"] == "hazard 1 1":
+            raise ValueError("bad command")
+
+    voicePipeline = VoicePipeline(
+        FixtureBackend(), FixtureSource(["hazard 1 1", "blob 2 2"])
+    )
+    voicePipeline.registerResultEventListener(onResult)
+    voicePipeline.start()
+    try:
+        assert voicePipeline.requestCommand()
+        assert results.get(timeout=5)["text"] == "hazard 1 1"
+        errorResult = results.get(timeout=5)
+        assert errorResult["text"] == None
+        assert "bad command" in errorResult["error"]
+
+        # the recognizer thread is still there for the next command
+        assert voicePipeline.requestCommand()
+        assert results.get(timeout=5)["text"] == "blob 2 2"
+    finally:
+        voicePipeline.stop(5)
+
+
+def test_request_is_turned_down_while_stopped_or_pending():
+    voicePipeline = VoicePipeline(FixtureBackend(), FixtureSource(["undo"], 0.2))
+    assert not voicePipeline.requestCommand()
+    voicePipeline.start()
+    try:
+        assert voicePipeline.requestCommand()
+        assert not voicePipeline.requestCommand()
+        assert voicePipeline.isPending()
+        assert voicePipeline.getResult(timeout=5)["text"] == "undo"
+        assert not voicePipeline.isPending()
+    finally:
+        voicePipeline.stop(5)
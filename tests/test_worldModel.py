@@ -0,0 +1,47 @@
+from mrc.model.actorSys import LatticeMap2DActor
+from mrc.model.worldModel import WorldStateModel
+
+
+def makeModel():
+    # a wall at x = 3 makes the route to the target go round it
+    worldStateModel = WorldStateModel()
+    worldStateModel.initialize((10, 10), (0, 0), (1, 0))
+    worldStateModel.addItems("hazard", [(3, 0), (3, 1), (3, 2), (9, 9)])
+    worldStateModel.addItem("target", (6, 0))
+    return worldStateModel
+
+
+def countReplans(monkeypatch):
+    calls = []
+    updatePath = LatticeMap2DActor.updatePath
+
+    def countingUpdatePath(self):
+        calls.append(None)
+        return updatePath(self)
+
+    monkeypatch.setattr(LatticeMap2DActor, "updatePath", countingUpdatePath)
+    return calls
+
+
+def getRouteLength(worldStateModel):
+    return len(worldStateModel.getPathData()) - 1
+
+
+def test_removed_hazard_near_the_route_replans(monkeypatch):
+    worldStateModel = makeModel()
+    assert getRouteLength(worldStateModel) == 12
+    calls = countReplans(monkeypatch)
+
+    # far from the route nothing changes
+    worldStateModel.removeItems([(9, 9)])
+    assert calls == []
+
+    # next to the route the shorter way through the wall is taken
+    worldStateModel.removeItems([(3, 2)])
+    assert len(calls) == 1
+    assert getRouteLength(worldStateModel) == 10
+
+    # and again once the way along the first row is clear
+    worldStateModel.removeItems([(3, 0)])
+    assert len(calls) == 2
+    assert getRouteLength(worldStateModel) == 6